@@ -0,0 +1,55 @@
+"""Synthetic and recorded audio shared by the benchmark scripts."""
+import wave
+from typing import Iterator, Optional
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def speech_like(duration: float, rng: np.random.Generator, level: float = 0.1) -> np.ndarray:
+    """Harmonic stack with a syllable-rate envelope, loud enough to pass a VAD."""
+    t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = rng.uniform(100, 220)
+    voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * rng.uniform(3, 5) * t) ** 2
+    return (level * voice * envelope / 2).astype(np.float32)
+
+
+def silence_heavy(duration: float = 600.0, speech_ratio: float = 0.15,
+                  seed: int = 0, hum_level: float = 0.002) -> np.ndarray:
+    """Mostly background hum with short bursts of speech-like audio."""
+    rng = np.random.default_rng(seed)
+    total = int(duration * SAMPLE_RATE)
+    t = np.arange(total) / SAMPLE_RATE
+    audio = hum_level * np.sin(2 * np.pi * 50 * t) + rng.normal(0, hum_level / 2, total)
+    audio = audio.astype(np.float32)
+
+    mean_burst = 2.5
+    mean_gap = mean_burst * (1 - speech_ratio) / speech_ratio
+    pos = rng.exponential(mean_gap)
+    while pos < duration - 0.5:
+        burst = min(rng.uniform(1.0, 2 * mean_burst - 1.0), duration - pos)
+        start = int(pos * SAMPLE_RATE)
+        chunk = speech_like(burst, rng)
+        audio[start:start + len(chunk)] += chunk
+        pos += burst + rng.exponential(mean_gap)
+    return audio
+
+
+def load_wav(path: str) -> np.ndarray:
+    """Read a 16 kHz mono 16-bit WAV file into float32 samples."""
+    with wave.open(path, "rb") as wav:
+        if wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16 kHz mono 16-bit PCM")
+        frames = wav.readframes(wav.getnframes())
+    return np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def blocks(audio: np.ndarray, blocksize: int = 4096) -> Iterator[np.ndarray]:
+    """Split audio into capture-sized blocks like AudioService delivers them."""
+    for start in range(0, len(audio), blocksize):
+        yield audio[start:start + blocksize]
+
+
+def load_or_synthesize(path: Optional[str], duration: float, seed: int = 0) -> np.ndarray:
+    return load_wav(path) if path else silence_heavy(duration, seed=seed)
@@ -0,0 +1,68 @@
+"""Throughput of BatchTranscriptionService with several concurrent streams.
+
+Feeds N synthetic streams as fast as the engine accepts them and reports
+stream-seconds of audio transcribed per wall-clock second, for batch size
+1 (one window at a time) and for the requested batch size.
+
+    python -m benchmarks.bench_batch --streams 4 --seconds 60 --model tiny
+"""
+import argparse
+import json
+import threading
+
+from src.services.batch_transcription_service import BatchTranscriptionService
+from src.services.transcription_service import TranscriptionService
+from .audio_fixtures import blocks, silence_heavy
+
+
+def run(model, streams: int, seconds: float, batch_size: int) -> dict:
+    engine = BatchTranscriptionService(model=model, batch_size=batch_size)
+    ids = [engine.add_stream(language="en") for _ in range(streams)]
+    queues = [engine.text_queue(stream_id) for stream_id in ids]
+    engine.start()
+
+    def produce(stream_id, seed):
+        for block in blocks(silence_heavy(seconds, speech_ratio=0.8, seed=seed)):
+            engine.feed(stream_id, block)
+        engine.close_stream(stream_id)
+
+    producers = [threading.Thread(target=produce, args=(stream_id, i)) for i, stream_id in enumerate(ids)]
+    for producer in producers:
+        producer.start()
+    for producer in producers:
+        producer.join()
+    # Each stream queue ends with None once its last window is decoded
+    for queue in queues:
+        while queue.get() is not None:
+            pass
+
+    stats = engine.stats()
+    engine.stop()
+    stats["batch_size"] = batch_size
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--streams", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=60.0, help="audio per stream")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--model", default="tiny")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    model = TranscriptionService.create_model(args.model)
+    results = [run(model, args.streams, args.seconds, size) for size in (1, args.batch_size)]
+
+    print(f"{'batch':>5} {'windows':>8} {'avg batch':>10} {'stream-s/wall-s':>16}")
+    for result in results:
+        print(f"{result['batch_size']:>5} {result['windows']:>8} "
+              f"{result['avg_batch_size']:>10.2f} {result['throughput']:>16.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Cost of the real-time capture callback, before and after the ring buffer.
+
+Drives SoundDeviceSource's callback directly with stereo blocks at native
+device rates (no sound card needed) and compares it with the previous
+callback, which downmixed with ``mean`` and queued a new array per block.
+Reports time per callback, memory the audio thread leaves allocated per
+callback and what the pump thread spends downmixing and resampling to
+16 kHz per second of audio.
+
+    python -m benchmarks.bench_capture --seconds 60 --block 480
+"""
+import argparse
+import json
+from queue import Queue
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+import numpy as np
+
+from src.services.audio_sources import SoundDeviceSource
+
+
+def legacy_callback(audio_queue: Queue) -> Callable:
+    def callback(indata, frames, time_info, status):
+        audio_queue.put(indata.mean(axis=1) if len(indata.shape) > 1 else indata.copy())
+    return callback
+
+
+def ring_source(rate: int, channels: int) -> SoundDeviceSource:
+    source = SoundDeviceSource()
+    source.native_rate, source.channels = rate, channels
+    source._prepare(lambda block: None)
+    return source
+
+
+def measure(callback: Callable, blocks, drain: Callable = None) -> Dict:
+    # Timing and allocation are measured in separate passes; tracemalloc slows everything down
+    times = np.empty(len(blocks))
+    for i, block in enumerate(blocks):
+        started = time.perf_counter()
+        callback(block, len(block), None, None)
+        times[i] = time.perf_counter() - started
+        if drain is not None and i % 8 == 7:
+            drain()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for block in blocks[:200]:
+        callback(block, len(block), None, None)
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    if drain is not None:
+        drain()
+    us = times * 1e6
+    return {
+        "p50_us": round(float(np.percentile(us, 50)), 2),
+        "p99_us": round(float(np.percentile(us, 99)), 2),
+        "max_us": round(float(us.max()), 2),
+        "bytes_retained_per_callback": round(allocated / 200, 1),
+    }
+
+
+def run(rate: int, args) -> Dict:
+    rng = np.random.default_rng(args.seed)
+    total = rate * args.seconds
+    audio = (rng.standard_normal((total, 2)) * 0.1).astype(np.float32)
+    blocks = [audio[i:i + args.block] for i in range(0, total, args.block)]
+
+    legacy = measure(legacy_callback(Queue()), blocks)
+
+    source = ring_source(rate, 2)
+    ring = measure(source._on_audio, blocks, drain=source._drain)
+
+    # Pump thread cost: downmix + resample to 16 kHz, per second of audio
+    source = ring_source(rate, 2)
+    pumped = 0.0
+    for start in range(0, len(blocks), 8):
+        for block in blocks[start:start + 8]:
+            source._on_audio(block, len(block), None, None)
+        started = time.perf_counter()
+        source._drain()
+        pumped += time.perf_counter() - started
+
+    return {
+        "rate": rate,
+        "legacy": legacy,
+        "ring": ring,
+        "pump_ms_per_audio_second": round(pumped / args.seconds * 1000, 3),
+        "overruns": source._ring.overruns,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=int, default=60, help="seconds of audio per rate")
+    parser.add_argument("--block", type=int, default=480, help="frames per callback")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    results = [run(rate, args) for rate in (44100, 48000)]
+    for result in results:
+        for name in ("legacy", "ring"):
+            stats = result[name]
+            print(f"{result['rate']} Hz {name:<7} p50={stats['p50_us']:>7} µs p99={stats['p99_us']:>7} µs "
+                  f"max={stats['max_us']:>8} µs retido/callback={stats['bytes_retained_per_callback']} B")
+        print(f"{result['rate']} Hz bomba: {result['pump_ms_per_audio_second']} ms por segundo de áudio, "
+              f"perdas no anel={result['overruns']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Per-entry cost of persisting conversation history as it grows.
+
+Adds entries one at a time, as the app does during a session, and times
+each ``add_entry`` call in buckets. The journal (ConversationManager with
+autosave) should stay flat however many entries the day holds; the old
+approach, rewriting the whole day file after every entry, is measured
+alongside (up to --legacy-entries, since it grows quadratically).
+
+    python -m benchmarks.bench_journal --entries 20000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+from src.core.conversation_manager import ConversationManager
+from .harness import percentiles
+
+TEXT = "Let's go over the numbers from last week before we move on to the roadmap."
+
+
+def legacy_add(manager: ConversationManager, path: str, text: str) -> None:
+    """What add_entry used to do: append, then rewrite the whole day file."""
+    manager.add_entry(text)
+    manager.save_json(path)
+
+
+def measure(add, entries: int, bucket: int) -> List[Dict]:
+    buckets = []
+    durations: List[float] = []
+    for i in range(entries):
+        started = time.perf_counter()
+        add(i)
+        durations.append(time.perf_counter() - started)
+        if len(durations) == bucket:
+            stats = percentiles(durations)
+            buckets.append({"entries": i + 1, "mean_us": round(sum(durations) / bucket * 1e6, 1),
+                            "p99_ms": stats["p99_ms"], "max_ms": stats["max_ms"]})
+            durations = []
+    return buckets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--legacy-entries", type=int, default=3000)
+    parser.add_argument("--bucket", type=int, default=1000)
+    parser.add_argument("--no-fsync", action="store_true", help="skip fsync in the journal writer")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as journal_dir, tempfile.TemporaryDirectory() as legacy_dir:
+        manager = ConversationManager(journal_dir, fsync=not args.no_fsync)
+        journal = measure(lambda i: manager.add_entry(f"{TEXT} #{i}", f"tradução #{i}"),
+                          args.entries, args.bucket)
+        started = time.perf_counter()
+        manager.flush()
+        drain = time.perf_counter() - started
+        syncs = manager.journal.syncs
+        started = time.perf_counter()
+        manager.close()
+        close = time.perf_counter() - started
+
+        # Everything must come back after a restart
+        reopened = ConversationManager(journal_dir, autosave=False)
+        reopened.load_history()
+        recovered = len(reopened.entries)
+        day_file = os.path.join(journal_dir, time.strftime("%Y%m%d") + ".json")
+        recovered_file = len(json.load(open(day_file, encoding="utf-8")))
+
+        legacy_manager = ConversationManager(legacy_dir, autosave=False)
+        legacy_path = os.path.join(legacy_dir, "legacy.json")
+        legacy = measure(lambda i: legacy_add(legacy_manager, legacy_path, f"{TEXT} #{i}"),
+                         args.legacy_entries, args.bucket)
+
+    print("entradas   diário (µs/entrada, p99 ms, máx. ms)   reescrita completa (µs/entrada, p99 ms)")
+    for i, bucket in enumerate(journal):
+        old = legacy[i] if i < len(legacy) else None
+        old_text = f"{old['mean_us']:>10} {old['p99_ms']:>8}" if old else ""
+        print(f"{bucket['entries']:>8} {bucket['mean_us']:>12} {bucket['p99_ms']:>8} {bucket['max_ms']:>8}"
+              f"        {old_text}")
+    print(f"escrita pendente ao final: {drain * 1000:.0f} ms, {syncs} fsyncs, "
+          f"compactação no fechamento: {close * 1000:.0f} ms, recuperadas: {recovered}/{args.entries} "
+          f"({recovered_file} no arquivo do dia)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"journal": journal, "legacy": legacy, "drain_seconds": drain,
+                       "close_seconds": close, "fsyncs": syncs, "recovered": recovered}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
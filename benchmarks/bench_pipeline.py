@@ -0,0 +1,225 @@
+"""End-to-end pipeline benchmark on replayed audio.
+
+Replays recorded (--wav) or synthetic audio into ``audio_queue`` at real
+time or faster, runs TranscriptionService on it and pushes the results
+through the same text path as the app (persist with ConversationManager,
+translate asynchronously through TranslationStage with a stub backend).
+Reports per-stage latency percentiles measured from capture time,
+real-time factor, queue depth over time and peak RSS as JSON; --compare
+flags regressions against an earlier run.
+
+    python -m benchmarks.bench_pipeline --model tiny --speed 1 --json run.json
+    python -m benchmarks.bench_pipeline --stub-model --speed 4 --compare run.json
+"""
+import argparse
+from datetime import datetime
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from queue import Queue, Empty
+from typing import Dict, List
+
+from src.core.conversation_manager import ConversationManager
+from src.core.vad import VADSegmenter
+from src.services.transcription_service import TranscriptionService
+from src.services.translation_backends import StubBackend
+from src.services.translation_service import TranslationService
+from src.services.translation_stage import TranslationStage
+from .audio_fixtures import SAMPLE_RATE, load_or_synthesize
+from .harness import (QueueSampler, Replayer, StampedQueue, StubModel, TimedModel,
+                      peak_rss_mb, percentiles)
+
+# Metrics compared by --compare; all of them are "lower is better"
+COMPARED = [
+    ("latency", "text_queue", "p50_ms"),
+    ("latency", "text_queue", "p90_ms"),
+    ("latency", "persisted", "p50_ms"),
+    ("latency", "persisted", "p90_ms"),
+    ("latency", "partial", "p50_ms"),
+    ("rtf",),
+    ("peak_rss_mb",),
+]
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args) -> Dict:
+    audio = load_or_synthesize(args.wav, args.duration, seed=args.seed)
+    audio_queue: Queue = Queue()
+    text_queue = StampedQueue()
+
+    base_model = StubModel(args.stub_cost) if args.stub_model else TranscriptionService.create_model(args.model)
+    model = TimedModel(base_model)
+    service = TranscriptionService(
+        audio_queue, text_queue,
+        streaming=args.streaming,
+        vad=VADSegmenter() if args.vad else None,
+        model=model
+    )
+    service.language = args.language
+    translation_service = TranslationService(backend=StubBackend(args.translate_latency))
+
+    latency: Dict[str, List[float]] = {"partial": [], "text_queue": [], "translated": [], "persisted": []}
+    stages: Dict[str, List[float]] = {"translate": [], "persist": []}
+    replayer = Replayer(audio, audio_queue, speed=args.speed)
+    sampler = QueueSampler({"audio_queue": audio_queue, "text_queue": text_queue})
+    transcription_done = threading.Event()
+
+    with tempfile.TemporaryDirectory() as history_dir:
+        manager = ConversationManager(save_dir=history_dir)
+        submitted: Dict[int, tuple] = {}  # entry id -> (capture time, submit time)
+
+        def on_translation(entry_id, text, translation, error):
+            captured, started = submitted.pop(entry_id)
+            translated = time.perf_counter()
+            manager.update_translation(entry_id, translation)
+            stages["translate"].append(translated - started)
+            latency["translated"].append(translated - captured)
+
+        stage = TranslationStage(translation_service, on_translation)
+
+        def process_text():
+            # Same steps as VoxaApp's text thread, with timestamps around each one
+            while not (transcription_done.is_set() and text_queue.empty()):
+                try:
+                    put_time, event = text_queue.get(timeout=0.1)
+                except Empty:
+                    continue
+                captured = replayer.capture_time(event.end)
+                if not event.is_final:
+                    if event.text:
+                        latency["partial"].append(put_time - captured)
+                    continue
+                latency["text_queue"].append(put_time - captured)
+
+                started = time.perf_counter()
+                entry_id = manager.add_entry(event.text)
+                persisted = time.perf_counter()
+                submitted[entry_id] = (captured, persisted)
+                stage.submit(entry_id, event.text)
+
+                stages["persist"].append(persisted - started)
+                latency["persisted"].append(persisted - captured)
+
+        consumer = threading.Thread(target=process_text)
+        started = time.perf_counter()
+        sampler.start()
+        consumer.start()
+        service.start()
+        replayer.start()
+        replayer.join()
+        while audio_queue.qsize():
+            time.sleep(0.05)
+        service.stop()
+        transcription_done.set()
+        consumer.join()
+        stage.close()
+        manager.close()
+        sampler.stop()
+        wall = time.perf_counter() - started
+
+    audio_seconds = len(audio) / SAMPLE_RATE
+    decode_seconds = sum(seconds for _, seconds in model.decodes)
+    return {
+        "version": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "model": "stub" if args.stub_model else args.model,
+            "streaming": args.streaming,
+            "vad": args.vad,
+            "speed": args.speed,
+            "audio": args.wav or f"synthetic:{args.duration:.0f}s",
+            "translate_latency": args.translate_latency,
+        },
+        "audio_seconds": round(audio_seconds, 2),
+        "wall_seconds": round(wall, 2),
+        "rtf": round(decode_seconds / audio_seconds, 4),
+        "decode": {"calls": len(model.decodes), **percentiles([s for _, s in model.decodes])},
+        "latency": {name: percentiles(values) for name, values in latency.items()},
+        "stages": {name: percentiles(values) for name, values in stages.items()},
+        "queue_depth": {
+            "max_audio_queue": max((s["audio_queue"] for s in sampler.samples), default=0),
+            "max_text_queue": max((s["text_queue"] for s in sampler.samples), default=0),
+            "samples": sampler.samples,
+        },
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def _lookup(result: Dict, path):
+    for key in path:
+        result = result.get(key) if isinstance(result, dict) else None
+    return result
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Print metric changes and return the ones that got worse than ``threshold``."""
+    regressions = []
+    print(f"\ncomparação com {baseline.get('version')} ({baseline.get('timestamp')}):")
+    for path in COMPARED:
+        old, new = _lookup(baseline, path), _lookup(current, path)
+        if not old or new is None:
+            continue
+        change = new / old - 1
+        name = ".".join(path)
+        flag = "  REGRESSÃO" if change > threshold else ""
+        print(f"  {name:<30} {old:>10} -> {new:>10} ({change:+.1%}){flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def print_summary(result: Dict) -> None:
+    print(f"versão {result['version']}: {result['audio_seconds']} s de áudio em "
+          f"{result['wall_seconds']} s, RTF {result['rtf']}, pico RSS {result['peak_rss_mb']} MB")
+    for name, stats in result["latency"].items():
+        if stats["count"]:
+            print(f"  {name:<12} n={stats['count']:<5} p50={stats['p50_ms']:>8} ms "
+                  f"p90={stats['p90_ms']:>8} ms p99={stats['p99_ms']:>8} ms")
+    depth = result["queue_depth"]
+    print(f"  fila de áudio máx. {depth['max_audio_queue']}, fila de texto máx. {depth['max_text_queue']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wav", help="16 kHz mono WAV to replay instead of synthetic audio")
+    parser.add_argument("--duration", type=float, default=120.0, help="synthetic audio length")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed, 0 = as fast as possible")
+    parser.add_argument("--model", default="tiny", help="Whisper model size")
+    parser.add_argument("--stub-model", action="store_true", help="use a stub model instead of Whisper")
+    parser.add_argument("--stub-cost", type=float, default=0.1, help="stub decode seconds per audio second")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--streaming", action="store_true")
+    parser.add_argument("--vad", action="store_true")
+    parser.add_argument("--translate-latency", type=float, default=0.15, help="stub backend delay per request")
+    parser.add_argument("--json", help="write the result to this file")
+    parser.add_argument("--compare", help="baseline result to compare against")
+    parser.add_argument("--fail-threshold", type=float, default=0.2,
+                        help="relative increase that counts as a regression")
+    args = parser.parse_args()
+
+    result = run(args)
+    print_summary(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, result, args.fail_threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Load generator for the transcription server: concurrent-stream capacity and latency.
+
+Opens N client connections at once, each sending speech-like 16-bit PCM in
+real time, for every N in ``--streams``, and reports how many streams were
+admitted, the latency of partials and finals (arrival minus the moment the
+audio they end on was due to be sent) and how long clients were held back
+by the server's backpressure. The capacity is the largest N served without
+refusals or errors and with final latency p90 under ``--max-latency``.
+
+Without ``--connect`` an in-process server is started on a stub model pool
+(``--models`` slots, ``--cost`` decode seconds per audio second).
+
+    python -m benchmarks.bench_server --streams 1,2,4,8 --seconds 20
+    python -m benchmarks.bench_server --connect 127.0.0.1:9700 --streams 4,8,16
+"""
+import argparse
+import json
+import socket
+import threading
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from src.core.model_pool import ModelPool
+from src.services.transcription_server import TranscriptionServer
+from .audio_fixtures import SAMPLE_RATE, silence_heavy
+from .harness import StubModel, percentiles
+
+BLOCK_SECONDS = 0.1
+
+
+class Client:
+    """One streaming connection: sends audio paced to real time and times every reply."""
+
+    def __init__(self, address, audio: np.ndarray, language: str):
+        self.address = address
+        self.pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+        self.language = language
+        self.rejected = None  # reason, when admission control refused the stream
+        self.error = None
+        self.partial_latency: List[float] = []
+        self.final_latency: List[float] = []
+        self.send_lateness = 0.0  # how far behind real time sending fell
+        self.end: Dict = {}
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        try:
+            with socket.create_connection(self.address, timeout=30) as sock:
+                # Like a live capture client, keep little audio in flight so backpressure shows up here
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 32 * 1024)
+                sock.sendall(json.dumps({"language": self.language}).encode("utf-8") + b"\n")
+                replies = sock.makefile("rb")
+                ready = json.loads(replies.readline() or b"{}")
+                if ready.get("type") != "ready":
+                    self.rejected = ready.get("error", "connection closed")
+                    return
+                self.started_at = time.perf_counter()
+                reader = threading.Thread(target=self._read, args=(replies,), daemon=True)
+                reader.start()
+                self._send(sock)
+                sock.shutdown(socket.SHUT_WR)
+                reader.join()
+        except OSError as e:
+            self.error = str(e)
+
+    def _send(self, sock: socket.socket) -> None:
+        block = int(BLOCK_SECONDS * SAMPLE_RATE) * 2
+        for i, start in enumerate(range(0, len(self.pcm), block)):
+            due = self.started_at + i * BLOCK_SECONDS
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                self.send_lateness = max(self.send_lateness, -delay)
+            sock.sendall(self.pcm[start:start + block])
+
+    def _read(self, replies) -> None:
+        for line in replies:
+            message = json.loads(line)
+            kind = message["type"]
+            now = time.perf_counter()
+            if kind == "partial" and message["text"]:
+                self.partial_latency.append(now - self.started_at - message["end"])
+            elif kind == "final":
+                self.final_latency.append(now - self.started_at - message["end"])
+            elif kind == "error":
+                self.error = message["error"]
+            elif kind == "end":
+                self.end = message
+                return
+
+
+def run(address, streams: int, args) -> Dict:
+    clients = [Client(address, silence_heavy(args.seconds, speech_ratio=0.6, seed=args.seed + i), args.language)
+               for i in range(streams)]
+    for client in clients:
+        client.thread.start()
+    for client in clients:
+        client.thread.join()
+
+    served = [client for client in clients if client.rejected is None]
+    finals = percentiles([latency for client in served for latency in client.final_latency])
+    return {
+        "streams": streams,
+        "admitted": len(served),
+        "rejected": streams - len(served),
+        "errors": sum(1 for client in served if client.error),
+        "final_latency": finals,
+        "partial_latency": percentiles([latency for client in served for latency in client.partial_latency]),
+        "max_send_lateness_ms": round(max((client.send_lateness for client in served), default=0.0) * 1000, 1),
+        "backpressure_seconds": round(sum(client.end.get("backpressure_seconds", 0.0) for client in served), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connect", help="host:port of a running server (default: start one in-process)")
+    parser.add_argument("--streams", default="1,2,4,8", help="comma-separated concurrent stream counts")
+    parser.add_argument("--seconds", type=float, default=20.0, help="audio per stream")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--max-latency", type=float, default=2000.0, help="final latency p90 target, ms")
+    parser.add_argument("--models", type=int, default=2, help="in-process server: model pool size")
+    parser.add_argument("--cost", type=float, default=0.1, help="in-process server: decode seconds per audio second")
+    parser.add_argument("--max-streams", type=int, default=16, help="in-process server: admission limit")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    server = None
+    if args.connect:
+        host, _, port = args.connect.rpartition(":")
+        address = (host, int(port))
+    else:
+        pool = ModelPool([StubModel(args.cost) for _ in range(args.models)])
+        server = TranscriptionServer(pool, port=0, max_streams=args.max_streams).start()
+        address = server.address
+
+    results = []
+    capacity = 0
+    for streams in (int(n) for n in args.streams.split(",")):
+        result = run(address, streams, args)
+        results.append(result)
+        finals, partials = result["final_latency"], result["partial_latency"]
+        print(f"{streams:>3} streams: admitidos={result['admitted']} recusados={result['rejected']} "
+              f"erros={result['errors']} final p50={finals.get('p50_ms')} p90={finals.get('p90_ms')} "
+              f"p99={finals.get('p99_ms')} ms parcial p90={partials.get('p90_ms')} ms "
+              f"atraso no envio={result['max_send_lateness_ms']} ms")
+        if (not result["rejected"] and not result["errors"] and finals.get("count")
+                and finals["p90_ms"] <= args.max_latency):
+            capacity = max(capacity, streams)
+
+    print(f"Capacidade: {capacity} streams simultâneos com final p90 <= {args.max_latency:.0f} ms")
+    if server is not None:
+        server.stop()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"capacity": capacity, "levels": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
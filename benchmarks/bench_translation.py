@@ -0,0 +1,138 @@
+"""Requests saved by coalescing translation segments into batches.
+
+Starts a local stand-in translation server, replays a stream of transcript
+segments into TranslationStage with and without batching and reports the
+number of HTTP requests and connections, per-segment latency (submit to
+delivery) and whether every translation was split back onto the right
+segment. Uses the real Google or LibreTranslate backend, pointed at the
+local server. ``--merge-lines`` makes the server merge lines of joined
+Google requests, so the batched run shows the cost of the fallback to
+one segment per request.
+
+    python -m benchmarks.bench_translation --segments 200 --interval 0.3 --latency 0.2
+    python -m benchmarks.bench_translation --backend libre
+    python -m benchmarks.bench_translation --merge-lines
+"""
+import argparse
+import json
+import threading
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from src.core.metrics import get_registry
+from src.core.translation_cache import TranslationCache
+from src.services.translation_backends import GoogleBackend, LibreTranslateBackend
+from src.services.translation_service import TranslationService
+from src.services.translation_stage import TranslationStage
+from .harness import percentiles
+from .mock_translation_server import MockTranslationServer, fake_translate
+
+SENTENCES = [
+    "Good morning everyone, thanks for joining.",
+    "Can you see my screen?",
+    "Let's go over the numbers from last week.",
+    "I think we should move the deadline.",
+    "Does anyone have questions so far?",
+    "We'll follow up by email.",
+    "That makes sense to me.",
+    "Let me share the document again.",
+]
+
+
+def run_config(server: MockTranslationServer, args, batch_window: float, max_batch: int) -> Dict:
+    if args.backend == "libre":
+        backend = LibreTranslateBackend(server.url, concurrency=args.in_flight)
+    else:
+        backend = GoogleBackend(args.in_flight, base_url=f"{server.url}/m")
+    # No caching, so every segment really goes over the wire
+    service = TranslationService(cache=TranslationCache(max_entries=0), backend=backend)
+    service.set_language_codes("en", "pt")
+
+    submitted: Dict[int, float] = {}
+    latencies: List[float] = []
+    order: List[int] = []
+    wrong = 0
+    finished = threading.Event()
+
+    def on_result(segment_id, text, translation, error):
+        nonlocal wrong
+        latencies.append(time.perf_counter() - submitted[segment_id])
+        order.append(segment_id)
+        if translation != fake_translate(text, "pt"):
+            wrong += 1
+        if len(order) == args.segments:
+            finished.set()
+
+    stage = TranslationStage(service, on_result, batch_window=batch_window, max_batch=max_batch)
+    rng = np.random.default_rng(args.seed)
+    requests_before, connections_before = server.requests, server.connections
+    fallbacks = get_registry().get("voxa_translation_batch_fallbacks_total")
+    fallbacks_before = fallbacks.value
+    started = time.perf_counter()
+    for i in range(args.segments):
+        # Exponential gaps: segments often arrive in bursts
+        time.sleep(rng.exponential(args.interval))
+        submitted[i] = time.perf_counter()
+        stage.submit(i, f"{SENTENCES[i % len(SENTENCES)]} #{i}")
+    finished.wait(timeout=60)
+    wall = time.perf_counter() - started
+    stage.close()
+    backend.close()
+
+    return {
+        "batch_window": batch_window,
+        "max_batch": max_batch,
+        "requests": server.requests - requests_before,
+        "connections": server.connections - connections_before,
+        "batches": stage.batches,
+        "batch_fallbacks": int(fallbacks.value - fallbacks_before),
+        "failed": stage.failed,
+        "mismatched": wrong,
+        "in_order": order == list(range(args.segments)),
+        "wall_seconds": round(wall, 2),
+        "latency": percentiles(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--segments", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.3, help="mean seconds between segments")
+    parser.add_argument("--latency", type=float, default=0.2, help="server round trip in seconds")
+    parser.add_argument("--backend", choices=("google", "libre"), default="google")
+    parser.add_argument("--in-flight", type=int, default=4, help="concurrent requests")
+    parser.add_argument("--window", type=float, default=0.3, help="batch window in seconds")
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--merge-lines", action="store_true",
+                        help="server merges lines of joined requests (google backend)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    server = MockTranslationServer(latency=args.latency, merge_lines=args.merge_lines).start()
+    try:
+        results = [
+            run_config(server, args, batch_window=0.0, max_batch=1),
+            run_config(server, args, batch_window=args.window, max_batch=args.max_batch),
+        ]
+    finally:
+        server.stop()
+
+    for name, result in zip(("sem lote", "em lote"), results):
+        stats = result["latency"]
+        print(f"{name:<9} requisições={result['requests']:<5} conexões={result['connections']:<3} "
+              f"p50={stats['p50_ms']:>7} ms p90={stats['p90_ms']:>7} ms p99={stats['p99_ms']:>7} ms "
+              f"erros={result['failed'] + result['mismatched']} ordem={'ok' if result['in_order'] else 'ERRO'} "
+              f"lotes desfeitos={result['batch_fallbacks']}")
+    saved = 1 - results[1]["requests"] / max(results[0]["requests"], 1)
+    print(f"requisições economizadas: {saved:.0%}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Count Whisper calls saved by the VAD endpointing stage.
+
+Feeds a silence-heavy recording (synthetic unless --wav is given) through
+TranscriptionService with a stub model that only counts calls, with and
+without the VAD stage, in both fixed-window and streaming mode.
+
+    python -m benchmarks.bench_vad --duration 600 --json vad.json
+"""
+import argparse
+import json
+import time
+from queue import Queue
+from types import SimpleNamespace
+
+from src.core.vad import VADSegmenter
+from src.services.transcription_service import TranscriptionService
+from .audio_fixtures import SAMPLE_RATE, blocks, load_or_synthesize
+
+
+class CountingModel:
+    """Stands in for WhisperModel and records how much audio it was given."""
+
+    def __init__(self):
+        self.calls = 0
+        self.audio_seconds = 0.0
+
+    def transcribe(self, audio, **kwargs):
+        self.calls += 1
+        self.audio_seconds += len(audio) / SAMPLE_RATE
+        return iter([]), SimpleNamespace(language=kwargs.get("language"), language_probability=1.0)
+
+
+def run(audio, streaming: bool, use_vad: bool, max_utterance: float) -> dict:
+    model = CountingModel()
+    vad = VADSegmenter(max_utterance_seconds=max_utterance) if use_vad else None
+    service = TranscriptionService(Queue(), Queue(), streaming=streaming, vad=vad, model=model)
+
+    started = time.perf_counter()
+    for block in blocks(audio):
+        service.feed(block)
+    service.flush()
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "mode": "streaming" if streaming else "fixed",
+        "vad": use_vad,
+        "model_calls": model.calls,
+        "decoded_audio_seconds": round(model.audio_seconds, 1),
+        "wall_seconds": round(elapsed, 3),
+    }
+    if vad is not None:
+        result["utterances"] = vad.utterances
+        result["speech_ratio"] = round(vad.speech_frames / max(1, vad.total_frames), 3)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wav", help="16 kHz mono WAV to use instead of synthetic audio")
+    parser.add_argument("--duration", type=float, default=600.0, help="synthetic audio length in seconds")
+    parser.add_argument("--max-utterance", type=float, default=15.0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    audio = load_or_synthesize(args.wav, args.duration)
+    results = [
+        run(audio, streaming, use_vad, args.max_utterance)
+        for streaming in (False, True)
+        for use_vad in (False, True)
+    ]
+
+    print(f"audio: {len(audio) / SAMPLE_RATE:.0f} s")
+    print(f"{'mode':<10} {'vad':<5} {'calls':>7} {'decoded s':>10} {'saved':>7}")
+    for result in results:
+        baseline = next(r for r in results if r["mode"] == result["mode"] and not r["vad"])
+        saved = 1 - result["model_calls"] / max(1, baseline["model_calls"])
+        result["calls_saved"] = round(saved, 3)
+        print(f"{result['mode']:<10} {str(result['vad']):<5} {result['model_calls']:>7} "
+              f"{result['decoded_audio_seconds']:>10} {saved:>7.0%}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
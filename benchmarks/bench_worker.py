@@ -0,0 +1,164 @@
+"""UI frame latency and capture overruns with transcription in-process vs in a worker process.
+
+Replays speech-like audio through the real capture path (SoundDeviceSource's
+callback, ring and pump, driven by a simulated 48 kHz stereo device) into
+the AudioQueue and a streaming TranscriptionService with VAD, while the main
+thread ticks like the Tk loop. Streaming re-decodes the growing utterance,
+so the real-time factor is several times ``--cost``. The model is a stub that spends its decode
+time in pure Python, holding the GIL the way decoding and its Python-side
+glue do. A callback that starts later than the device buffer allows is
+counted as an overrun, as PortAudio would report input overflow.
+
+    python -m benchmarks.bench_worker --seconds 30 --cost 0.1
+"""
+import argparse
+import json
+import os
+from queue import Queue, Empty
+import threading
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from src.core.audio_queue import AudioQueue, DROP_SILENCE
+from src.core.vad import VADSegmenter
+from src.services.audio_sources import SoundDeviceSource
+from src.services.transcription_service import TranscriptionService
+from src.services.transcription_worker import TranscriptionWorker
+from .audio_fixtures import silence_heavy
+from .harness import StubModel, percentiles
+
+DEVICE_RATE = 48000
+
+
+class GilModel(StubModel):
+    """StubModel whose decode cost is a busy loop in Python, so it holds the GIL."""
+
+    def transcribe(self, audio, **kwargs):
+        until = time.perf_counter() + self.cost * len(audio) / 16000
+        while time.perf_counter() < until:
+            pass
+        return StubModel(cost=0.0).transcribe(audio, **kwargs)
+
+
+def gil_model(model_size: str) -> GilModel:
+    """Model factory for the worker process; the cost comes from the environment."""
+    return GilModel(float(os.environ.get("VOXA_BENCH_COST", "0.1")))
+
+
+class SimulatedDevice:
+    """Calls the capture callback every ``period`` seconds like a sound card's audio thread."""
+
+    def __init__(self, source: SoundDeviceSource, audio: np.ndarray, period: float, buffer: float):
+        self.source = source
+        self.audio = audio
+        self.frames = int(DEVICE_RATE * period)
+        self.period = period
+        self.buffer = buffer
+        self.lateness: List[float] = []
+        self.overruns = 0
+        self.thread = threading.Thread(target=self._run, name="simulated-device", daemon=True)
+
+    def _run(self) -> None:
+        started = time.perf_counter()
+        for i, start in enumerate(range(0, len(self.audio) - self.frames + 1, self.frames)):
+            due = started + (i + 1) * self.period
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            late = time.perf_counter() - due
+            self.lateness.append(late)
+            # The host buffer absorbs some lateness; beyond it the device drops input
+            if late > self.buffer - self.period:
+                self.overruns += 1
+            self.source._on_audio(self.audio[start:start + self.frames], self.frames, None, None)
+
+
+def run(mode: str, audio16: np.ndarray, args) -> Dict:
+    audio_queue = AudioQueue(max_seconds=10.0, policy=DROP_SILENCE)
+    text_queue: Queue = Queue()
+    options = dict(streaming=True, vad=VADSegmenter())
+    if mode == "worker":
+        os.environ["VOXA_BENCH_COST"] = str(args.cost)
+        service = TranscriptionWorker(audio_queue, text_queue, model_factory="benchmarks.bench_worker:gil_model",
+                                      **options)
+        service.model_ready.wait()
+    else:
+        service = TranscriptionService(audio_queue, text_queue, model=GilModel(args.cost), **options)
+
+    source = SoundDeviceSource()
+    source.native_rate, source.channels = DEVICE_RATE, 2
+    source._prepare(audio_queue.put)
+    stereo = np.repeat(audio16, DEVICE_RATE // 16000)[:, None].repeat(2, axis=1)
+    device = SimulatedDevice(source, stereo, args.period / 1000, args.device_buffer / 1000)
+
+    service.start()
+    source._pump_thread.start()
+    device.thread.start()
+
+    # Main thread: a 30 fps loop standing in for Tk's, draining transcripts like the UI
+    interval = 1 / args.fps
+    lateness = []
+    events = 0
+    next_frame = time.perf_counter() + interval
+    while device.thread.is_alive():
+        delay = next_frame - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        lateness.append(max(0.0, time.perf_counter() - next_frame))
+        next_frame += interval
+        while True:
+            try:
+                event = text_queue.get_nowait()
+            except Empty:
+                break
+            events += 1
+
+    source.stop()
+    service.stop()
+    events += text_queue.qsize()
+    if mode == "worker":
+        service.close()
+
+    late_frames = sum(1 for late in lateness if late > interval)
+    return {
+        "mode": mode,
+        "ui_lateness": percentiles(lateness),
+        "ui_frames_missed": late_frames,
+        "callback_lateness": percentiles(device.lateness),
+        "device_overruns": device.overruns,
+        "ring_overruns": source._ring.overruns,
+        "dropped_seconds": round(audio_queue.dropped_seconds, 2),
+        "transcript_events": events,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=30.0, help="seconds of audio to replay")
+    parser.add_argument("--cost", type=float, default=0.1, help="decode seconds per audio second of input")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--period", type=float, default=10.0, help="device callback period, ms")
+    parser.add_argument("--device-buffer", type=float, default=30.0, help="host input buffer, ms")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    audio = silence_heavy(args.seconds, speech_ratio=0.6, seed=args.seed)
+    results = [run(mode, audio, args) for mode in ("in-process", "worker")]
+    for result in results:
+        ui, callback = result["ui_lateness"], result["callback_lateness"]
+        print(f"{result['mode']:<10} UI atraso p50={ui['p50_ms']} ms p99={ui['p99_ms']} ms max={ui['max_ms']} ms "
+              f"quadros perdidos={result['ui_frames_missed']}/{ui['count']}")
+        print(f"{'':<10} callback atraso p99={callback['p99_ms']} ms max={callback['max_ms']} ms "
+              f"estouros={result['device_overruns']} perdas no anel={result['ring_overruns']} "
+              f"descartado={result['dropped_seconds']} s eventos={result['transcript_events']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
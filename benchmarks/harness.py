@@ -0,0 +1,154 @@
+"""Replayed-audio harness that drives the Voxa pipeline without a sound card."""
+from bisect import bisect_left
+from queue import Queue
+import resource
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from .audio_fixtures import SAMPLE_RATE, blocks
+
+
+class StampedQueue(Queue):
+    """Queue whose ``get`` returns ``(put_time, item)``."""
+
+    def _put(self, item):
+        super()._put((time.perf_counter(), item))
+
+
+class TimedModel:
+    """Wraps a WhisperModel and records the wall time of every decode."""
+
+    def __init__(self, model):
+        self.model = model
+        self.decodes: List[Tuple[float, float]] = []  # (audio seconds, decode seconds)
+
+    def transcribe(self, audio, **kwargs):
+        started = time.perf_counter()
+        segments, info = self.model.transcribe(audio, **kwargs)
+        segments = list(segments)  # faster-whisper decodes lazily
+        self.decodes.append((len(audio) / SAMPLE_RATE, time.perf_counter() - started))
+        return iter(segments), info
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+class StubModel:
+    """CPU-free stand-in for WhisperModel with a configurable decode cost.
+
+    Emits one pseudo-word per 0.4 s of input, derived from the audio itself
+    so repeated decodes of the same span agree (as streaming mode expects).
+    """
+
+    def __init__(self, cost: float = 0.1):
+        self.cost = cost  # decode seconds per audio second
+
+    def transcribe(self, audio, **kwargs):
+        duration = len(audio) / SAMPLE_RATE
+        time.sleep(self.cost * duration)
+        step = int(0.4 * SAMPLE_RATE)
+        words = []
+        for start in range(0, len(audio) - step + 1, step):
+            level = float(np.abs(audio[start:start + step]).mean())
+            if level > 0.01:
+                words.append(SimpleNamespace(
+                    start=start / SAMPLE_RATE,
+                    end=(start + step) / SAMPLE_RATE - 0.05,
+                    word=f" w{int(level * 1e4) % 997}"
+                ))
+        segments = []
+        if words:
+            segments.append(SimpleNamespace(
+                start=words[0].start, end=words[-1].end,
+                text="".join(w.word for w in words), words=words
+            ))
+        info = SimpleNamespace(language=kwargs.get("language") or "en", language_probability=1.0)
+        return iter(segments), info
+
+
+class Replayer:
+    """Pushes audio blocks into a queue at ``speed`` x real time (0 = unthrottled)."""
+
+    def __init__(self, audio: np.ndarray, audio_queue: Queue, speed: float = 1.0,
+                 blocksize: int = 4096):
+        self.audio = audio
+        self.audio_queue = audio_queue
+        self.speed = speed
+        self.blocksize = blocksize
+        self._ends: List[int] = []  # sample index at the end of each block
+        self._walls: List[float] = []  # when that block was delivered
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self.thread.start()
+
+    def join(self) -> None:
+        self.thread.join()
+
+    def _run(self) -> None:
+        position = 0
+        for block in blocks(self.audio, self.blocksize):
+            position += len(block)
+            if self.speed > 0:
+                due = self.started_at + position / SAMPLE_RATE / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            self._ends.append(position)
+            self._walls.append(time.perf_counter())
+            self.audio_queue.put(block)
+
+    def capture_time(self, audio_seconds: float) -> Optional[float]:
+        """Wall time at which the sample at ``audio_seconds`` was delivered."""
+        index = bisect_left(self._ends, int(audio_seconds * SAMPLE_RATE))
+        if index >= len(self._walls):
+            return self._walls[-1] if self._walls else None
+        return self._walls[index]
+
+
+class QueueSampler:
+    """Samples queue depths at a fixed interval."""
+
+    def __init__(self, queues: Dict[str, Queue], interval: float = 0.1):
+        self.queues = queues
+        self.interval = interval
+        self.samples: List[Dict] = []
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self.thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            sample = {"t": round(time.perf_counter() - self.started_at, 3)}
+            sample.update({name: queue.qsize() for name, queue in self.queues.items()})
+            self.samples.append(sample)
+
+
+def percentiles(values: List[float]) -> Dict:
+    if not values:
+        return {"count": 0}
+    data = np.asarray(values) * 1000.0
+    return {
+        "count": len(values),
+        "p50_ms": round(float(np.percentile(data, 50)), 1),
+        "p90_ms": round(float(np.percentile(data, 90)), 1),
+        "p99_ms": round(float(np.percentile(data, 99)), 1),
+        "max_ms": round(float(data.max()), 1),
+    }
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
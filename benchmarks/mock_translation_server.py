@@ -0,0 +1,129 @@
+"""Local stand-in for the translation endpoints Voxa talks to.
+
+Serves Google Translate's mobile page (``GET /m?sl=..&tl=..&q=..``, what
+deep-translator's GoogleTranslator scrapes) and the LibreTranslate API
+(``POST /translate``). Every request waits ``latency`` seconds and the
+"translation" is ``[<target>] <line>`` for each input line, so batched
+requests can be split back and checked. With ``merge_lines`` the Google
+page joins the last two lines of a multi-line request, as the real
+endpoint sometimes does, to exercise the backends' per-segment fallback.
+
+    python -m benchmarks.mock_translation_server --port 5000 --latency 0.15
+    python -m benchmarks.mock_translation_server --merge-lines
+"""
+import argparse
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+
+def fake_translate(text: str, target: str) -> str:
+    return "\n".join(f"[{target}] {line}" if line.strip() else line for line in text.split("\n"))
+
+
+class MockTranslationServer:
+    """Threaded HTTP server running in the background; counts what it serves."""
+
+    def __init__(self, latency: float = 0.15, port: int = 0, merge_lines: bool = False):
+        self.latency = latency
+        self.merge_lines = merge_lines
+        self.requests = 0
+        self.connections = 0
+        self.characters = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockTranslationServer":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _record(self, text: str) -> None:
+        with self._lock:
+            self.requests += 1
+            self.characters += len(text)
+        time.sleep(self.latency)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so clients can reuse connections
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = parse_qs(url.query)
+                if url.path != "/m" or "q" not in params:
+                    self.send_error(404)
+                    return
+                text = params["q"][0]
+                server._record(text)
+                translated = fake_translate(text, params.get("tl", ["pt"])[0])
+                if server.merge_lines and "\n" in translated:
+                    head, _, last = translated.rpartition("\n")
+                    translated = f"{head} {last}"
+                self._send("text/html; charset=utf-8",
+                           f'<html><body><div class="t0">{escape(translated)}</div></body></html>')
+
+            def do_POST(self):
+                if urlparse(self.path).path != "/translate":
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                q, target = body.get("q", ""), body.get("target", "pt")
+                texts = q if isinstance(q, list) else [q]
+                server._record("\n".join(texts))
+                translated = [fake_translate(text, target) for text in texts]
+                result = {"translatedText": translated if isinstance(q, list) else translated[0]}
+                self._send("application/json", json.dumps(result, ensure_ascii=False))
+
+            def _send(self, content_type: str, payload: str):
+                data = payload.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.15, help="seconds added to every request")
+    parser.add_argument("--merge-lines", action="store_true",
+                        help="Google page: join the last two lines of multi-line requests")
+    args = parser.parse_args()
+
+    server = MockTranslationServer(args.latency, args.port, args.merge_lines).start()
+    print(f"servidor de tradução simulado em {server.url} (Ctrl+C para sair)")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
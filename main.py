@@ -1,9 +1,20 @@
-import os
-from src.ui.app import VoxaApp
+import sys
 
 def main():
+    # Headless subcommand; the GUI (and Tk) is only imported when needed
+    if len(sys.argv) > 1 and sys.argv[1] == "transcribe":
+        from src.cli.batch_transcribe import main as transcribe_main
+        sys.exit(transcribe_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "history":
+        from src.cli.history import main as history_main
+        sys.exit(history_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from src.cli.serve import main as serve_main
+        sys.exit(serve_main(sys.argv[2:]))
+
+    from src.ui.app import VoxaApp
     app = VoxaApp()
     app.run()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,188 @@
+"""Headless batch transcription of recorded audio files.
+
+    python main.py transcribe calls/*.wav --language en --translate-to pt -o out/
+    python main.py transcribe palestra.wav --subtitles srt --subtitles vtt
+    python main.py transcribe entrevista.wav --language auto --translate-to pt
+
+Files are streamed in blocks through the same TranscriptionService (and
+optionally TranslationService) the desktop app uses, one file per worker
+process, and written as JSON in the ConversationManager history format,
+with every segment's start and end on the file's clock.
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+import json
+import os
+from queue import Queue
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+from ..core.conversation_manager import ConversationManager
+from ..core.language_detector import LanguageDetector
+from ..core.model_cache import get_model_cache
+from ..core.vad import VADSegmenter
+from ..services.transcription_service import TranscriptionService
+from ..utils.audio_io import AudioFileReader
+from ..utils.export import write_export
+
+# Per-process state, set up once by the pool initializer
+_worker: Dict = {}
+
+
+def _init_worker(model_size: str, cpu_threads: int) -> None:
+    get_model_cache().cpu_threads = cpu_threads
+    _worker["model_size"] = model_size
+
+
+def transcribe_file(path: str, output_dir: str, language: str,
+                    translate_to: Optional[str] = None, use_vad: bool = True,
+                    streaming: bool = False, block_seconds: float = 1.0,
+                    translator_spec: str = "google", subtitles: Sequence[str] = ()) -> Dict:
+    """Transcribe (and translate) one file and write ``<name>.json`` to ``output_dir``.
+
+    Each format in ``subtitles`` (``srt``/``vtt``) is also written as
+    ``<name>.<format>``, plus ``<name>.<language>.<format>`` for the translation.
+    ``language="auto"`` detects the spoken language once and re-checks it now and then.
+    """
+    auto = language == "auto"
+    reader = AudioFileReader(path)
+    text_queue: Queue = Queue()
+    service = TranscriptionService(
+        Queue(), text_queue,
+        model_size=_worker.get("model_size", "base"),
+        streaming=streaming,
+        vad=VADSegmenter() if use_vad else None,
+        language_detector=LanguageDetector() if auto else None
+    )
+    service.model_ready.wait()
+    if service.model_error is not None:
+        raise service.model_error
+    service.language = None if auto else language
+
+    started = time.perf_counter()
+    for block in reader.blocks(block_seconds):
+        service.feed(block)
+    service.flush()
+    processing = time.perf_counter() - started
+
+    events = []
+    while not text_queue.empty():
+        event = text_queue.get()
+        if event.is_final and event.text.strip():
+            events.append(event)
+
+    translations: List[Optional[str]] = [None] * len(events)
+    if translate_to:
+        from ..services.translation_backends import create_translation_backend
+        from ..services.translation_service import TranslationService
+        translator = TranslationService(backend=create_translation_backend(translator_spec))
+        translator.set_language_codes(language, translate_to)
+        texts = [event.text.strip() for event in events]
+        # The whole transcript is known up front, so send it in batches of one source language
+        start = 0
+        while start < len(texts):
+            source = events[start].language if auto else None
+            end = start + 1
+            while end < min(start + 8, len(texts)) and (not auto or events[end].language == source):
+                end += 1
+            translations[start:end] = translator.translate_batch(texts[start:end], source=source)
+            start = end
+        translator.backend.close()
+
+    # Entries are stamped on the recording's clock, assuming it ended at the file's mtime
+    recorded_at = datetime.fromtimestamp(os.path.getmtime(path)) - timedelta(seconds=reader.duration)
+    manager = ConversationManager(save_dir=output_dir, autosave=False)
+    for event, translation in zip(events, translations):
+        manager.add_entry(event.text.strip(), translation, recorded_at + timedelta(seconds=event.start),
+                          event.start, event.end)
+
+    base = os.path.splitext(os.path.basename(path))[0]
+    name = base + ".json"
+    manager.save_json(os.path.join(output_dir, name))
+    for fmt in subtitles:
+        write_export(os.path.join(output_dir, f"{base}.{fmt}"), manager.entries, fmt)
+        if translate_to:
+            write_export(os.path.join(output_dir, f"{base}.{translate_to}.{fmt}"), manager.entries, fmt,
+                         field="translation")
+
+    return {
+        "file": path,
+        "output": os.path.join(output_dir, name),
+        "audio_seconds": reader.duration,
+        "processing_seconds": processing,
+        "rtf": processing / reader.duration if reader.duration else 0.0,
+        "segments": len(manager.entries),
+        "model_calls": service.decode_calls,
+        "language_detections": service.language_detector.detections if auto else 0,
+    }
+
+
+def _worker_task(path: str, options: Dict) -> Dict:
+    return transcribe_file(path, **options)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="voxa transcribe",
+        description="Transcreve arquivos de áudio (WAV/FLAC) sem interface gráfica."
+    )
+    parser.add_argument("files", nargs="+", help="audio files to transcribe")
+    parser.add_argument("-o", "--output-dir", default="voxa_batch")
+    parser.add_argument("-l", "--language", default="en", help="spoken language code, or auto to detect it")
+    parser.add_argument("-t", "--translate-to", help="translate the transcript to this language code")
+    parser.add_argument("--translator", default=os.environ.get("VOXA_TRANSLATION_BACKEND", "google"),
+                        help="translation backend: google, libre:<url>[#<api key>] or stub")
+    parser.add_argument("-m", "--model", default="base", help="Whisper model size")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="worker processes (default: cores / threads per job)")
+    parser.add_argument("--threads-per-job", type=int, default=2,
+                        help="CTranslate2 threads used by each worker")
+    parser.add_argument("--no-vad", action="store_true", help="transcribe fixed windows without VAD")
+    parser.add_argument("--streaming", action="store_true", help="use streaming decoding")
+    parser.add_argument("--subtitles", action="append", choices=("srt", "vtt"), default=[],
+                        help="also write subtitles in this format (repeatable)")
+    parser.add_argument("--report", help="write per-file results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    jobs = args.jobs or max(1, (os.cpu_count() or 1) // args.threads_per_job)
+    jobs = min(jobs, len(args.files))
+    options = {
+        "output_dir": args.output_dir,
+        "language": args.language,
+        "translate_to": args.translate_to,
+        "use_vad": not args.no_vad,
+        "streaming": args.streaming,
+        "translator_spec": args.translator,
+        "subtitles": args.subtitles,
+    }
+
+    results, failures = [], 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(args.model, args.threads_per_job)) as pool:
+        futures = {pool.submit(_worker_task, path, options): path for path in args.files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"{path}: erro: {e}", file=sys.stderr)
+                continue
+            results.append(result)
+            print(f"{path}: {result['audio_seconds']:.1f} s de áudio em "
+                  f"{result['processing_seconds']:.1f} s (RTF {result['rtf']:.3f}), "
+                  f"{result['segments']} segmentos")
+
+    wall = time.perf_counter() - started
+    audio_total = sum(result["audio_seconds"] for result in results)
+    print(f"{len(results)} arquivos, {audio_total:.1f} s de áudio em {wall:.1f} s "
+          f"com {jobs} processos ({audio_total / wall if wall else 0:.1f}x tempo real)")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 1 if failures else 0
@@ -0,0 +1,102 @@
+"""Search and page through the conversation history of every day.
+
+    python main.py history import
+    python main.py history search "prazo do projeto" --from 2025-01-01
+    python main.py history list --from 2025-03-01 --to 2025-03-08
+    python main.py history export --format srt --from "2025-03-01 14:00" -o reuniao.srt
+
+Reads the SQLite index next to the daily files (``~/voxa_history/history.db``);
+``import`` (also run implicitly by the other commands) indexes daily JSON
+files that are new or changed since the last import. ``export`` streams
+the range as SRT, WebVTT, JSONL or plain text, page by page, so hours of
+history are never held in memory.
+"""
+import argparse
+from datetime import datetime
+from itertools import islice
+import json
+import sys
+from typing import Dict, Iterator, List, Optional
+
+from ..core.history_store import HistoryStore
+from ..utils.export import FORMATS, iter_export, write_chunks, write_export
+
+
+def _date(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"data inválida: {value} (use AAAA-MM-DD)")
+
+
+def _print(entries: Iterator[Dict], as_json: bool) -> int:
+    shown = 0
+    for entry in entries:
+        shown += 1
+        if as_json:
+            print(json.dumps({
+                "timestamp": entry['timestamp'].isoformat(),
+                "transcription": entry['transcription'],
+                "translation": entry['translation'],
+            }, ensure_ascii=False))
+            continue
+        print(f"[{entry['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}] {entry['transcription']}")
+        if entry['translation']:
+            print(f"    {entry['translation']}")
+    return shown
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="voxa history", description="Busca no histórico de conversas.")
+    parser.add_argument("--db", help="index database (default: ~/voxa_history/history.db)")
+    parser.add_argument("--dir", help="daily history files to import (default: the database's folder)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("import", help="index the daily JSON files")
+
+    search = commands.add_parser("search", help="full-text search, newest first")
+    search.add_argument("query")
+
+    listing = commands.add_parser("list", help="entries in a time range, oldest first")
+    listing.add_argument("--newest-first", action="store_true")
+
+    export = commands.add_parser("export", help="subtitles or JSON Lines for a time range")
+    export.add_argument("--format", choices=FORMATS, default="srt")
+    export.add_argument("--field", choices=("transcription", "translation"), default="transcription",
+                        help="text of the subtitles")
+    export.add_argument("-o", "--output", help="output file (default: stdout)")
+
+    for sub in (search, listing, export):
+        sub.add_argument("--from", dest="start", type=_date, help="start date/time (inclusive)")
+        sub.add_argument("--to", dest="end", type=_date, help="end date/time (exclusive)")
+    for sub in (search, listing):
+        sub.add_argument("-n", "--limit", type=int, default=50, help="maximum entries, 0 = all")
+        sub.add_argument("--json", action="store_true", help="one JSON object per line")
+    args = parser.parse_args(argv)
+
+    store = HistoryStore(args.db)
+    try:
+        imported = store.import_dir(args.dir)
+        if args.command == "import":
+            print(f"{imported} entradas indexadas, {store.count()} no total")
+            return 0
+
+        if args.command == "export":
+            entries = store.iter_range(args.start, args.end)
+            if args.output:
+                write_export(args.output, entries, args.format, args.field)
+            else:
+                write_chunks(iter_export(entries, args.format, args.field), sys.stdout)
+            return 0
+
+        limit = args.limit or None
+        if args.command == "search":
+            entries = store.search(args.query, args.start, args.end, limit)
+        else:
+            entries = islice(store.iter_range(args.start, args.end, newest_first=args.newest_first), limit)
+        if not _print(entries, args.json):
+            print("nenhuma entrada encontrada", file=sys.stderr)
+            return 1
+        return 0
+    finally:
+        store.close()
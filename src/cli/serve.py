@@ -0,0 +1,72 @@
+"""Headless transcription server for many clients on one machine.
+
+    python main.py serve --model small --models 4 --max-streams 16
+    python main.py serve --host 0.0.0.0 --port 9700 --translator libre:http://localhost:5000
+
+Clients connect over plain TCP, send a JSON header line and raw 16-bit
+PCM, and read transcripts back as JSON lines (see TranscriptionServer).
+``python -m benchmarks.bench_server`` is a load generator for it.
+"""
+import argparse
+import os
+import threading
+from typing import List, Optional
+
+from ..core.model_pool import ModelPool
+from ..services.transcription_server import TranscriptionServer
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="voxa serve",
+        description="Servidor de transcrição em tempo real para vários clientes via TCP."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=9700)
+    parser.add_argument("-m", "--model", default="base", help="Whisper model size")
+    parser.add_argument("--models", type=int, default=2, help="decodes that run at once (model pool size)")
+    parser.add_argument("--threads-per-model", type=int, default=0,
+                        help="CTranslate2 threads per decode (default: CTranslate2's)")
+    parser.add_argument("--max-streams", type=int, default=8, help="streams served at once")
+    parser.add_argument("--max-pool-wait", type=float, default=1.0,
+                        help="refuse new streams while decodes wait longer than this for a model, s")
+    parser.add_argument("--backlog", type=float, default=2.0,
+                        help="audio buffered per stream before the server stops reading it, s")
+    parser.add_argument("--no-streaming", action="store_true", help="send finals only, no partials")
+    parser.add_argument("--translator", default=os.environ.get("VOXA_TRANSLATION_BACKEND"),
+                        help="enable translate_to with this backend: google, libre:<url>[#<api key>] or stub")
+    parser.add_argument("--metrics-port", type=int, help="also serve /metrics on localhost at this port")
+    args = parser.parse_args(argv)
+
+    backend = None
+    if args.translator:
+        from ..services.translation_backends import create_translation_backend
+        backend = create_translation_backend(args.translator)
+
+    print(f"Carregando o modelo {args.model} ({args.models} decodificações simultâneas)...")
+    pool = ModelPool.load(args.model, args.models, args.threads_per_model)
+    server = TranscriptionServer(
+        pool, args.host, args.port,
+        max_streams=args.max_streams,
+        max_pool_wait=args.max_pool_wait,
+        backlog_seconds=args.backlog,
+        streaming=not args.no_streaming,
+        translation_backend=backend
+    ).start()
+    host, port = server.address
+    print(f"Servidor de transcrição em {host}:{port} (até {args.max_streams} streams)")
+
+    if args.metrics_port:
+        from ..services.metrics_server import MetricsServer
+        metrics = MetricsServer(port=args.metrics_port).start()
+        print(f"Métricas em {metrics.url}/metrics")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    server.stop()
+    if backend is not None:
+        backend.close()
+    print(f"{server.accepted} streams atendidos, {server.rejected} recusados")
+    return 0
@@ -0,0 +1,100 @@
+from collections import deque
+from queue import Queue
+import time
+from typing import Callable, Optional
+import numpy as np
+
+# Overload policies
+DROP_OLDEST = "drop_oldest"  # discard the oldest queued audio
+DROP_SILENCE = "drop_silence"  # discard the oldest silent block first, then the oldest
+DEGRADE = "degrade"  # ask the consumer for a cheaper decode, drop only at twice the budget
+
+POLICIES = (DROP_OLDEST, DROP_SILENCE, DEGRADE)
+
+
+class AudioQueue(Queue):
+    """Bounded capture queue that never blocks the audio callback.
+
+    The bound is expressed in seconds of audio. When the consumer falls
+    behind, audio is shed according to ``policy``; every block remembers when
+    it was captured, so the consumer can measure how far behind real time it
+    is, and how many samples were dropped right before it (``last_gap``) so
+    timestamps can stay on the capture clock. A consumer that drains the
+    queue on demand instead of blocking in ``get`` can set ``on_put``,
+    which is called (from the producer's thread) whenever the queue stops
+    being empty.
+    """
+
+    def __init__(self, max_seconds: float = 10.0, sample_rate: int = 16000,
+                 policy: str = DROP_OLDEST, silence_db: float = -50.0):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overload policy: {policy}")
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.max_samples = int(max_seconds * sample_rate)
+        self.policy = policy
+        self.silence_db = silence_db
+
+        self.overloaded = False
+        self.dropped_blocks = 0
+        self.dropped_samples = 0
+        self.last_capture_time: Optional[float] = None  # of the block last handed out
+        self.last_gap = 0  # samples dropped right before the block last handed out
+        self.on_put: Optional[Callable[[], None]] = None
+        self._samples = 0
+
+    def _init(self, maxsize):
+        self.queue = deque()  # entries are [capture time, block, samples dropped before it]
+
+    def _put(self, item):
+        self.queue.append([time.monotonic(), item, 0])
+        self._samples += len(item)
+
+        limit = self.max_samples * 2 if self.policy == DEGRADE else self.max_samples
+        if self.policy == DEGRADE and self._samples > self.max_samples:
+            self.overloaded = True
+        while self._samples > limit and len(self.queue) > 1:
+            self._shed()
+        if self.on_put is not None and len(self.queue) == 1:
+            self.on_put()
+
+    def _get(self):
+        captured, item, gap = self.queue.popleft()
+        self._samples -= len(item)
+        self.last_capture_time = captured
+        self.last_gap = gap
+        if self.overloaded and self._samples < self.max_samples // 2:
+            self.overloaded = False
+        return item
+
+    def _shed(self) -> None:
+        index = 0
+        if self.policy == DROP_SILENCE:
+            index = next((i for i, entry in enumerate(self.queue)
+                          if i < len(self.queue) - 1 and self._is_silent(entry[1])), 0)
+
+        _, item, gap = self.queue[index]
+        del self.queue[index]
+        # The block after the dropped one inherits the gap
+        self.queue[index][2] += gap + len(item)
+        self._samples -= len(item)
+        self.dropped_blocks += 1
+        self.dropped_samples += len(item)
+
+        # Dropped blocks will never be processed
+        self.unfinished_tasks -= 1
+        if self.unfinished_tasks == 0:
+            self.all_tasks_done.notify_all()
+
+    def _is_silent(self, block: np.ndarray) -> bool:
+        rms = float(np.sqrt(np.mean(np.square(block)))) if len(block) else 0.0
+        return 20 * np.log10(rms + 1e-10) < self.silence_db
+
+    @property
+    def dropped_seconds(self) -> float:
+        return self.dropped_samples / self.sample_rate
+
+    @property
+    def backlog_seconds(self) -> float:
+        """Seconds of audio waiting in the queue."""
+        return self._samples / self.sample_rate
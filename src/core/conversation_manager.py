@@ -1,23 +1,154 @@
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, List, Dict, Optional
 from datetime import datetime
 import json
 import os
+import threading
+from .journal import Journal
+
+if TYPE_CHECKING:
+    from .history_store import HistoryStore
 
 class ConversationManager:
-    def __init__(self, save_dir: Optional[str] = None):
+    """Conversation entries for the current day, persisted incrementally.
+    
+    With ``autosave`` every change is appended to ``YYYYMMDD.jsonl`` by a
+    background writer instead of rewriting the whole day. The journal is
+    compacted into ``YYYYMMDD.json`` on startup, every ``compact_every``
+    records and on ``close``; after a crash the day is rebuilt from the
+    JSON file plus whatever the journal holds. Each compacted day is also
+    written to ``store``, if given, so it can be searched across days.
+    
+    Entries may carry ``start``/``end``: when the segment was spoken, in
+    seconds on the recording's audio clock. Their ``timestamp`` is then the
+    recording's start plus ``start`` rather than the time the text arrived.
+    """
+    
+    def __init__(self, save_dir: Optional[str] = None, autosave: bool = True,
+                 compact_every: int = 10000, fsync: bool = True,
+                 store: Optional["HistoryStore"] = None):
         self.entries: List[Dict] = []
+        self.autosave = autosave
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.store = store
+        self._next_id = 0
+        self._pending_records = 0  # journal records since the last compaction
+        self._by_id: Dict[int, Dict] = {}
+        # Translations are attached from another thread than the one adding entries
+        self._lock = threading.RLock()
         self.save_dir = save_dir or os.path.join(os.path.expanduser("~"), "voxa_history")
         os.makedirs(self.save_dir, exist_ok=True)
+        
+        self.journal: Optional[Journal] = None
+        self._day: Optional[str] = None
+        if autosave:
+            self._open_day(datetime.now().strftime("%Y%m%d"))
+    
+    def _paths(self, day: str):
+        base = os.path.join(self.save_dir, day)
+        return base + ".json", base + ".jsonl"
     
-    def add_entry(self, transcription: str, translation: Optional[str] = None) -> None:
-        """Add a new conversation entry."""
-        entry = {
-            'timestamp': datetime.now(),
-            'transcription': transcription,
-            'translation': translation
+    def _open_day(self, day: str) -> None:
+        """Recover the day's entries, fold the journal into the JSON file and start appending."""
+        self._day = day
+        self._set_entries(self._read_day(day))
+        json_path, journal_path = self._paths(day)
+        self.journal = Journal(journal_path, fsync=self.fsync)
+        if self.journal.records:
+            self.compact()
+    
+    def _read_day(self, day: str) -> List[Dict]:
+        json_path, journal_path = self._paths(day)
+        entries: List[Dict] = []
+        if os.path.exists(json_path):
+            with open(json_path, "r", encoding="utf-8") as f:
+                entries = [self._deserialize(entry, i) for i, entry in enumerate(json.load(f))]
+        
+        # Replay the journal; records already folded into the JSON file are skipped
+        by_id = {entry['id']: entry for entry in entries}
+        for record in Journal.read(journal_path):
+            op = record.get("op")
+            if op == "add" and record["id"] not in by_id:
+                entry = self._deserialize(record, record["id"])
+                entries.append(entry)
+                by_id[entry['id']] = entry
+            elif op == "update" and record["id"] in by_id:
+                for field in ("transcription", "translation"):
+                    if field in record:
+                        by_id[record["id"]][field] = record[field]
+            elif op == "clear":
+                entries, by_id = [], {}
+        return entries
+    
+    def _set_entries(self, entries: List[Dict]) -> None:
+        self.entries = entries
+        self._by_id = {entry['id']: entry for entry in entries}
+        self._next_id = max(self._by_id, default=-1) + 1
+    
+    @staticmethod
+    def _serialize(entry: Dict) -> Dict:
+        return {
+            "id": entry['id'],
+            "timestamp": entry['timestamp'].isoformat(),
+            "transcription": entry['transcription'],
+            "translation": entry['translation'],
+            "start": entry.get('start'),
+            "end": entry.get('end')
+        }
+    
+    @staticmethod
+    def _deserialize(data: Dict, default_id: int) -> Dict:
+        return {
+            'id': data.get("id", default_id),
+            'timestamp': datetime.fromisoformat(data["timestamp"]),
+            'transcription': data["transcription"],
+            'translation': data["translation"],
+            'start': data.get("start"),
+            'end': data.get("end")
         }
-        self.entries.append(entry)
-        self._auto_save()
+    
+    def add_entry(self, transcription: str, translation: Optional[str] = None,
+                  timestamp: Optional[datetime] = None, start: Optional[float] = None,
+                  end: Optional[float] = None) -> int:
+        """Add a new conversation entry and return its id; ``start``/``end`` are audio-clock seconds."""
+        with self._lock:
+            if self.autosave and datetime.now().strftime("%Y%m%d") != self._day:
+                self._roll_day()
+            
+            entry = {
+                'id': self._next_id,
+                'timestamp': timestamp or datetime.now(),
+                'transcription': transcription,
+                'translation': translation,
+                'start': start,
+                'end': end
+            }
+            self._next_id += 1
+            self.entries.append(entry)
+            self._by_id[entry['id']] = entry
+            self._auto_save({"op": "add", **self._serialize(entry)})
+            return entry['id']
+    
+    def update_translation(self, entry_id: int, translation: Optional[str]) -> bool:
+        """Attach a translation that arrived after the entry was added."""
+        with self._lock:
+            entry = self._by_id.get(entry_id)
+            if entry is None:
+                return False
+            entry['translation'] = translation
+            self._auto_save({"op": "update", "id": entry_id, "translation": translation})
+            return True
+    
+    def update_transcription(self, entry_id: int, transcription: str) -> bool:
+        """Replace a draft transcription with its refined text."""
+        with self._lock:
+            entry = self._by_id.get(entry_id)
+            if entry is None:
+                return False
+            if entry['transcription'] != transcription:
+                entry['transcription'] = transcription
+                self._auto_save({"op": "update", "id": entry_id, "transcription": transcription})
+            return True
     
     def get_entries(self) -> List[Dict]:
         """Get all conversation entries."""
@@ -25,22 +156,68 @@ class ConversationManager:
     
     def clear(self) -> None:
         """Clear all conversation entries."""
-        self.entries = []
-        self._auto_save()
+        with self._lock:
+            self.entries = []
+            self._by_id = {}
+            self._auto_save({"op": "clear"})
     
-    def _auto_save(self) -> None:
-        """Automatically save the conversation history to a file."""
-        filename = datetime.now().strftime("%Y%m%d") + ".json"
-        filepath = os.path.join(self.save_dir, filename)
+    def _auto_save(self, record: Dict) -> None:
+        """Append a change to today's journal."""
+        if self.journal is None:
+            return
         
-        history_data = [
-            {
-                "timestamp": entry['timestamp'].isoformat(),
-                "transcription": entry['transcription'],
-                "translation": entry['translation']
-            }
-            for entry in self.entries
-        ]
+        self.journal.append(record)
+        self._pending_records += 1
+        if self._pending_records >= self.compact_every:
+            self.compact()
+    
+    def compact(self) -> None:
+        """Rewrite the day's JSON file from the current entries and empty the journal."""
+        with self._lock:
+            if self.journal is None:
+                return
+            json_path, _ = self._paths(self._day)
+            # Entries are only ever appended or have a field replaced in place,
+            # so a shallow copy is a consistent snapshot to serialize later
+            snapshot = list(self.entries)
+            day, store = self._day, self.store
+            
+            def build():
+                data = [self._serialize(entry) for entry in snapshot]
+                if store is not None:
+                    try:
+                        store.upsert_day(day, data)
+                    except Exception as e:
+                        print(f"History index error: {e}")
+                return data
+            
+            self.journal.compact(json_path, build)
+            self._pending_records = 0
+    
+    def _roll_day(self) -> None:
+        """Close the finished day and start a new one with no entries."""
+        self.close()
+        self.entries = []
+        self._by_id = {}
+        self._open_day(datetime.now().strftime("%Y%m%d"))
+    
+    def flush(self) -> None:
+        """Block until every change so far is on disk."""
+        if self.journal is not None:
+            self.journal.flush()
+    
+    def close(self) -> None:
+        """Compact the journal and stop its writer."""
+        with self._lock:
+            if self.journal is None:
+                return
+            self.compact()
+            self.journal.close()
+            self.journal = None
+    
+    def save_json(self, filepath: str) -> None:
+        """Save the entries in the same JSON format as the daily history files."""
+        history_data = [self._serialize(entry) for entry in self.entries]
         
         with open(filepath, "w", encoding="utf-8") as f:
             json.dump(history_data, f, ensure_ascii=False, indent=2)
@@ -50,23 +227,8 @@ class ConversationManager:
         if date is None:
             date = datetime.now()
         
-        filename = date.strftime("%Y%m%d") + ".json"
-        filepath = os.path.join(self.save_dir, filename)
-        
-        if not os.path.exists(filepath):
-            return
-        
-        with open(filepath, "r", encoding="utf-8") as f:
-            history_data = json.load(f)
-        
-        self.entries = [
-            {
-                'timestamp': datetime.fromisoformat(entry["timestamp"]),
-                'transcription': entry["transcription"],
-                'translation': entry["translation"]
-            }
-            for entry in history_data
-        ]
+        with self._lock:
+            self._set_entries(self._read_day(date.strftime("%Y%m%d")))
     
     def save_to_file(self, filename: str) -> None:
         """Save conversation to a file."""
@@ -76,4 +238,4 @@ class ConversationManager:
                 f.write(f"Transcription: {entry['transcription']}\n")
                 if entry['translation']:
                     f.write(f"Translation: {entry['translation']}\n")
-                f.write("\n") 
\ No newline at end of file
+                f.write("\n")
\ No newline at end of file
@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+from typing import Optional
+
+PARTIAL = "partial"
+FINAL = "final"
+
+
+@dataclass
+class TranscriptEvent:
+    """A transcription result published on ``text_queue``.
+
+    ``partial`` events carry the in-progress text of the current utterance and
+    replace each other; ``final`` events carry committed text that will not
+    change anymore. With speculative decoding a final may be a ``draft``: a
+    later final with the same ``segment_id`` and ``draft`` unset replaces it.
+    """
+    kind: str
+    text: str
+    start: float = 0.0  # seconds since capture start
+    end: float = 0.0
+    segment_id: Optional[int] = None  # set on finals, unique within a service (a worker keeps it across restarts)
+    draft: bool = False
+    language: Optional[str] = None  # code the final was transcribed in
+
+    @property
+    def is_final(self) -> bool:
+        return self.kind == FINAL
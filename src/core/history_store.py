@@ -0,0 +1,226 @@
+from datetime import datetime
+import glob
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# (timestamp, row id) of the last row of a page; pass it back to get the next one
+Cursor = Tuple[float, int]
+
+
+class HistoryStore:
+    """SQLite index over the conversation history of every day.
+
+    Entries are keyed by (day, entry id), so re-importing a day only touches
+    the rows that changed. Listing pages by time range with a keyset cursor
+    and full-text search (FTS5 when SQLite has it, LIKE otherwise) stream
+    rows in pages of ``page_size``, so memory stays bounded however much
+    history there is.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, page_size: int = 200):
+        self.db_path = db_path or os.path.join(os.path.expanduser("~"), "voxa_history", "history.db")
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.page_size = page_size
+        # Written from the journal thread, read from the UI or CLI
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self.fts = self._create_schema()
+
+    def _create_schema(self) -> bool:
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY,
+                day TEXT NOT NULL,
+                entry_id INTEGER NOT NULL,
+                ts REAL NOT NULL,
+                transcription TEXT NOT NULL,
+                translation TEXT,
+                audio_start REAL,
+                audio_end REAL,
+                UNIQUE (day, entry_id)
+            );
+            CREATE INDEX IF NOT EXISTS entries_ts ON entries (ts, id);
+            CREATE TABLE IF NOT EXISTS imported_files (path TEXT PRIMARY KEY, mtime REAL);
+        """)
+        # Databases created before entries had audio-clock times
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(entries)")}
+        for column in ("audio_start", "audio_end"):
+            if column not in columns:
+                self._db.execute(f"ALTER TABLE entries ADD COLUMN {column} REAL")
+        try:
+            self._db.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+                    transcription, translation, content='entries', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                );
+                CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+                    INSERT INTO entries_fts(rowid, transcription, translation)
+                    VALUES (new.id, new.transcription, new.translation);
+                END;
+                CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+                    INSERT INTO entries_fts(entries_fts, rowid, transcription, translation)
+                    VALUES ('delete', old.id, old.transcription, old.translation);
+                END;
+                CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE ON entries BEGIN
+                    INSERT INTO entries_fts(entries_fts, rowid, transcription, translation)
+                    VALUES ('delete', old.id, old.transcription, old.translation);
+                    INSERT INTO entries_fts(rowid, transcription, translation)
+                    VALUES (new.id, new.transcription, new.translation);
+                END;
+            """)
+            return True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5; search falls back to LIKE
+            return False
+
+    def upsert_day(self, day: str, entries: List[Dict]) -> int:
+        """Make the store's copy of ``day`` match ``entries`` (history JSON format); returns rows written."""
+        rows = [
+            (day, entry.get("id", i), datetime.fromisoformat(entry["timestamp"]).timestamp(),
+             entry["transcription"], entry.get("translation"), entry.get("start"), entry.get("end"))
+            for i, entry in enumerate(entries)
+        ]
+        with self._lock, self._db:
+            written = self._db.executemany("""
+                INSERT INTO entries (day, entry_id, ts, transcription, translation, audio_start, audio_end)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (day, entry_id) DO UPDATE SET
+                    ts = excluded.ts, transcription = excluded.transcription,
+                    translation = excluded.translation,
+                    audio_start = excluded.audio_start, audio_end = excluded.audio_end
+                WHERE transcription IS NOT excluded.transcription
+                   OR translation IS NOT excluded.translation
+                   OR audio_start IS NOT excluded.audio_start
+                   OR audio_end IS NOT excluded.audio_end
+            """, rows).rowcount
+            # Entries that are gone from the day (e.g. after clear) are gone from the index too
+            keep = {row[1] for row in rows}
+            stale = [(day, entry_id) for (entry_id,) in
+                     self._db.execute("SELECT entry_id FROM entries WHERE day = ?", (day,))
+                     if entry_id not in keep]
+            self._db.executemany("DELETE FROM entries WHERE day = ? AND entry_id = ?", stale)
+            return written + len(stale)
+
+    def import_json(self, path: str) -> int:
+        """Import one daily ``YYYYMMDD.json`` file; unchanged files are skipped."""
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            row = self._db.execute("SELECT mtime FROM imported_files WHERE path = ?", (path,)).fetchone()
+        if row is not None and row["mtime"] == mtime:
+            return 0
+
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        day = os.path.splitext(os.path.basename(path))[0]
+        written = self.upsert_day(day, entries)
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO imported_files VALUES (?, ?)", (path, mtime))
+        return written
+
+    def import_dir(self, save_dir: Optional[str] = None) -> int:
+        """Import every daily history file in ``save_dir`` (default ``~/voxa_history``)."""
+        save_dir = save_dir or os.path.dirname(os.path.abspath(self.db_path))
+        written = 0
+        for path in sorted(glob.glob(os.path.join(save_dir, "[0-9]" * 8 + ".json"))):
+            try:
+                written += self.import_json(path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"History import error ({path}): {e}")
+        return written
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def page(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+             limit: int = 50, after: Optional[Cursor] = None, newest_first: bool = True) -> List[Dict]:
+        """One page of entries in [start, end); pass the last row's ``cursor`` as ``after`` for the next."""
+        where, params = self._range(start, end)
+        if after is not None:
+            where.append("(ts, id) < (?, ?)" if newest_first else "(ts, id) > (?, ?)")
+            params.extend(after)
+        order = "DESC" if newest_first else "ASC"
+        sql = (f"SELECT * FROM entries {self._where(where)} "
+               f"ORDER BY ts {order}, id {order} LIMIT ?")
+        with self._lock:
+            return [self._row(row) for row in self._db.execute(sql, params + [limit])]
+
+    def iter_range(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   newest_first: bool = False) -> Iterator[Dict]:
+        """Stream every entry in [start, end), one page at a time."""
+        after: Optional[Cursor] = None
+        while True:
+            rows = self.page(start, end, self.page_size, after, newest_first)
+            yield from rows
+            if len(rows) < self.page_size:
+                return
+            after = rows[-1]["cursor"]
+
+    def search(self, query: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+               limit: Optional[int] = None) -> Iterator[Dict]:
+        """Stream entries whose transcription or translation contains every word of ``query``, newest first."""
+        terms = query.split()
+        if not terms:
+            return
+        after: Optional[Cursor] = None
+        returned = 0
+        while limit is None or returned < limit:
+            where, params = self._range(start, end)
+            if self.fts:
+                # Quote every term so user input is never parsed as FTS syntax; the last one matches as a prefix
+                match = " ".join('"' + term.replace('"', '""') + '"' for term in terms) + "*"
+                where.append("id IN (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?)")
+                params.append(match)
+            else:
+                for term in terms:
+                    where.append("(transcription LIKE ? OR translation LIKE ?)")
+                    params.extend([f"%{term}%"] * 2)
+            if after is not None:
+                where.append("(ts, id) < (?, ?)")
+                params.extend(after)
+            page_size = self.page_size if limit is None else min(self.page_size, limit - returned)
+            sql = f"SELECT * FROM entries {self._where(where)} ORDER BY ts DESC, id DESC LIMIT ?"
+            with self._lock:
+                rows = [self._row(row) for row in self._db.execute(sql, params + [page_size])]
+            yield from rows
+            returned += len(rows)
+            if len(rows) < page_size:
+                return
+            after = rows[-1]["cursor"]
+
+    @staticmethod
+    def _range(start: Optional[datetime], end: Optional[datetime]) -> Tuple[List[str], List]:
+        where, params = [], []
+        if start is not None:
+            where.append("ts >= ?")
+            params.append(start.timestamp())
+        if end is not None:
+            where.append("ts < ?")
+            params.append(end.timestamp())
+        return where, params
+
+    @staticmethod
+    def _where(clauses: List[str]) -> str:
+        return "WHERE " + " AND ".join(clauses) if clauses else ""
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict:
+        return {
+            'day': row["day"],
+            'id': row["entry_id"],
+            'timestamp': datetime.fromtimestamp(row["ts"]),
+            'transcription': row["transcription"],
+            'translation': row["translation"],
+            'start': row["audio_start"],
+            'end': row["audio_end"],
+            'cursor': (row["ts"], row["id"]),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
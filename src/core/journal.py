@@ -0,0 +1,149 @@
+import json
+import os
+from queue import Queue, Empty
+import threading
+import time
+from typing import Any, Callable, Dict, List
+from .metrics import get_registry
+
+_CLOSE = object()
+
+_PERSIST_SECONDS = get_registry().histogram(
+    "voxa_persist_seconds", "History record append to being on disk (after fsync)")
+_SYNC_SECONDS = get_registry().histogram("voxa_journal_sync_seconds", "Wall time of one journal write and fsync")
+_COMPACT_SECONDS = get_registry().histogram(
+    "voxa_history_compact_seconds", "Wall time of writing a day's snapshot and emptying its journal")
+
+
+class Journal:
+    """Append-only JSON Lines log written by a background thread.
+
+    ``append`` only enqueues, so callers never wait on the disk. The writer
+    groups whatever arrived within ``flush_interval`` seconds into a single
+    write and fsync. A line torn by a crash is dropped when the journal is
+    reopened. ``compact`` writes a snapshot file atomically and then empties
+    the journal; records appended after the snapshot was taken stay in the
+    journal.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.2, fsync: bool = True):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.records = 0  # records in the journal file
+        self.syncs = 0
+        self._queue: Queue = Queue()
+        self._file = self._open()
+        self._thread = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._thread.start()
+
+    def _open(self):
+        f = open(self.path, "a+b")
+        f.seek(0)
+        good = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            good += len(line)
+            self.records += 1
+        f.seek(0, os.SEEK_END)
+        if f.tell() != good:
+            # Torn write from a crash: keep only complete lines
+            f.truncate(good)
+        return f
+
+    @staticmethod
+    def read(path: str) -> List[Dict]:
+        """Return the complete, well-formed records of a journal file."""
+        if not os.path.exists(path):
+            return []
+        records = []
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        return records
+
+    def append(self, record: Dict) -> None:
+        """Queue a record for writing."""
+        self._queue.put(("append", (record, time.perf_counter())))
+
+    def compact(self, snapshot_path: str, build: Callable[[], Any]) -> None:
+        """Write ``build()`` as JSON to ``snapshot_path`` and empty the journal, in order with appends.
+
+        ``build`` runs on the writer thread, so the caller does not pay for
+        serializing the snapshot.
+        """
+        self._queue.put(("compact", (snapshot_path, build)))
+
+    def flush(self) -> None:
+        """Block until everything queued so far is on disk."""
+        self._queue.join()
+
+    def close(self) -> None:
+        self._queue.put((_CLOSE, None))
+        self._thread.join()
+        self._file.close()
+
+    def _run(self) -> None:
+        last_sync = 0.0
+        while True:
+            batch = [self._queue.get()]
+            # Group commit: gather records until the next sync is due
+            deadline = last_sync + self.flush_interval
+            while batch[-1][0] == "append":
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except Empty:
+                    break
+
+            appended = [arg for op, arg in batch if op == "append"]
+            lines = [json.dumps(record, ensure_ascii=False) + "\n" for record, _ in appended]
+            try:
+                started = time.perf_counter()
+                if lines:
+                    self._file.write("".join(lines).encode("utf-8"))
+                    self.records += len(lines)
+                self._sync()
+                last_sync = time.monotonic()
+                synced = time.perf_counter()
+                _SYNC_SECONDS.observe(synced - started)
+                for _, queued in appended:
+                    _PERSIST_SECONDS.observe(synced - queued)
+                op, arg = batch[-1]
+                if op == "compact":
+                    self._write_snapshot(*arg)
+            except OSError as e:
+                print(f"Journal write error: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if batch[-1][0] is _CLOSE:
+                return
+
+    def _sync(self) -> None:
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+            self.syncs += 1
+
+    def _write_snapshot(self, snapshot_path: str, build: Callable[[], Any]) -> None:
+        started = time.perf_counter()
+        tmp = snapshot_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(build(), f, ensure_ascii=False, indent=2)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, snapshot_path)
+        # Only once the snapshot is in place may the journal go
+        self._file.truncate(0)
+        self._file.seek(0)
+        self._sync()
+        self.records = 0
+        _COMPACT_SECONDS.observe(time.perf_counter() - started)
@@ -0,0 +1,106 @@
+from typing import Any, Optional, Sequence
+from .metrics import get_registry
+
+_DETECTIONS = get_registry().counter(
+    "voxa_language_detections_total", "Decodes that ran Whisper's language detection")
+_SKIPPED = get_registry().counter(
+    "voxa_language_detections_skipped_total", "Decodes that reused the pinned language instead of detecting it")
+_SWITCHES = get_registry().counter(
+    "voxa_language_switches_total", "Times a re-check pinned a different language")
+
+
+class LanguageDetector:
+    """Detects the spoken language of one stream once and pins it.
+
+    Whisper detects the language on every decode it is not given one,
+    which on short windows means paying for detection again and again and
+    lets the language flicker between windows. Here only decodes that
+    produced speech count: while nothing is pinned they run with
+    ``language=None`` and the first detection at ``min_probability`` or
+    above (or the best of ``max_attempts``) is pinned. Later decodes reuse
+    it and skip detection, until ``recheck_seconds`` of audio have passed
+    or ``low_confidence_decodes`` decodes in a row score an average log
+    probability below ``min_logprob``, a hint that the wrong language is
+    pinned; the next decode then detects again.
+    """
+
+    def __init__(self, min_probability: float = 0.7, max_attempts: int = 3,
+                 recheck_seconds: float = 120.0, min_logprob: float = -1.0,
+                 low_confidence_decodes: int = 3, candidates: Optional[Sequence[str]] = None):
+        self.min_probability = min_probability
+        self.max_attempts = max_attempts
+        self.recheck_seconds = recheck_seconds
+        self.min_logprob = min_logprob
+        self.low_confidence_decodes = low_confidence_decodes
+        self.candidates = tuple(candidates) if candidates else None  # restrict detection to these codes
+
+        self.language: Optional[str] = None  # pinned
+        self.probability = 0.0
+
+        # Statistics
+        self.detections = 0
+        self.skipped = 0
+        self.switches = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the pinned language (statistics are kept)."""
+        self.language = None
+        self.probability = 0.0
+        self._attempts = 0
+        self._best: Optional[tuple] = None  # (probability, language) over the current attempts
+        self._pinned_at = 0.0
+        self._low_confidence = 0
+        self._recheck = False
+
+    def language_for_decode(self) -> Optional[str]:
+        """The language to decode with, or None to have this decode detect it."""
+        if self.language is None or self._recheck:
+            return None
+        self.skipped += 1
+        _SKIPPED.inc()
+        return self.language
+
+    def observe(self, language: Optional[str], info: Any, segments: Sequence[Any], end: float) -> None:
+        """Update from a decode that ran with ``language`` and ended at ``end`` (capture-clock seconds)."""
+        if not segments:
+            return  # silence says nothing about the language
+        if language is None:
+            self._detected(info, end)
+            return
+
+        logprobs = [getattr(segment, "avg_logprob", 0.0) for segment in segments]
+        if sum(logprobs) / len(logprobs) < self.min_logprob:
+            self._low_confidence += 1
+        else:
+            self._low_confidence = 0
+        if self._low_confidence >= self.low_confidence_decodes or end - self._pinned_at >= self.recheck_seconds:
+            self._recheck = True
+
+    def _detected(self, info: Any, end: float) -> None:
+        self.detections += 1
+        _DETECTIONS.inc()
+        detected, probability = info.language, info.language_probability
+        if self.candidates is not None:
+            # all_language_probs lists every language Whisper scored, most likely first
+            scores = getattr(info, "all_language_probs", None) or [(detected, probability)]
+            detected, probability = next(((code, p) for code, p in scores if code in self.candidates),
+                                         (self.language or self.candidates[0], 0.0))
+
+        self._attempts += 1
+        if self._best is None or probability > self._best[0]:
+            self._best = (probability, detected)
+        if probability < self.min_probability and self._attempts < self.max_attempts:
+            return
+
+        probability, detected = self._best
+        if self.language is not None and detected != self.language:
+            self.switches += 1
+            _SWITCHES.inc()
+        self.language = detected
+        self.probability = probability
+        self._attempts = 0
+        self._best = None
+        self._pinned_at = end
+        self._low_confidence = 0
+        self._recheck = False
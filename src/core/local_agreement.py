@@ -0,0 +1,73 @@
+from typing import List, Optional, Tuple
+
+# (start, end, text) with absolute times in seconds
+Word = Tuple[float, float, str]
+
+_PUNCTUATION = ".,!?;:…\"'"
+
+
+def _normalize(word: str) -> str:
+    return word.strip().strip(_PUNCTUATION).lower()
+
+
+def join_words(words: List[Word]) -> str:
+    """Join Whisper word tokens (which carry their own leading spaces)."""
+    return "".join(word for _, _, word in words).strip()
+
+
+class HypothesisBuffer:
+    """Stable-prefix commit policy for streaming decoding (LocalAgreement-2).
+
+    Each new hypothesis for the growing audio window is compared against the
+    previous one; only the leading words both agree on are committed.
+    """
+
+    def __init__(self, tail_size: int = 5):
+        self.tail_size = tail_size
+        self.buffer: List[Word] = []  # previous, still uncommitted hypothesis
+        self.new: List[Word] = []
+        self.committed_tail: List[Word] = []
+        self.last_committed_time = 0.0
+
+    def insert(self, words: List[Word]) -> None:
+        """Register a new hypothesis, dropping words that were already committed."""
+        new = [word for word in words if word[0] > self.last_committed_time - 0.1]
+
+        # The model often re-emits the last committed words at the seam
+        if new and abs(new[0][0] - self.last_committed_time) < 1.0:
+            max_n = min(len(self.committed_tail), len(new), self.tail_size)
+            for n in range(max_n, 0, -1):
+                tail = [_normalize(w[2]) for w in self.committed_tail[-n:]]
+                head = [_normalize(w[2]) for w in new[:n]]
+                if tail == head:
+                    new = new[n:]
+                    break
+
+        self.new = new
+
+    def flush(self) -> List[Word]:
+        """Commit and return the common prefix of the last two hypotheses."""
+        commit: List[Word] = []
+        i = 0
+        while i < len(self.new) and i < len(self.buffer):
+            if _normalize(self.new[i][2]) != _normalize(self.buffer[i][2]):
+                break
+            commit.append(self.new[i])
+            i += 1
+
+        self.buffer = self.new[i:]
+        self.new = []
+        if commit:
+            self.last_committed_time = commit[-1][1]
+            self.committed_tail = (self.committed_tail + commit)[-self.tail_size:]
+        return commit
+
+    def uncommitted(self) -> List[Word]:
+        """Words of the latest hypothesis that are not committed yet."""
+        return list(self.buffer)
+
+    def reset(self, last_committed_time: Optional[float] = None) -> None:
+        self.buffer = []
+        self.new = []
+        self.committed_tail = []
+        self.last_committed_time = last_committed_time or 0.0
@@ -0,0 +1,126 @@
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
+
+ModelKey = Tuple[str, str, str]  # (model size, device, compute type)
+
+
+@lru_cache(maxsize=None)
+def detect_device() -> Tuple[str, str]:
+    """Return the (device, compute_type) pair to load models with.
+
+    Uses CTranslate2 (already required by faster-whisper) to look for a GPU,
+    so torch never has to be imported.
+    """
+    try:
+        import ctranslate2
+        if ctranslate2.get_cuda_device_count() > 0:
+            return "cuda", "float16"
+    except Exception:
+        pass
+    return "cpu", "int8"
+
+
+class ModelCache:
+    """Process-wide LRU cache of loaded Whisper models.
+
+    Models are keyed by (size, device, compute_type) and loaded on a
+    background thread; concurrent requests for the same key share one load.
+    Evicting a model only drops the cache's reference, so services still
+    holding it keep working.
+    """
+
+    def __init__(self, max_models: int = 2):
+        self.max_models = max_models
+        self.cpu_threads = 0  # CTranslate2 default; lowered when several processes share the CPU
+        self.num_workers = 1  # decodes a model runs in parallel when called from several threads
+        self._models: "OrderedDict[ModelKey, WhisperModel]" = OrderedDict()
+        self._loading: Dict[ModelKey, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-loader")
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model_size: str, device: Optional[str] = None,
+            compute_type: Optional[str] = None) -> ModelKey:
+        if device is None:
+            device = detect_device()[0]
+        if compute_type is None:
+            compute_type = "float16" if device == "cuda" else "int8"
+        return (model_size, device, compute_type)
+
+    def load_async(self, model_size: str, device: Optional[str] = None,
+                   compute_type: Optional[str] = None) -> Future:
+        """Return a future resolving to the model, loading it if needed."""
+        key = self.key(model_size, device, compute_type)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.hits += 1
+                future: Future = Future()
+                future.set_result(self._models[key])
+                return future
+            if key in self._loading:
+                self.hits += 1
+                return self._loading[key]
+
+            self.misses += 1
+            future = self._executor.submit(self._load, key)
+            self._loading[key] = future
+            return future
+
+    def get(self, model_size: str, device: Optional[str] = None,
+            compute_type: Optional[str] = None) -> "WhisperModel":
+        """Return the model, blocking until it is loaded."""
+        return self.load_async(model_size, device, compute_type).result()
+
+    def is_loaded(self, model_size: str, device: Optional[str] = None,
+                  compute_type: Optional[str] = None) -> bool:
+        return self.key(model_size, device, compute_type) in self._models
+
+    def evict(self, model_size: str, device: Optional[str] = None,
+              compute_type: Optional[str] = None) -> None:
+        with self._lock:
+            self._models.pop(self.key(model_size, device, compute_type), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+    def _load(self, key: ModelKey) -> "WhisperModel":
+        from faster_whisper import WhisperModel
+
+        model_size, device, compute_type = key
+        try:
+            model = WhisperModel(model_size, device=device, compute_type=compute_type,
+                                 cpu_threads=self.cpu_threads, num_workers=self.num_workers)
+        except Exception:
+            with self._lock:
+                self._loading.pop(key, None)
+            raise
+
+        with self._lock:
+            self._models[key] = model
+            self._loading.pop(key, None)
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+        return model
+
+
+_cache: Optional[ModelCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_model_cache() -> ModelCache:
+    """Return the process-wide model cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ModelCache()
+        return _cache
@@ -0,0 +1,77 @@
+from queue import Queue
+import time
+from typing import Any, List, Sequence
+from .metrics import get_registry
+from .model_cache import get_model_cache
+
+_WAIT_SECONDS = get_registry().histogram(
+    "voxa_model_pool_wait_seconds", "Time a decode waited for a free model in the pool")
+
+
+class ModelPool:
+    """A fixed set of model slots shared by many transcription sessions.
+
+    Every decode checks a model out for its duration, so at most ``size``
+    decodes run at once however many streams are connected; the rest wait
+    their turn. ``wait_seconds`` is a moving average of that wait, which
+    the server uses to turn new streams away before the ones it already
+    serves fall behind.
+    """
+
+    def __init__(self, models: Sequence[Any], smoothing: float = 0.2):
+        self.size = len(models)
+        self.smoothing = smoothing
+        self._idle: Queue = Queue()
+        for model in models:
+            self._idle.put(model)
+        self.wait_seconds = 0.0
+        self.decodes = 0
+        get_registry().gauge("voxa_model_pool_busy", "Models in the pool running a decode",
+                             fn=lambda: self.busy)
+
+    @classmethod
+    def load(cls, model_size: str = "base", size: int = 2, cpu_threads: int = 0) -> "ModelPool":
+        """Load ``model_size`` once with ``size`` CTranslate2 workers, one slot each.
+
+        The workers share the weights, so slots cost memory for activations
+        only; ``cpu_threads`` are the threads each decode uses.
+        """
+        cache = get_model_cache()
+        cache.num_workers = size
+        cache.cpu_threads = cpu_threads
+        model = cache.get(model_size)
+        return cls([model] * size)
+
+    @property
+    def busy(self) -> int:
+        return self.size - self._idle.qsize()
+
+    def model(self) -> "PooledModel":
+        """A model-like handle for one TranscriptionService."""
+        return PooledModel(self)
+
+    def transcribe(self, audio, **kwargs):
+        """Decode on the first free model; segments are returned already decoded."""
+        started = time.perf_counter()
+        model = self._idle.get()
+        waited = time.perf_counter() - started
+        _WAIT_SECONDS.observe(waited)
+        self.wait_seconds += self.smoothing * (waited - self.wait_seconds)
+        try:
+            segments, info = model.transcribe(audio, **kwargs)
+            # faster-whisper decodes lazily; finish before handing the model back
+            segments: List = list(segments)
+        finally:
+            self._idle.put(model)
+        self.decodes += 1
+        return iter(segments), info
+
+
+class PooledModel:
+    """Stands in for a WhisperModel, running each ``transcribe`` on the pool."""
+
+    def __init__(self, pool: ModelPool):
+        self.pool = pool
+
+    def transcribe(self, audio, **kwargs):
+        return self.pool.transcribe(audio, **kwargs)
@@ -0,0 +1,142 @@
+import time
+from typing import TYPE_CHECKING, List, NamedTuple, Optional
+from .model_cache import detect_device, get_model_cache
+
+if TYPE_CHECKING:
+    from ..services.transcription_service import TranscriptionService
+
+
+class QualityLevel(NamedTuple):
+    model_size: str
+    beam_size: int
+    window_seconds: float  # fixed-window mode
+    step_seconds: float  # streaming mode
+    cost: float  # rough decode cost relative to base with beam search
+
+
+# Cheapest first; the service defaults correspond to ("base", 5, 2.0, 0.5)
+CPU_LEVELS = [
+    QualityLevel("tiny", 1, 3.0, 1.0, 0.3),
+    QualityLevel("base", 1, 2.5, 0.75, 0.6),
+    QualityLevel("base", 5, 2.0, 0.5, 1.0),
+    QualityLevel("small", 5, 2.0, 0.5, 2.5),
+]
+GPU_LEVELS = CPU_LEVELS + [
+    QualityLevel("medium", 5, 2.0, 0.5, 6.0),
+]
+
+
+class QualityScheduler:
+    """Moves a TranscriptionService up and down a ladder of decode settings.
+
+    Every ``interval`` seconds it measures the real-time factor (decode
+    seconds per second of audio sent to the model, so silence dropped by
+    the VAD does not pass for headroom) and the capture backlog. Sustained
+    pressure steps down at once; sustained headroom, judged against the
+    estimated cost of the next level, first preloads that level's model in
+    the background and steps up once it is ready.
+    """
+
+    def __init__(self, levels: Optional[List[QualityLevel]] = None, start_level: Optional[int] = None,
+                 interval: float = 2.0, high_rtf: float = 0.8, low_rtf: float = 0.5,
+                 max_backlog: float = 2.0, down_after: float = 4.0, up_after: float = 20.0,
+                 cooldown: float = 6.0):
+        if levels is None:
+            levels = GPU_LEVELS if detect_device()[0] == "cuda" else CPU_LEVELS
+        self.levels = levels
+        self.level_index = min(2, len(levels) - 1) if start_level is None else start_level
+        self.interval = interval
+        self.high_rtf = high_rtf
+        self.low_rtf = low_rtf
+        self.max_backlog = max_backlog
+        self.down_after = down_after
+        self.up_after = up_after
+        self.cooldown = cooldown
+
+        self.rtf: Optional[float] = None  # smoothed
+        self.backlog_seconds = 0.0
+        self.changes = 0
+        self._last_check: Optional[float] = None
+        self._last_decode = 0.0
+        self._last_speech = 0.0
+        self._pressure_since: Optional[float] = None
+        self._headroom_since: Optional[float] = None
+        self._hold_until = 0.0
+
+    @property
+    def level(self) -> QualityLevel:
+        return self.levels[self.level_index]
+
+    def apply(self, service: "TranscriptionService") -> None:
+        """Configure the service for the current level."""
+        level = self.level
+        service.beam_size = level.beam_size
+        service.window_samples = int(level.window_seconds * service.SAMPLE_RATE)
+        service.step_samples = int(level.step_seconds * service.SAMPLE_RATE)
+        if level.model_size != service.model_size:
+            # The current model keeps serving until this one is loaded
+            service.load_model(level.model_size)
+
+    def observe(self, service: "TranscriptionService") -> None:
+        """Sample the service's counters and change level if warranted."""
+        now = time.monotonic()
+        if self._last_check is None:
+            self._reset_window(service, now)
+            return
+        if now - self._last_check < self.interval:
+            return
+
+        audio = service.speech_seconds - self._last_speech
+        decode = service.decode_seconds - self._last_decode
+        self._reset_window(service, now)
+        self.backlog_seconds = service.backlog_seconds
+        if audio <= 0:
+            return  # nothing reached the model, e.g. a pause: no evidence either way
+        rtf = decode / audio
+        self.rtf = rtf if self.rtf is None else 0.7 * self.rtf + 0.3 * rtf
+
+        if now < self._hold_until:
+            return
+
+        if self.rtf > self.high_rtf or self.backlog_seconds > self.max_backlog:
+            self._headroom_since = None
+            if self._pressure_since is None:
+                self._pressure_since = now
+            elif now - self._pressure_since >= self.down_after and self.level_index > 0:
+                self._change(service, self.level_index - 1, now)
+            return
+        self._pressure_since = None
+
+        if self.level_index + 1 >= len(self.levels):
+            return
+        upper = self.levels[self.level_index + 1]
+        predicted = self.rtf * upper.cost / self.level.cost
+        if predicted >= self.low_rtf or self.backlog_seconds > self.max_backlog / 4:
+            self._headroom_since = None
+            return
+
+        if self._headroom_since is None:
+            self._headroom_since = now
+        if upper.model_size != self.level.model_size and now - self._headroom_since >= self.up_after / 2:
+            get_model_cache().load_async(upper.model_size)  # no-op once loaded or loading
+        if now - self._headroom_since >= self.up_after and (
+                upper.model_size == self.level.model_size or get_model_cache().is_loaded(upper.model_size)):
+            self._change(service, self.level_index + 1, now)
+
+    def _reset_window(self, service: "TranscriptionService", now: float) -> None:
+        self._last_check = now
+        self._last_speech = service.speech_seconds
+        self._last_decode = service.decode_seconds
+
+    def _change(self, service: "TranscriptionService", index: int, now: float) -> None:
+        old = self.level
+        self.level_index = index
+        self.changes += 1
+        # Expect the cost to scale with the level until new measurements arrive
+        self.rtf *= self.level.cost / old.cost
+        self._pressure_since = None
+        self._headroom_since = None
+        self._hold_until = now + self.cooldown
+        print(f"Quality: {old.model_size}/beam {old.beam_size} -> "
+              f"{self.level.model_size}/beam {self.level.beam_size} (RTF {self.rtf:.2f})")
+        self.apply(service)
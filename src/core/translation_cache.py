@@ -0,0 +1,148 @@
+from collections import OrderedDict
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+CacheKey = Tuple[str, str, str]  # (source, target, normalized text)
+
+
+def normalize(text: str) -> str:
+    """Cache key form of a segment: trimmed, single-spaced, case-folded."""
+    return " ".join(text.split()).casefold()
+
+
+class TranslationCache:
+    """Two-tier translation cache: a bounded in-memory LRU over optional SQLite.
+
+    Entries expire ``max_age`` seconds after they were stored. The memory
+    tier holds ``max_entries`` translations; the SQLite tier, if ``db_path``
+    is given, survives restarts and is trimmed to ``max_db_entries`` by
+    last use.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_age: float = 30 * 24 * 3600,
+                 db_path: Optional[str] = None, max_db_entries: int = 50000):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.max_db_entries = max_db_entries
+        self._memory: "OrderedDict[CacheKey, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes = 0
+
+        # Statistics
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if db_path is not None:
+            self._open(db_path)
+
+    def _open(self, db_path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        try:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " source TEXT, target TEXT, text TEXT, translation TEXT,"
+                " created REAL, used REAL, PRIMARY KEY (source, target, text))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS translations_used ON translations (used)")
+            self._db.execute("DELETE FROM translations WHERE created < ?", (time.time() - self.max_age,))
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Translation cache error: {e}")
+            self._db = None
+
+    def get(self, source: str, target: str, text: str) -> Optional[str]:
+        """Return the cached translation, or None on a miss."""
+        key = (source, target, normalize(text))
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[1] < self.max_age:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._memory[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT translation, created FROM translations"
+                        " WHERE source = ? AND target = ? AND text = ? AND created >= ?",
+                        key + (now - self.max_age,)
+                    ).fetchone()
+                    if row is not None:
+                        self._db.execute(
+                            "UPDATE translations SET used = ? WHERE source = ? AND target = ? AND text = ?",
+                            (now,) + key
+                        )
+                        self._db.commit()
+                        self._remember(key, row[0], row[1])
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return row[0]
+                except sqlite3.Error as e:
+                    print(f"Translation cache error: {e}")
+
+            self.misses += 1
+            return None
+
+    def put(self, source: str, target: str, text: str, translation: str) -> None:
+        """Store a translation in both tiers."""
+        key = (source, target, normalize(text))
+        now = time.time()
+        with self._lock:
+            self._remember(key, translation, now)
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)",
+                    key + (translation, now, now)
+                )
+                self._writes += 1
+                # Trimming needs a scan, so only do it every few hundred writes
+                if self._writes % 256 == 0:
+                    self._db.execute(
+                        "DELETE FROM translations WHERE rowid IN (SELECT rowid FROM translations"
+                        " ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                        (self.max_db_entries,)
+                    )
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Translation cache error: {e}")
+
+    def _remember(self, key: CacheKey, translation: str, created: float) -> None:
+        self._memory[key] = (translation, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every cached translation, on disk too."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM translations")
+                self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,137 @@
+from collections import deque
+from typing import List, NamedTuple, Optional
+import numpy as np
+
+
+class SpeechChunk(NamedTuple):
+    """Audio the segmenter let through, in capture order."""
+    start: int  # absolute sample index of samples[0]
+    samples: np.ndarray
+    end_of_utterance: bool
+
+
+class VADSegmenter:
+    """Streaming energy-based voice activity detection and endpointing.
+
+    Frames are classified against an adaptive noise floor; an utterance
+    starts after a few consecutive speech frames (a short pre-roll is kept
+    so onsets are not clipped) and ends after a pause, or once it reaches
+    ``max_utterance_seconds`` at the next quiet frame. Silent frames are
+    never returned, so callers only hand speech to the model.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 32,
+                 threshold_db: float = 9.0, min_speech_db: float = -50.0,
+                 start_ms: int = 96, end_silence_ms: int = 500,
+                 pre_roll_ms: int = 300, max_utterance_seconds: float = 15.0,
+                 max_grace_seconds: float = 1.0, noise_rise_db: float = 0.05):
+        self.sample_rate = sample_rate
+        self.frame_size = int(sample_rate * frame_ms / 1000)
+        self.threshold_db = threshold_db
+        self.min_speech_db = min_speech_db
+        self.noise_rise_db = noise_rise_db
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.end_frames = max(1, end_silence_ms // frame_ms)
+        self.max_frames = int(max_utterance_seconds * 1000 / frame_ms)
+        self.grace_frames = int(max_grace_seconds * 1000 / frame_ms)
+        self._preroll: deque = deque(maxlen=max(self.start_frames, pre_roll_ms // frame_ms))
+
+        # Statistics
+        self.total_frames = 0
+        self.speech_frames = 0
+        self.utterances = 0
+
+        self.reset()
+
+    @property
+    def in_utterance(self) -> bool:
+        return self._in_utterance
+
+    def reset(self) -> None:
+        """Forget the current utterance, noise estimate and sample clock."""
+        self._carry = np.zeros(0, dtype=np.float32)
+        self._frame_count = 0
+        self._noise_db = self.min_speech_db - self.threshold_db
+        self._in_utterance = False
+        self._trigger = 0
+        self._silence_run = 0
+        self._utterance_frames = 0
+        self._preroll.clear()
+
+    def skip(self, samples: int) -> None:
+        """Advance the sample clock over audio that was dropped upstream.
+
+        Any open utterance is abandoned; the caller is expected to have
+        finished it already.
+        """
+        self._carry = np.zeros(0, dtype=np.float32)
+        self._frame_count += round(samples / self.frame_size)
+        self._in_utterance = False
+        self._trigger = 0
+        self._preroll.clear()
+
+    def process(self, chunk: np.ndarray) -> List[SpeechChunk]:
+        """Classify a block of samples and return the speech it contains."""
+        chunk = np.asarray(chunk, dtype=np.float32).reshape(-1)
+        data = np.concatenate((self._carry, chunk)) if len(self._carry) else chunk
+        size = self.frame_size
+        n = len(data) // size
+        # Copies: the caller may reuse the memory behind ``chunk`` (a shared ring, for one)
+        self._carry = data[n * size:].copy()
+        if n == 0:
+            return []
+
+        frames = data[:n * size].reshape(n, size)
+        energy = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+
+        out: List[SpeechChunk] = []
+        base = self._frame_count
+        run_start: Optional[int] = 0 if self._in_utterance else None
+
+        for i, frame_energy in enumerate(energy):
+            speech = self._classify(float(frame_energy))
+
+            if not self._in_utterance:
+                self._preroll.append((base + i, frames[i].copy()))
+                self._trigger = self._trigger + 1 if speech else 0
+                if self._trigger >= self.start_frames:
+                    first = self._preroll[0][0]
+                    samples = np.concatenate([frame for _, frame in self._preroll])
+                    out.append(SpeechChunk(first * size, samples, False))
+                    self._utterance_frames = len(self._preroll)
+                    self.speech_frames += len(self._preroll)
+                    self._preroll.clear()
+                    self._in_utterance = True
+                    self._silence_run = 0
+                    run_start = i + 1
+                continue
+
+            self._utterance_frames += 1
+            self.speech_frames += 1
+            self._silence_run = 0 if speech else self._silence_run + 1
+            too_long = self._utterance_frames >= self.max_frames and (
+                not speech or self._utterance_frames >= self.max_frames + self.grace_frames
+            )
+            if self._silence_run >= self.end_frames or too_long:
+                out.append(SpeechChunk((base + run_start) * size, data[run_start * size:(i + 1) * size], True))
+                self.utterances += 1
+                self._in_utterance = False
+                self._trigger = 0
+                run_start = None
+
+        if self._in_utterance and run_start is not None and run_start < n:
+            out.append(SpeechChunk((base + run_start) * size, data[run_start * size:n * size], False))
+
+        self._frame_count += n
+        self.total_frames += n
+        return out
+
+    def _classify(self, energy_db: float) -> bool:
+        """Compare a frame against the noise floor and update the floor."""
+        speech = energy_db > max(self._noise_db + self.threshold_db, self.min_speech_db)
+        if speech:
+            # Drift up slowly so a sustained rise in background hum stops counting as speech
+            self._noise_db = min(energy_db, self._noise_db + self.noise_rise_db)
+        else:
+            self._noise_db += 0.1 * (energy_db - self._noise_db)
+        return speech
@@ -1,40 +1,30 @@
-import sounddevice as sd
 import numpy as np
 from queue import Queue
 from typing import Optional, List, Dict
-from pycaw.pycaw import AudioUtilities, ISimpleAudioVolume
-import psutil
-import win32gui
-import win32process
+from ..core.metrics import get_registry
+from .audio_sources import AudioSource, CableSource
+
+_CAPTURED_SECONDS = get_registry().counter(
+    "voxa_audio_captured_seconds_total", "Seconds of audio received from the capture backend")
 
 class AudioService:
-    def __init__(self, audio_queue: Queue, sample_rate: int = 16000):
+    def __init__(self, audio_queue: Queue, sample_rate: int = 16000, source: Optional[AudioSource] = None):
         self.audio_queue = audio_queue
         self.sample_rate = sample_rate
         self.recording = False
-        self.stream: Optional[sd.InputStream] = None
         self.selected_app: Optional[Dict] = None
         
-        # Find CABLE Output device
-        self.cable_device = None
-        for idx, device in enumerate(sd.query_devices()):
-            if "CABLE Output" in device['name']:
-                self.cable_device = idx
-                break
+        # Capture backend; VB-Cable unless another source is given
+        self.source = source or CableSource(sample_rate)
     
     @staticmethod
     def list_applications() -> List[Dict]:
-        """List all applications with audio sessions."""
+        """List all applications with audio sessions (Windows only)."""
+        from pycaw.pycaw import AudioUtilities
+        
         apps = []
         sessions = AudioUtilities.GetAllSessions()
         
-        def get_app_name(pid):
-            try:
-                process = psutil.Process(pid)
-                return process.name()
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                return None
-        
         for session in sessions:
             if session.Process and session.Process.name() != "System":
                 app_name = session.Process.name()
@@ -56,45 +46,29 @@ class AudioService:
                 self.selected_app = app
                 break
     
-    def audio_callback(self, indata: np.ndarray, frames: int, time, status: sd.CallbackFlags) -> None:
-        """Callback function for the audio stream."""
-        if status:
-            print(f"Audio callback status: {status}")
+    def audio_callback(self, audio_data: np.ndarray) -> None:
+        """Receive a mono block from the capture backend."""
         if self.recording:
-            # Convert to mono if stereo
-            if len(indata.shape) > 1:
-                audio_data = indata.mean(axis=1)
-            else:
-                audio_data = indata.copy()
-            
             self.audio_queue.put(audio_data)
+            _CAPTURED_SECONDS.inc(len(audio_data) / self.sample_rate)
+    
+    def is_available(self) -> bool:
+        """Whether the selected capture backend can be started."""
+        return self.source.is_available()
     
     def start_recording(self) -> None:
-        """Start recording audio from VB-Cable Output."""
-        if self.cable_device is None:
-            raise ValueError("VB-Cable não encontrado. Por favor instale o VB-Cable de https://vb-audio.com/Cable/")
+        """Start recording audio from the selected source."""
+        if not self.source.is_available():
+            raise ValueError(self.source.status())
         
         self.recording = True
-        self.stream = sd.InputStream(
-            device=self.cable_device,
-            samplerate=self.sample_rate,
-            channels=1,
-            dtype=np.float32,
-            callback=self.audio_callback,
-            blocksize=4096
-        )
-        self.stream.start()
+        self.source.start(self.audio_callback)
     
     def stop_recording(self) -> None:
         """Stop recording audio."""
         self.recording = False
-        if self.stream is not None:
-            self.stream.stop()
-            self.stream.close()
-            self.stream = None
+        self.source.stop()
     
     def get_status(self) -> str:
         """Get the current status of the audio service."""
-        if self.cable_device is None:
-            return "VB-Cable não encontrado. Por favor instale o VB-Cable de https://vb-audio.com/Cable/"
-        return "Pronto para gravar" 
\ No newline at end of file
+        return self.source.status()
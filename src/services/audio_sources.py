@@ -0,0 +1,293 @@
+from abc import ABC, abstractmethod
+import os
+import threading
+import time
+from typing import Callable, Optional
+import numpy as np
+from ..core.metrics import get_registry
+from ..utils.audio_buffer import FrameRing
+from ..utils.resampler import StreamingResampler
+
+# Receives mono float32 blocks at the source's sample rate
+BlockCallback = Callable[[np.ndarray], None]
+
+_CALLBACK_SECONDS = get_registry().histogram(
+    "voxa_audio_callback_seconds", "Time spent in the real-time capture callback")
+
+
+class AudioSource(ABC):
+    """A capture backend feeding mono float32 blocks to ``AudioService``.
+
+    Backends import their platform modules lazily, so selecting one never
+    pulls in the dependencies of the others.
+    """
+
+    sample_rate: int = 16000
+
+    @abstractmethod
+    def is_available(self) -> bool:
+        """Whether the source can be started."""
+
+    @abstractmethod
+    def status(self) -> str:
+        """User-facing status message."""
+
+    @abstractmethod
+    def start(self, callback: BlockCallback) -> None:
+        """Start delivering blocks to ``callback``."""
+
+    @abstractmethod
+    def stop(self) -> None:
+        """Stop delivering blocks and release the device."""
+
+
+class SoundDeviceSource(AudioSource):
+    """Captures from an input device via sounddevice, by name or the system default.
+
+    The stream is opened at the device's native rate and channel count, so
+    the driver never resamples. The real-time callback only copies each
+    block into a preallocated ``FrameRing``; a pump thread downmixes,
+    resamples to ``sample_rate`` into preallocated buffers and hands on
+    blocks of ``blocksize`` samples.
+    """
+
+    RING_SECONDS = 2.0
+    POLL_INTERVAL = 0.02
+
+    def __init__(self, device_name: Optional[str] = None, sample_rate: int = 16000,
+                 blocksize: int = 4096):
+        self.device_name = device_name
+        self.sample_rate = sample_rate
+        self.blocksize = blocksize
+        self.stream = None
+        self._callback: Optional[BlockCallback] = None
+        self.device = self._find_device()
+        self.native_rate: Optional[int] = None
+        self.channels: Optional[int] = None
+        self.overflows = 0  # blocks the device flagged as input overflow
+        self.status_flags = 0  # blocks with any status flag
+        self._ring: Optional[FrameRing] = None
+        self._pump_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # Callback durations, written by the audio thread and drained by the pump
+        self._timings = np.zeros(256, dtype=np.float64)
+        self._callbacks = 0
+        self._timings_seen = 0
+
+    def _find_device(self) -> Optional[int]:
+        try:
+            import sounddevice as sd
+            devices = sd.query_devices()
+        except Exception as e:  # PortAudio missing or no audio subsystem
+            print(f"Audio devices unavailable: {e}")
+            return None
+
+        if self.device_name is None:
+            default = sd.default.device[0]
+            return default if default is not None and default >= 0 else None
+        for idx, device in enumerate(devices):
+            if self.device_name in device['name'] and device['max_input_channels'] > 0:
+                return idx
+        return None
+
+    def is_available(self) -> bool:
+        return self.device is not None
+
+    def status(self) -> str:
+        if self.device is None:
+            return f"Dispositivo de áudio '{self.device_name or 'padrão'}' não encontrado"
+        return "Pronto para gravar"
+
+    def _on_audio(self, indata: np.ndarray, frames: int, time_info, status) -> None:
+        # Runs on PortAudio's real-time thread: no allocation, locks, I/O or prints
+        started = time.perf_counter()
+        if status:
+            self.status_flags += 1
+            if status.input_overflow:
+                self.overflows += 1
+        self._ring.write(indata)
+        self._timings[self._callbacks % len(self._timings)] = time.perf_counter() - started
+        self._callbacks += 1
+
+    def start(self, callback: BlockCallback) -> None:
+        import sounddevice as sd
+
+        info = sd.query_devices(self.device, "input")
+        self.native_rate = int(info['default_samplerate'])
+        self.channels = max(1, int(info['max_input_channels']))
+        self._prepare(callback)
+        self.stream = sd.InputStream(
+            device=self.device,
+            samplerate=self.native_rate,
+            channels=self.channels,
+            dtype=np.float32,
+            callback=self._on_audio,
+            blocksize=0  # whatever the host API prefers
+        )
+        self._pump_thread.start()
+        self.stream.start()
+
+    def _prepare(self, callback: BlockCallback) -> None:
+        """Allocate every buffer the capture path needs before audio starts flowing."""
+        self._callback = callback
+        self._ring = FrameRing(int(self.native_rate * self.RING_SECONDS), self.channels)
+        self._resampler = StreamingResampler(self.native_rate, self.sample_rate)
+        chunk = max(1, int(self.native_rate * self.POLL_INTERVAL * 4))
+        self._resampler.reserve(chunk)
+        self._frames = np.zeros((chunk, self.channels), dtype=np.float32)
+        self._mono = np.zeros(chunk, dtype=np.float32)
+        self._resampled = np.zeros(chunk * self.sample_rate // self.native_rate + 2, dtype=np.float32)
+        self._block = np.zeros(self.blocksize, dtype=np.float32)
+        self._filled = 0
+
+        registry = get_registry()
+        registry.counter("voxa_audio_overflows_total", "Capture blocks where the device reported an input overflow",
+                         fn=lambda: self.overflows)
+        registry.counter("voxa_audio_callback_status_total", "Capture blocks that arrived with any status flag set",
+                         fn=lambda: self.status_flags)
+        registry.counter("voxa_audio_ring_overruns_total", "Capture blocks dropped because the pump fell behind",
+                         fn=lambda: self._ring.overruns)
+        self._stop.clear()
+        self._pump_thread = threading.Thread(target=self._pump, name="audio-pump", daemon=True)
+
+    def _pump(self) -> None:
+        while not self._stop.wait(self.POLL_INTERVAL):
+            self._drain()
+        self._drain()
+        if self._filled:
+            self._callback(self._block[:self._filled].copy())
+            self._filled = 0
+
+    def _drain(self) -> None:
+        """Downmix, resample and forward whatever the callback has queued."""
+        self._record_timings()
+        while True:
+            n = self._ring.read_into(self._frames)
+            if n == 0:
+                return
+            mono = self._mono[:n]
+            if self.channels == 1:
+                mono[:] = self._frames[:n, 0]
+            else:
+                np.mean(self._frames[:n], axis=1, out=mono)
+            count = self._resampler.process_into(mono, self._resampled)
+            self._emit(self._resampled[:count])
+
+    def _emit(self, samples: np.ndarray) -> None:
+        while len(samples):
+            take = min(len(samples), self.blocksize - self._filled)
+            self._block[self._filled:self._filled + take] = samples[:take]
+            self._filled += take
+            samples = samples[take:]
+            if self._filled == self.blocksize:
+                # The consumer keeps the block, so it gets its own copy
+                self._callback(self._block.copy())
+                self._filled = 0
+
+    def _record_timings(self) -> None:
+        callbacks = self._callbacks
+        first = max(self._timings_seen, callbacks - len(self._timings))
+        for i in range(first, callbacks):
+            _CALLBACK_SECONDS.observe(float(self._timings[i % len(self._timings)]))
+        self._timings_seen = callbacks
+
+    def stop(self) -> None:
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+        if self._pump_thread is not None:
+            self._stop.set()
+            self._pump_thread.join()
+            self._pump_thread = None
+
+
+class CableSource(SoundDeviceSource):
+    """Captures the VB-Cable virtual device ("CABLE Output")."""
+
+    INSTALL_MESSAGE = "VB-Cable não encontrado. Por favor instale o VB-Cable de https://vb-audio.com/Cable/"
+
+    def __init__(self, sample_rate: int = 16000, blocksize: int = 4096):
+        super().__init__("CABLE Output", sample_rate, blocksize)
+
+    def status(self) -> str:
+        if self.device is None:
+            return self.INSTALL_MESSAGE
+        return "Pronto para gravar"
+
+
+class FileReplaySource(AudioSource):
+    """Replays an audio file as if it were captured live, at ``speed`` x real time.
+
+    ``speed=0`` delivers blocks as fast as the consumer accepts them.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0, sample_rate: int = 16000,
+                 blocksize: int = 4096, loop: bool = False):
+        self.path = path
+        self.speed = speed
+        self.sample_rate = sample_rate
+        self.blocksize = blocksize
+        self.loop = loop
+        self.thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def is_available(self) -> bool:
+        return os.path.isfile(self.path)
+
+    def status(self) -> str:
+        if not self.is_available():
+            return f"Arquivo não encontrado: {self.path}"
+        return f"Pronto para reproduzir {self.path}"
+
+    def start(self, callback: BlockCallback) -> None:
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._run, args=(callback,), daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def _run(self, callback: BlockCallback) -> None:
+        from ..utils.audio_io import AudioFileReader
+
+        reader = AudioFileReader(self.path, self.sample_rate)
+        started = time.perf_counter()
+        delivered = 0
+        while not self._stop.is_set():
+            for block in reader.blocks(self.blocksize / self.sample_rate):
+                for start in range(0, len(block), self.blocksize):
+                    if self._stop.is_set():
+                        return
+                    chunk = block[start:start + self.blocksize]
+                    delivered += len(chunk)
+                    if self.speed > 0:
+                        delay = started + delivered / self.sample_rate / self.speed - time.perf_counter()
+                        if delay > 0 and self._stop.wait(delay):
+                            return
+                    callback(chunk)
+            if not self.loop:
+                return
+
+
+def create_audio_source(spec: str = "cable", sample_rate: int = 16000) -> AudioSource:
+    """Build a source from a spec string.
+
+    ``cable`` (VB-Cable), ``default`` (system input), ``device:<name>``
+    (first input device whose name contains ``<name>``) or
+    ``file:<path>[@<speed>]`` (replay a file, e.g. ``file:call.wav@4``).
+    """
+    kind, _, arg = spec.partition(":")
+    if kind == "cable":
+        return CableSource(sample_rate)
+    if kind == "default":
+        return SoundDeviceSource(None, sample_rate)
+    if kind == "device" and arg:
+        return SoundDeviceSource(arg, sample_rate)
+    if kind == "file" and arg:
+        path, _, speed = arg.rpartition("@") if "@" in arg else (arg, "", "")
+        return FileReplaySource(path, float(speed) if speed else 1.0, sample_rate)
+    raise ValueError(f"Fonte de áudio inválida: {spec}")
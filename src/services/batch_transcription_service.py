@@ -0,0 +1,259 @@
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass
+from queue import Queue
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+import numpy as np
+from .transcription_service import TranscriptionService
+from ..core.events import TranscriptEvent, FINAL
+from ..utils.audio_buffer import AudioRingBuffer
+
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
+
+
+class _Stream:
+    def __init__(self, stream_id: str, text_queue: Queue, language: str, capacity: int):
+        self.id = stream_id
+        self.text_queue = text_queue
+        self.language = language
+        self.buffer = AudioRingBuffer(capacity)
+        self.closing = False
+        self.audio_seconds = 0.0
+
+
+@dataclass
+class _Window:
+    stream: _Stream
+    audio: np.ndarray
+    start: float  # seconds on the stream's own clock
+    new_seconds: float  # audio not already covered by the previous window
+
+
+class BatchTranscriptionService:
+    """Transcribes many independent audio streams on one shared WhisperModel.
+
+    Each stream is buffered separately; whenever windows are ready the
+    scheduler thread takes at most one window per stream, least recently
+    served first, and decodes them as a single batch. Results are routed to
+    the stream's own ``text_queue`` as final ``TranscriptEvent``s, followed by
+    ``None`` once a closed stream is fully drained.
+    """
+
+    SAMPLE_RATE = TranscriptionService.SAMPLE_RATE
+
+    def __init__(self, model: Optional["WhisperModel"] = None, model_size: str = "base",
+                 batch_size: int = 8, window_seconds: float = 2.0,
+                 overlap_seconds: float = 0.25, buffer_seconds: float = 28.0,
+                 silence_db: float = -50.0):
+        self.model = model if model is not None else TranscriptionService.create_model(model_size)
+        try:
+            from faster_whisper import BatchedInferencePipeline
+            self.pipeline = BatchedInferencePipeline(self.model)
+        except ImportError:  # faster-whisper < 1.0
+            self.pipeline = None
+        self.batch_size = batch_size
+        self.window_samples = int(window_seconds * self.SAMPLE_RATE)
+        self.overlap_samples = int(overlap_seconds * self.SAMPLE_RATE)
+        self.capacity = int(buffer_seconds * self.SAMPLE_RATE)
+        self.silence_db = silence_db
+
+        self.running = False
+        self.scheduler_thread: Optional[threading.Thread] = None
+        self._streams: Dict[str, _Stream] = {}
+        self._order: deque = deque()  # stream ids, least recently served first
+        self._cond = threading.Condition()
+        self._next_id = 0
+
+        # Statistics
+        self.batches = 0
+        self.windows = 0
+        self.skipped_silent = 0
+        self.failed_windows = 0  # windows whose batch failed to decode, dropped
+        self.stream_seconds = 0.0
+        self.inference_seconds = 0.0
+        self._started_at: Optional[float] = None
+
+    def add_stream(self, language: str = "en", text_queue: Optional[Queue] = None,
+                   stream_id: Optional[str] = None) -> str:
+        """Register a new audio stream and return its id."""
+        with self._cond:
+            if stream_id is None:
+                stream_id = f"stream-{self._next_id}"
+                self._next_id += 1
+            if stream_id in self._streams:
+                raise ValueError(f"Stream {stream_id} already exists")
+            stream = _Stream(stream_id, text_queue or Queue(), language, self.capacity)
+            self._streams[stream_id] = stream
+            self._order.append(stream_id)
+            return stream_id
+
+    def text_queue(self, stream_id: str) -> Queue:
+        """Queue that receives the transcripts of a stream."""
+        return self._streams[stream_id].text_queue
+
+    def set_language(self, stream_id: str, language: str) -> None:
+        with self._cond:
+            self._streams[stream_id].language = language
+
+    def feed(self, stream_id: str, audio_chunk: np.ndarray) -> None:
+        """Append 16 kHz mono float32 samples to a stream."""
+        with self._cond:
+            stream = self._streams[stream_id]
+            stream.buffer.write(audio_chunk)
+            if len(stream.buffer) >= self.window_samples:
+                self._cond.notify()
+
+    def close_stream(self, stream_id: str) -> None:
+        """Transcribe what is left of a stream, then drop it."""
+        with self._cond:
+            self._streams[stream_id].closing = True
+            self._cond.notify()
+
+    def start(self) -> None:
+        """Start the batch scheduler."""
+        self.running = True
+        self._started_at = time.perf_counter()
+        self.scheduler_thread = threading.Thread(target=self._schedule, daemon=True)
+        self.scheduler_thread.start()
+
+    def stop(self) -> None:
+        """Stop the batch scheduler; buffered audio that was not decoded is dropped."""
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+        if self.scheduler_thread:
+            self.scheduler_thread.join()
+            self.scheduler_thread = None
+
+    def stats(self) -> Dict:
+        """Throughput counters; ``throughput`` is stream-seconds per wall-second."""
+        wall = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            "streams": len(self._streams),
+            "batches": self.batches,
+            "windows": self.windows,
+            "skipped_silent": self.skipped_silent,
+            "failed_windows": self.failed_windows,
+            "avg_batch_size": self.windows / self.batches if self.batches else 0.0,
+            "stream_seconds": self.stream_seconds,
+            "wall_seconds": wall,
+            "inference_seconds": self.inference_seconds,
+            "throughput": self.stream_seconds / wall if wall else 0.0,
+        }
+
+    def _schedule(self) -> None:
+        while True:
+            with self._cond:
+                batch = self._collect_batch()
+                while not batch and self.running:
+                    self._cond.wait()
+                    batch = self._collect_batch()
+                if not batch:
+                    return
+            self._run_batch(batch)
+
+    def _collect_batch(self) -> List[_Window]:
+        """Take one ready window per stream, least recently served first."""
+        batch: List[_Window] = []
+        language = None
+        for stream_id in list(self._order):
+            if len(batch) >= self.batch_size:
+                break
+            stream = self._streams[stream_id]
+            ready = len(stream.buffer) >= self.window_samples or (
+                stream.closing and len(stream.buffer) > self.overlap_samples
+            )
+            if not ready:
+                if stream.closing:
+                    self._remove(stream)
+                continue
+            # A batch is decoded with a single language
+            if language is not None and stream.language != language:
+                continue
+            language = stream.language
+
+            window = self._take_window(stream)
+            self._order.remove(stream_id)
+            self._order.append(stream_id)
+            if window is not None:
+                batch.append(window)
+        return batch
+
+    def _take_window(self, stream: _Stream) -> Optional[_Window]:
+        view = stream.buffer.view()
+        start = stream.buffer.start_sample / self.SAMPLE_RATE
+        new_seconds = (len(view) - min(self.overlap_samples, len(view))) / self.SAMPLE_RATE
+        if stream.audio_seconds == 0.0:
+            new_seconds = len(view) / self.SAMPLE_RATE
+        stream.audio_seconds += new_seconds
+        self.stream_seconds += new_seconds
+
+        rms = float(np.sqrt(np.mean(view * view))) if len(view) else 0.0
+        silent = 20 * np.log10(rms + 1e-10) < self.silence_db
+        window = None if silent else _Window(stream, view.copy(), start, new_seconds)
+        stream.buffer.keep_last(self.overlap_samples)
+        if stream.closing:
+            stream.buffer.clear()
+        if silent:
+            self.skipped_silent += 1
+        return window
+
+    def _remove(self, stream: _Stream) -> None:
+        del self._streams[stream.id]
+        self._order.remove(stream.id)
+        stream.text_queue.put(None)
+
+    def _run_batch(self, batch: List[_Window]) -> None:
+        started = time.perf_counter()
+        try:
+            texts = self._decode(batch)
+        except Exception as e:
+            # The scheduler keeps going, so closing streams still get their final None
+            self.failed_windows += len(batch)
+            print(f"Batch transcription error: {e}")
+            return
+        finally:
+            self.inference_seconds += time.perf_counter() - started
+
+        self.batches += 1
+        self.windows += len(batch)
+
+        for window, parts in zip(batch, texts):
+            text = " ".join(part for part in parts if part)
+            if text:
+                end = window.start + len(window.audio) / self.SAMPLE_RATE
+                window.stream.text_queue.put(TranscriptEvent(FINAL, text, window.start, end))
+
+    def _decode(self, batch: List[_Window]) -> List[List[str]]:
+        """Text parts of each window of the batch."""
+        language = batch[0].stream.language
+        texts: List[List[str]] = [[] for _ in batch]
+
+        if self.pipeline is not None:
+            # Concatenate the windows and let the pipeline treat each one as a clip
+            audio = np.concatenate([window.audio for window in batch])
+            offsets, clips, pos = [], [], 0.0
+            for window in batch:
+                duration = len(window.audio) / self.SAMPLE_RATE
+                offsets.append(pos)
+                clips.append({"start": pos, "end": pos + duration})
+                pos += duration
+
+            segments, _ = self.pipeline.transcribe(
+                audio,
+                language=language,
+                clip_timestamps=clips,
+                batch_size=len(batch),
+                vad_filter=False
+            )
+            for segment in segments:
+                index = bisect_right(offsets, (segment.start + segment.end) / 2) - 1
+                texts[max(0, index)].append(segment.text.strip())
+        else:
+            for i, window in enumerate(batch):
+                segments, _ = self.model.transcribe(window.audio, language=language, vad_filter=True)
+                texts[i] = [segment.text.strip() for segment in segments]
+        return texts
@@ -0,0 +1,70 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from ..core.metrics import MetricsRegistry, get_registry
+from ..utils.profiler import profile_for
+
+MAX_PROFILE_SECONDS = 60
+
+
+class MetricsServer:
+    """Serves the metrics registry over HTTP on localhost.
+
+    ``GET /metrics`` returns the Prometheus text format.
+    ``GET /profile?seconds=N`` samples every thread for N seconds (default
+    5) and returns the stacks in the folded format used by flame graphs.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None, port: int = 9464,
+                 host: str = "127.0.0.1"):
+        self.registry = registry or get_registry()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-server", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MetricsServer":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/metrics":
+                    self._send("text/plain; version=0.0.4; charset=utf-8", server.registry.render())
+                elif url.path == "/profile":
+                    try:
+                        seconds = float(parse_qs(url.query).get("seconds", ["5"])[0])
+                    except ValueError:
+                        self.send_error(400, "seconds must be a number")
+                        return
+                    seconds = min(max(seconds, 0.1), MAX_PROFILE_SECONDS)
+                    self._send("text/plain; charset=utf-8", profile_for(seconds))
+                else:
+                    self.send_error(404)
+
+            def _send(self, content_type: str, payload: str):
+                data = payload.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
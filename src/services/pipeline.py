@@ -0,0 +1,411 @@
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+from ..core.audio_queue import AudioQueue
+from ..core.conversation_manager import ConversationManager
+from ..core.events import TranscriptEvent
+from ..core.metrics import get_registry
+from .audio_service import AudioService
+from .translation_service import TranslationService
+from .translation_stage import TranslationStage
+
+_AUDIO_WAKEUPS = get_registry().counter(
+    "voxa_pipeline_audio_wakeups_total", "Times the transcribe stage woke up because captured audio arrived")
+
+_STOP = object()  # passed down the stages on close, after everything queued before it
+
+
+@dataclass
+class TranslationResult:
+    """A final segment's translation, in transcript order (``error`` set when it failed)."""
+    segment_id: int
+    text: str
+    translation: Optional[str]
+    error: Optional[Exception]
+
+
+class Stage:
+    """One step of the text side of the pipeline.
+
+    ``handle`` is awaited for each message in arrival order and passes it
+    (or whatever replaces it) on with ``emit``. Stages run on the
+    pipeline's event loop, so anything that blocks goes through
+    ``run_blocking``.
+    """
+
+    name = "stage"
+
+    def __init__(self):
+        self.inbox: Optional[asyncio.Queue] = None
+        self.next: Optional["Stage"] = None
+        self.pipeline: Optional["Pipeline"] = None
+
+    def open(self, pipeline: "Pipeline") -> None:
+        """Called on the loop thread before the first message."""
+        self.pipeline = pipeline
+        self.inbox = asyncio.Queue()
+
+    async def handle(self, message: Any) -> None:
+        self.emit(message)
+
+    async def close(self) -> None:
+        """Called once everything before the stop was handled."""
+
+    def emit(self, message: Any) -> None:
+        if self.next is not None:
+            self.next.inbox.put_nowait(message)
+
+    async def run(self) -> None:
+        while True:
+            message = await self.inbox.get()
+            if message is _STOP:
+                await self.close()
+                self.emit(_STOP)
+                return
+            try:
+                await self.handle(message)
+            except Exception as e:
+                print(f"Pipeline {self.name} error: {e}")
+
+
+class TranslateStage(Stage):
+    """Sends finals (never drafts) to a TranslationStage; the results follow them down the pipeline.
+
+    On close, translations still in flight get up to ``drain_timeout``
+    seconds to arrive, so the history keeps them on a normal stop.
+    """
+
+    name = "translate"
+
+    def __init__(self, translation_service: TranslationService, drain_timeout: float = 5.0, **options):
+        super().__init__()
+        self.translation_service = translation_service
+        self.drain_timeout = drain_timeout
+        self.options = options
+        self.enabled = False
+        self.auto_language = False  # translate from each segment's detected language
+        self.translator: Optional[TranslationStage] = None
+        self._outstanding = 0  # submitted, result not emitted yet
+        self._drained: Optional[asyncio.Event] = None
+
+    def open(self, pipeline: "Pipeline") -> None:
+        super().open(pipeline)
+        self.translator = TranslationStage(self.translation_service, self._on_result, **self.options)
+        self._drained = asyncio.Event()
+        self._drained.set()
+
+    @property
+    def pending(self) -> int:
+        return self.translator.pending if self.translator is not None else 0
+
+    def _on_result(self, segment_id: int, text: str, translation: Optional[str],
+                   error: Optional[Exception]) -> None:
+        # Called on the translation threads
+        self.pipeline.call_soon(self._emit_result, TranslationResult(segment_id, text, translation, error))
+
+    def _emit_result(self, result: TranslationResult) -> None:
+        self._outstanding -= 1
+        if not self._outstanding:
+            self._drained.set()
+        self.emit(result)
+
+    async def handle(self, message: Any) -> None:
+        self.emit(message)
+        if (self.enabled and isinstance(message, TranscriptEvent) and message.is_final
+                and not message.draft and message.text):
+            self._outstanding += 1
+            self._drained.clear()
+            self.translator.submit(message.segment_id, message.text,
+                                   message.language if self.auto_language else None)
+
+    async def close(self) -> None:
+        try:
+            await asyncio.wait_for(self._drained.wait(), self.drain_timeout)
+        except asyncio.TimeoutError:
+            print(f"Translation: {self._outstanding} segments still in flight at close, dropped")
+        self.translator.close(wait=False)
+
+
+class PersistStage(Stage):
+    """Records finals and translations in the ConversationManager, off the loop thread.
+
+    A draft becomes an entry right away and its refined final rewrites the
+    entry's transcription; translations are attached to the entry of their
+    segment. Entries are stamped with ``session_start`` plus the segment's
+    start on the capture clock.
+    """
+
+    name = "persist"
+
+    def __init__(self, conversation_manager: ConversationManager, max_tracked: int = 1000):
+        super().__init__()
+        self.conversation_manager = conversation_manager
+        self.session_start = datetime.now()
+        self.max_tracked = max_tracked
+        self._entries: "OrderedDict[int, int]" = OrderedDict()  # segment id -> entry id
+        self._drafts = set()  # segment ids whose entry holds a draft
+
+    async def handle(self, message: Any) -> None:
+        if isinstance(message, TranscriptEvent) and message.is_final:
+            await self._final(message)
+        elif isinstance(message, TranslationResult) and message.error is None:
+            entry_id = self._entries.pop(message.segment_id, None)
+            if entry_id is not None:
+                await self.pipeline.run_blocking(
+                    self.conversation_manager.update_translation, entry_id, message.translation)
+        self.emit(message)
+
+    async def _final(self, event: TranscriptEvent) -> None:
+        if event.segment_id in self._drafts and not event.draft:
+            self._drafts.discard(event.segment_id)
+            entry_id = self._entries.get(event.segment_id)
+            if entry_id is not None:
+                await self.pipeline.run_blocking(
+                    self.conversation_manager.update_transcription, entry_id, event.text)
+            return
+        if not event.text:
+            return
+        timestamp = self.session_start + timedelta(seconds=event.start)
+        entry_id = await self.pipeline.run_blocking(
+            self.conversation_manager.add_entry, event.text, None, timestamp, event.start, event.end)
+        if event.segment_id is None:
+            return
+        if event.draft:
+            self._drafts.add(event.segment_id)
+        self._entries[event.segment_id] = entry_id
+        # Segments that were never translated would pile up here otherwise
+        while len(self._entries) > self.max_tracked:
+            segment_id, _ = self._entries.popitem(last=False)
+            self._drafts.discard(segment_id)
+
+
+class Display:
+    """Where the pipeline shows text. Called on the pipeline thread, so nothing here may block."""
+
+    def partial(self, text: str) -> None:
+        """The in-progress line of the current utterance changed."""
+
+    def final(self, event: TranscriptEvent) -> None:
+        """A new final (or draft) line."""
+
+    def replace(self, event: TranscriptEvent) -> None:
+        """A refined final for a draft shown earlier with the same ``segment_id``."""
+
+    def translation(self, result: TranslationResult) -> None:
+        """A translation (or its error) for an earlier final, in transcript order."""
+
+
+class DisplayStage(Stage):
+    """Hands every message to a Display; the last stage of the pipeline."""
+
+    name = "display"
+
+    def __init__(self, display: Display):
+        super().__init__()
+        self.display = display
+        self._drafts = set()
+
+    async def handle(self, message: Any) -> None:
+        if isinstance(message, TranslationResult):
+            self.display.translation(message)
+        elif not message.is_final:
+            self.display.partial(message.text)
+        elif message.draft:
+            self._drafts.add(message.segment_id)
+            self.display.final(message)
+        elif message.segment_id in self._drafts:
+            self._drafts.discard(message.segment_id)
+            self.display.replace(message)
+        elif message.text:
+            self.display.final(message)
+
+
+class Pipeline:
+    """Wires capture → transcribe → translate → persist → display on one asyncio loop.
+
+    The loop runs on its own thread and only wakes up for work: captured
+    audio arriving in the AudioQueue (through ``on_put``), a transcript
+    event published by the transcription service, or a translation coming
+    back. Decoding runs on a single executor thread and other blocking
+    calls (the history) on another, so the loop itself never blocks.
+
+    The pipeline is also the transcription service's ``text_queue``: its
+    ``put`` is thread-safe and feeds the first of ``stages``. Finals are
+    renumbered on the way in, so the stages match drafts, refinements and
+    translations on ids that are unique for the pipeline's lifetime rather
+    than for one service (or one worker process). A service
+    without ``process_pending`` (the worker process, which reads the
+    capture queue itself) is simply started and stopped with the capture.
+    Stages can be swapped or extended before ``start``; nothing here needs
+    Tk.
+    """
+
+    def __init__(self, audio_service: Optional[AudioService] = None, transcription_service: Any = None,
+                 stages: Sequence[Stage] = ()):
+        self.audio_service = audio_service
+        self.transcription_service = transcription_service
+        self.stages: List[Stage] = list(stages)
+        self.recording = False
+        self.loop = asyncio.new_event_loop()
+        self.thread: Optional[threading.Thread] = None
+        self._decoder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="transcribe")
+        self._blocking = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-io")
+        self._tasks: List[asyncio.Task] = []
+        self._audio_ready: Optional[asyncio.Event] = None
+        self._transcriber: Optional[asyncio.Task] = None
+        self._stopping: Optional[Future] = None
+        self._next_segment_id = 0
+        self._draft_ids: Dict[int, int] = {}  # service segment id of an unresolved draft -> pipeline id
+
+    # Called from any thread
+
+    def put(self, message: Any) -> None:
+        """Queue a transcript event for the stages; the service's ``text_queue.put``."""
+        self.call_soon(self._deliver, message)
+
+    def qsize(self) -> int:
+        """Messages waiting in the stages' inboxes."""
+        return sum(stage.inbox.qsize() for stage in self.stages if stage.inbox is not None)
+
+    def call_soon(self, callback, *args) -> None:
+        """Run ``callback(*args)`` on the loop thread."""
+        if not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(callback, *args)
+
+    def start(self) -> "Pipeline":
+        """Start the loop thread and the stages."""
+        for stage, following in zip(self.stages, self.stages[1:] + [None]):
+            stage.next = following
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(ready,), name="pipeline", daemon=True)
+        self.thread.start()
+        ready.wait()
+        return self
+
+    def start_capture(self) -> None:
+        """Start capturing and transcribing; raises ValueError when the source is unavailable."""
+        self.audio_service.start_recording()
+        self._wait(self._start_capture())
+
+    def stop_capture(self, wait: bool = True) -> Future:
+        """Stop capturing; the future is done once the audio already captured is transcribed.
+
+        Transcribing the backlog can take seconds, so the Tk thread passes
+        ``wait=False`` and reacts to the future instead of blocking on it.
+        """
+        self.audio_service.stop_recording()
+        self.recording = False
+        self._stopping = asyncio.run_coroutine_threadsafe(self._stop_capture(), self.loop)
+        if wait:
+            self._stopping.result()
+        return self._stopping
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop capture, let every stage finish what it holds, then stop the loop."""
+        if self.thread is None:
+            return
+        if self.recording:
+            self.stop_capture()
+        elif self._stopping is not None:
+            self._stopping.result()  # a stop_capture(wait=False) still transcribing
+        refiner = getattr(self.transcription_service, "refiner", None)
+        if refiner is not None:
+            # Its drafts are confirmed as they are and reach the stages ahead of the stop
+            refiner.close(wait=False)
+        self.call_soon(self._deliver, _STOP)
+        self.thread.join(timeout)
+        self.thread = None
+        self._decoder.shutdown(wait=True)
+        self._blocking.shutdown(wait=True)
+
+    def _wait(self, coroutine) -> None:
+        asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    # Loop thread
+
+    def _run(self, ready: threading.Event) -> None:
+        asyncio.set_event_loop(self.loop)
+        for stage in self.stages:
+            stage.open(self)
+        self.loop.run_until_complete(self._main(ready))
+        self.loop.close()
+
+    def _deliver(self, message: Any) -> None:
+        if isinstance(message, TranscriptEvent) and message.segment_id is not None:
+            message = self._renumber(message)
+        self.stages[0].inbox.put_nowait(message)
+
+    def _renumber(self, event: TranscriptEvent) -> TranscriptEvent:
+        """Give a final the pipeline's next id; a refined final takes the id of its draft."""
+        if not event.draft and event.segment_id in self._draft_ids:
+            segment_id = self._draft_ids.pop(event.segment_id)
+        else:
+            segment_id = self._next_segment_id
+            self._next_segment_id += 1
+            if event.draft:
+                self._draft_ids[event.segment_id] = segment_id
+        return replace(event, segment_id=segment_id)
+
+    async def _main(self, ready: threading.Event) -> None:
+        self._audio_ready = asyncio.Event()
+        self._tasks = [asyncio.ensure_future(stage.run()) for stage in self.stages]
+        ready.set()
+        # The last stage ends once the stop has gone all the way through
+        await asyncio.gather(*self._tasks)
+
+    async def run_blocking(self, function, *args):
+        """Await ``function(*args)`` on the executor for blocking calls."""
+        return await self.loop.run_in_executor(self._blocking, function, *args)
+
+    async def _start_capture(self) -> None:
+        self.recording = True
+        service = self.transcription_service
+        if not hasattr(service, "process_pending"):
+            await self.loop.run_in_executor(self._decoder, service.start)
+            return
+        await self.loop.run_in_executor(self._decoder, service.reset)
+        audio_queue = service.audio_queue
+        if isinstance(audio_queue, AudioQueue):
+            audio_queue.on_put = lambda: self.call_soon(self._audio_ready.set)
+        self._audio_ready.set()  # pick up anything queued before the hook was set
+        self._transcriber = asyncio.ensure_future(self._transcribe())
+
+    async def _stop_capture(self) -> None:
+        service = self.transcription_service
+        if self._transcriber is None:
+            await self.loop.run_in_executor(self._decoder, service.stop)
+            return
+        self._audio_ready.set()
+        await self._transcriber
+        self._transcriber = None
+        if isinstance(service.audio_queue, AudioQueue):
+            service.audio_queue.on_put = None
+        if service.model_ready.is_set():
+            # Capture has stopped: transcribe what is left, then publish the pending text
+            await self._decode(service.process_pending)
+            await self._decode(service.flush)
+
+    async def _decode(self, function) -> None:
+        try:
+            await self.loop.run_in_executor(self._decoder, function)
+        except Exception as e:
+            print(f"Transcription error: {e}")
+
+    async def _transcribe(self) -> None:
+        service = self.transcription_service
+        if not service.model_ready.is_set() and service.model_loading is not None:
+            try:
+                await asyncio.wrap_future(service.model_loading)
+            except Exception:
+                return  # reported by the service; the audio stays queued
+        while self.recording:
+            await self._audio_ready.wait()
+            self._audio_ready.clear()
+            if not self.recording:
+                return
+            _AUDIO_WAKEUPS.inc()
+            await self._decode(service.process_pending)
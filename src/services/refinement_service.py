@@ -0,0 +1,174 @@
+from collections import deque
+from concurrent.futures import Future
+import threading
+import time
+from typing import TYPE_CHECKING, Deque, NamedTuple, Optional
+import numpy as np
+from ..core.events import TranscriptEvent, FINAL
+from ..core.metrics import get_registry
+from ..core.model_cache import get_model_cache
+
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
+
+_REFINE_SECONDS = get_registry().histogram("voxa_refine_seconds", "Wall time of one refinement decode")
+_REFINED = get_registry().counter("voxa_refined_segments_total", "Draft segments re-decoded by the larger model")
+_CHANGED = get_registry().counter(
+    "voxa_refine_changed_total", "Refined segments whose text differs from the draft (drafts never translated)")
+_SKIPPED = get_registry().counter(
+    "voxa_refine_skipped_total", "Draft segments confirmed as they were because refinement fell behind")
+
+SAMPLE_RATE = 16000
+
+
+class RefinementJob(NamedTuple):
+    segment_id: int
+    text: str  # the draft
+    start: float
+    end: float
+    audio: np.ndarray  # a copy of the span, padded
+    language: Optional[str]
+
+
+class RefinementService:
+    """Re-decodes draft segments with a larger model in the background.
+
+    The TranscriptionService publishes each final segment right away as a
+    draft (from a small, fast model) and hands a copy of its audio here.
+    A single thread decodes the span again with ``model_size`` and
+    publishes a final with the same ``segment_id`` that replaces the draft.
+    When more than ``max_pending`` segments wait, the oldest is confirmed
+    as it was instead, so the larger model can lag but never pile up.
+
+    Construction only stores settings, so a service can be handed to a
+    worker process; the thread and the model start on ``attach``.
+    """
+
+    def __init__(self, model_size: str = "small", max_pending: int = 8, beam_size: int = 5,
+                 pad_seconds: float = 0.2, model: Optional["WhisperModel"] = None):
+        self.model_size = model_size
+        self.max_pending = max_pending
+        self.beam_size = beam_size
+        self.pad_seconds = pad_seconds
+        self.model = model
+        self.text_queue = None
+        self.refined = 0
+        self.changed = 0
+        self.skipped = 0
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup: Optional[threading.Condition] = None
+        self._current: Optional[RefinementJob] = None  # the draft being re-decoded
+
+    def attach(self, text_queue) -> None:
+        """Start publishing refined segments to ``text_queue``; loads the model in the background.
+
+        Attaching again after ``close`` starts a new thread.
+        """
+        self.text_queue = text_queue
+        if self._thread is not None:
+            return
+        if self._wakeup is None:
+            self._jobs: Deque[RefinementJob] = deque()
+            self._wakeup = threading.Condition()
+            self._context = ""
+            self._loading: Optional[Future] = None
+            if self.model is None:
+                self._loading = get_model_cache().load_async(self.model_size)
+            get_registry().gauge("voxa_refine_pending", "Draft segments waiting for the larger model",
+                                 fn=lambda: self.pending)
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="refinement", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        return len(self._jobs) if self._wakeup is not None else 0
+
+    def submit(self, job: RefinementJob) -> None:
+        """Queue a draft for refinement; never blocks the caller."""
+        with self._wakeup:
+            self._jobs.append(job)
+            while len(self._jobs) > self.max_pending:
+                self._confirm(self._jobs.popleft())
+            self._wakeup.notify()
+
+    def _confirm(self, job: RefinementJob) -> None:
+        """Resolve a draft without re-decoding it."""
+        self.skipped += 1
+        _SKIPPED.inc()
+        self._publish(job, job.text)
+
+    def _publish(self, job: RefinementJob, text: str) -> None:
+        self.text_queue.put(TranscriptEvent(FINAL, text, job.start, job.end, job.segment_id, language=job.language))
+
+    def _run(self) -> None:
+        while True:
+            with self._wakeup:
+                while not self._jobs and not self._closing and self._thread is threading.current_thread():
+                    self._wakeup.wait()
+                if not self._jobs or self._thread is not threading.current_thread():
+                    return  # closed; without ``wait`` the queue was confirmed already
+                job = self._current = self._jobs.popleft()
+
+            text = ""
+            try:
+                if self.model is None:
+                    self.model = self._loading.result()
+            except Exception as e:
+                print(f"Refinement model error: {e}")
+            else:
+                try:
+                    text = self._refine(job)
+                except Exception as e:
+                    print(f"Refinement error: {e}")
+            with self._wakeup:
+                # ``close(wait=False)`` confirmed it meanwhile
+                if self._current is job:
+                    self._current = None
+                    # A span the larger model hears as silence keeps the draft
+                    self._publish(job, text or job.text)
+
+    def _refine(self, job: RefinementJob) -> str:
+        started = time.perf_counter()
+        segments, _ = self.model.transcribe(
+            job.audio,
+            language=job.language,
+            beam_size=self.beam_size,
+            vad_filter=False,
+            condition_on_previous_text=False,
+            initial_prompt=self._context[-200:] or None
+        )
+        text = "".join(segment.text for segment in segments).strip()
+        elapsed = time.perf_counter() - started
+        _REFINE_SECONDS.observe(elapsed)
+        self.refined += 1
+        _REFINED.inc()
+        if text and text != job.text.strip():
+            self.changed += 1
+            _CHANGED.inc()
+        if text:
+            self._context = (self._context + " " + text)[-400:]
+        return text
+
+    def close(self, wait: bool = True) -> None:
+        """Stop after the queued drafts are resolved (or confirm them all without ``wait``).
+
+        Without ``wait`` the draft being re-decoded is confirmed too, so
+        nothing is published once this returns.
+        """
+        if self._thread is None:
+            return
+        thread = self._thread
+        with self._wakeup:
+            if not wait:
+                if self._current is not None:
+                    self._confirm(self._current)
+                    self._current = None
+                while self._jobs:
+                    self._confirm(self._jobs.popleft())
+                self._thread = None
+            self._closing = True
+            self._wakeup.notify_all()
+        if wait:
+            thread.join()
+            self._thread = None
@@ -0,0 +1,343 @@
+from collections import deque
+import json
+from queue import Queue
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Deque, Dict, Optional
+import numpy as np
+from ..core.events import TranscriptEvent, PARTIAL
+from ..core.language_detector import LanguageDetector
+from ..core.metrics import get_registry
+from ..core.model_pool import ModelPool
+from ..core.translation_cache import TranslationCache
+from ..core.vad import VADSegmenter
+from ..utils.resampler import StreamingResampler
+from .transcription_service import TranscriptionService
+from .translation_backends import TranslationBackend
+from .translation_service import TranslationService
+from .translation_stage import TranslationStage
+
+_ACCEPTED = get_registry().counter("voxa_server_sessions_total", "Streams the server accepted")
+_REJECTED = get_registry().counter("voxa_server_rejected_total", "Streams turned away by admission control")
+_BACKPRESSURE = get_registry().counter(
+    "voxa_server_backpressure_seconds_total", "Time connections went unread because their decoder was behind")
+_COALESCED = get_registry().counter(
+    "voxa_server_partials_coalesced_total", "Partials replaced by a newer one before the client read them")
+_SLOW_CLIENTS = get_registry().counter(
+    "voxa_server_slow_clients_total", "Connections dropped because the client stopped reading")
+
+SAMPLE_RATE = TranscriptionService.SAMPLE_RATE
+SAMPLE_FORMATS = {"s16le": ("<i2", 1 / 32768), "f32le": ("<f4", 1.0)}
+MAX_HEADER_BYTES = 4096
+RECEIVE_BUFFER = 32 * 1024  # about 1 s of 16 kHz 16-bit audio
+MAX_SAMPLE_RATE = 192000
+
+
+class _Rejected(Exception):
+    pass
+
+
+class _Outbox:
+    """Messages waiting to be written to one client.
+
+    A partial still waiting is replaced by the next one, so a client that
+    reads slowly gets fewer partials instead of an ever longer backlog;
+    finals and translations are always kept.
+    """
+
+    def __init__(self):
+        self._items: Deque[Any] = deque()
+        self._cond = threading.Condition()
+
+    def put(self, item: Any) -> None:
+        with self._cond:
+            if _is_partial(item) and self._items and _is_partial(self._items[-1]):
+                self._items[-1] = item
+                _COALESCED.inc()
+            else:
+                self._items.append(item)
+            self._cond.notify()
+
+    def get(self) -> Any:
+        with self._cond:
+            while not self._items:
+                self._cond.wait()
+            return self._items.popleft()
+
+
+def _is_partial(item: Any) -> bool:
+    return isinstance(item, TranscriptEvent) and item.kind == PARTIAL
+
+
+class _Session:
+    """One client stream: its TranscriptionService, optional translation and outbox."""
+
+    def __init__(self, session_id: int, header: Dict, server: "TranscriptionServer"):
+        self.id = session_id
+        fmt = header.get("format", "s16le")
+        if fmt not in SAMPLE_FORMATS:
+            raise _Rejected(f"unsupported format: {fmt}")
+        self.dtype, self.scale = SAMPLE_FORMATS[fmt]
+        rate = int(header.get("sample_rate", SAMPLE_RATE))
+        if not 0 < rate <= MAX_SAMPLE_RATE:
+            raise _Rejected(f"unsupported sample rate: {rate}")
+        self.resampler = StreamingResampler(rate) if rate != SAMPLE_RATE else None
+        self.block_bytes = int(rate * server.block_seconds) * np.dtype(self.dtype).itemsize
+        if self.block_bytes <= 0:
+            raise _Rejected(f"sample rate too low: {rate}")
+
+        language = header.get("language", "en")
+        auto = language == "auto"
+        self.outbox = _Outbox()
+        self.inbox: Queue = Queue(maxsize=max(1, int(server.backlog_seconds / server.block_seconds)))
+        self.service = TranscriptionService(
+            Queue(), self,
+            model=server.pool.model(),
+            streaming=server.streaming,
+            vad=VADSegmenter(),
+            language_detector=LanguageDetector() if auto else None
+        )
+        self.service.language = None if auto else language
+
+        self.stage: Optional[TranslationStage] = None
+        self.auto = auto
+        target = header.get("translate_to")
+        if target:
+            if server.translation_backend is None:
+                raise _Rejected("translation is not enabled on this server")
+            translator = TranslationService(cache=server.translation_cache, backend=server.translation_backend)
+            translator.set_language_codes(language if not auto else "auto", target)
+            self.stage = TranslationStage(translator, self._on_translation)
+        self.backpressure_seconds = 0.0
+
+    def put(self, event: TranscriptEvent) -> None:
+        """Called by the TranscriptionService for every event it publishes."""
+        self.outbox.put(event)
+        if self.stage is not None and event.is_final and event.text.strip():
+            self.stage.submit(event.segment_id, event.text.strip(), event.language if self.auto else None)
+
+    def _on_translation(self, segment_id: int, text: str, translation: Optional[str],
+                        error: Optional[Exception]) -> None:
+        if translation is not None:
+            self.outbox.put({"type": "translation", "id": segment_id, "text": translation})
+
+    def samples(self, data: bytes) -> np.ndarray:
+        usable = len(data) - len(data) % np.dtype(self.dtype).itemsize
+        samples = np.frombuffer(data[:usable], dtype=self.dtype).astype(np.float32) * self.scale
+        return self.resampler.process(samples) if self.resampler is not None else samples
+
+    def decode(self) -> None:
+        """Feed the model from the inbox until the stream ends, then flush."""
+        failed = False
+        while True:
+            samples = self.inbox.get()
+            if samples is None:
+                break
+            if failed:
+                continue  # keep draining so the reader never blocks
+            try:
+                self.service.feed(samples)
+                self.service.audio_seconds += len(samples) / SAMPLE_RATE
+            except Exception as e:
+                failed = True
+                print(f"Session {self.id} transcription error: {e}")
+                self.outbox.put({"type": "error", "error": str(e)})
+        if not failed:
+            try:
+                self.service.flush()
+            except Exception as e:
+                print(f"Session {self.id} transcription error: {e}")
+        if self.stage is not None:
+            self.stage.close(wait=True)
+        self.outbox.put(None)
+
+    def stats(self) -> Dict:
+        return {
+            "audio_seconds": round(self.service.audio_seconds, 3),
+            "decode_calls": self.service.decode_calls,
+            "decode_seconds": round(self.service.decode_seconds, 3),
+            "backpressure_seconds": round(self.backpressure_seconds, 3),
+        }
+
+
+class TranscriptionServer:
+    """Streams transcripts to many clients over plain TCP, on a shared ModelPool.
+
+    A client sends one JSON header line (``language``, an ISO code or
+    ``"auto"``; optional ``translate_to``, ``sample_rate`` and ``format``,
+    ``s16le`` or ``f32le``), then raw mono PCM, and half-closes the
+    connection when its audio ends. The server answers with JSON lines:
+    ``ready``, then ``partial``/``final``/``translation`` messages as they
+    come and ``end`` once everything is flushed, or a single ``error``.
+
+    New streams are refused while ``max_streams`` are connected, or while
+    every model is busy and decodes have lately waited more than
+    ``max_pool_wait`` seconds for one. A connection whose decoder falls
+    ``backlog_seconds`` behind is not read until it catches up, so TCP
+    flow control slows the client down instead of the server buffering
+    its audio; a client that stops reading for ``timeout`` seconds is
+    dropped.
+    """
+
+    def __init__(self, pool: ModelPool, host: str = "127.0.0.1", port: int = 9700,
+                 max_streams: int = 8, max_pool_wait: float = 1.0, backlog_seconds: float = 2.0,
+                 block_seconds: float = 0.1, streaming: bool = True, timeout: float = 10.0,
+                 translation_backend: Optional[TranslationBackend] = None):
+        self.pool = pool
+        self.max_streams = max_streams
+        self.max_pool_wait = max_pool_wait
+        self.backlog_seconds = backlog_seconds
+        self.block_seconds = block_seconds
+        self.streaming = streaming
+        self.timeout = timeout
+        self.translation_backend = translation_backend
+        self.translation_cache = TranslationCache()  # shared by every stream
+
+        self._sessions: Dict[int, socket.socket] = {}
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self.accepted = 0
+        self.rejected = 0
+
+        self.tcp = socketserver.ThreadingTCPServer((host, port), self._handler(), bind_and_activate=False)
+        self.tcp.allow_reuse_address = True
+        self.tcp.daemon_threads = True
+        # Accepted sockets inherit this; a small kernel buffer lets the inbox bound do the pushing back
+        self.tcp.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+        self.tcp.server_bind()
+        self.tcp.server_activate()
+        self.thread = threading.Thread(target=self.tcp.serve_forever, name="transcription-server", daemon=True)
+        get_registry().gauge("voxa_server_sessions", "Streams being transcribed", fn=lambda: self.sessions)
+
+    @property
+    def address(self):
+        return self.tcp.server_address[:2]
+
+    @property
+    def sessions(self) -> int:
+        return len(self._sessions)
+
+    def start(self) -> "TranscriptionServer":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop accepting streams and cut the connected ones off."""
+        self.tcp.shutdown()
+        self.tcp.server_close()
+        with self._lock:
+            connections = list(self._sessions.values())
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _admit(self, connection: socket.socket) -> int:
+        with self._lock:
+            if len(self._sessions) >= self.max_streams:
+                reason = f"busy: {len(self._sessions)} streams"
+            elif self.pool.busy >= self.pool.size and self.pool.wait_seconds > self.max_pool_wait:
+                reason = f"overloaded: decodes wait {self.pool.wait_seconds:.1f} s for a model"
+            else:
+                session_id = self._next_id
+                self._next_id += 1
+                self._sessions[session_id] = connection
+                self.accepted += 1
+                _ACCEPTED.inc()
+                return session_id
+            self.rejected += 1
+            _REJECTED.inc()
+        raise _Rejected(reason)
+
+    def _release(self, session_id: int) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _handler(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                self.connection.settimeout(server.timeout)
+                session_id = None
+                try:
+                    try:
+                        header = json.loads(self.rfile.readline(MAX_HEADER_BYTES) or b"{}")
+                        if not isinstance(header, dict):
+                            raise ValueError("expected a JSON object")
+                        session_id = server._admit(self.connection)
+                        session = _Session(session_id, header, server)
+                    except (_Rejected, ValueError, TypeError) as e:
+                        reason = str(e) if isinstance(e, _Rejected) else f"invalid header: {e}"
+                        self._send({"type": "error", "error": reason})
+                        return
+                    self._send({"type": "ready", "session": session_id})
+                    self._serve(session)
+                except OSError:
+                    pass
+                finally:
+                    # Whatever ended the stream, its admission slot goes back
+                    if session_id is not None:
+                        server._release(session_id)
+
+            def _serve(self, session: _Session):
+                decoder = threading.Thread(target=session.decode, name=f"session-{session.id}", daemon=True)
+                writer = threading.Thread(target=self._write, args=(session,), daemon=True)
+                decoder.start()
+                writer.start()
+                try:
+                    while True:
+                        data = self.rfile.read(session.block_bytes)
+                        if not data:
+                            break
+                        started = time.perf_counter()
+                        session.inbox.put(session.samples(data))  # blocks while the decoder is behind
+                        waited = time.perf_counter() - started
+                        if waited > 0.001:
+                            session.backpressure_seconds += waited
+                            _BACKPRESSURE.inc(waited)
+                except OSError:
+                    pass
+                finally:
+                    # However reading ended, the decoder flushes and the writer sends "end"
+                    session.inbox.put(None)
+                    decoder.join()
+                    writer.join()
+
+            def _write(self, session: _Session):
+                try:
+                    while True:
+                        item = session.outbox.get()
+                        if item is None:
+                            self._send(dict(type="end", **session.stats()))
+                            return
+                        self._send(_message(item))
+                except socket.timeout:
+                    _SLOW_CLIENTS.inc()
+                    print(f"Session {session.id}: client stopped reading, dropping it")
+                except OSError:
+                    pass
+                # Unblock the reader; the decoder still drains so the session can end
+                try:
+                    self.connection.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                while session.outbox.get() is not None:
+                    pass
+
+            def _send(self, message: Dict):
+                self.connection.sendall(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+
+        return Handler
+
+
+def _message(item: Any) -> Dict:
+    if not isinstance(item, TranscriptEvent):
+        return item
+    message = {"type": item.kind, "text": item.text, "start": round(item.start, 3), "end": round(item.end, 3)}
+    if item.is_final:
+        message.update(id=item.segment_id, language=item.language)
+    return message
@@ -1,9 +1,28 @@
-from faster_whisper import WhisperModel
 import numpy as np
+from concurrent.futures import Future
 from queue import Queue, Empty
 import threading
-from typing import Optional
-import torch
+import time
+from typing import TYPE_CHECKING, Dict, Optional, List
+from ..core.audio_queue import AudioQueue
+from ..core.events import TranscriptEvent, PARTIAL, FINAL
+from ..core.language_detector import LanguageDetector
+from ..core.local_agreement import HypothesisBuffer, Word, join_words
+from ..core.metrics import get_registry
+from ..core.model_cache import get_model_cache
+from ..core.quality_scheduler import QualityScheduler
+from ..core.vad import VADSegmenter
+from ..utils.audio_buffer import AudioRingBuffer
+from .refinement_service import RefinementJob, RefinementService
+
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
+
+_DECODE_SECONDS = get_registry().histogram("voxa_decode_seconds", "Wall time of one Whisper decode")
+_REALTIME_FACTOR = get_registry().gauge(
+    "voxa_realtime_factor", "Decode seconds per second of audio since the session started")
+_LAG_SECONDS = get_registry().gauge(
+    "voxa_transcription_lag_seconds", "Capture-to-transcript delay after the latest decode")
 
 class TranscriptionService:
     SUPPORTED_LANGUAGES = {
@@ -11,66 +30,454 @@ class TranscriptionService:
         "English": "en",
         "Español": "es"
     }
-    
-    def __init__(self, audio_queue: Queue, text_queue: Queue, model_size: str = "base"):
+    AUTO_LANGUAGE = "Automático"  # detect the language instead of fixing it
+    SAMPLE_RATE = 16000
+    SENTENCE_END = (".", "?", "!", "…")
+
+    def __init__(self, audio_queue: Queue, text_queue: Queue, model_size: str = "base",
+                 window_seconds: float = 2.0, overlap_seconds: float = 0.25,
+                 buffer_seconds: float = 30.0, streaming: bool = False,
+                 step_seconds: float = 0.5, trim_seconds: float = 15.0,
+                 max_sentence_seconds: float = 10.0, vad: Optional[VADSegmenter] = None,
+                 model: Optional["WhisperModel"] = None,
+                 scheduler: Optional[QualityScheduler] = None,
+                 refiner: Optional[RefinementService] = None, history_seconds: float = 30.0,
+                 language_detector: Optional[LanguageDetector] = None):
         self.audio_queue = audio_queue
         self.text_queue = text_queue
         self.running = False
         self.processing_thread: Optional[threading.Thread] = None
-        self.language = "en"  # default language
-        
-        # Initialize Whisper model
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        compute_type = "float16" if device == "cuda" else "int8"
-        
-        self.model = WhisperModel(
-            model_size,
-            device=device,
-            compute_type=compute_type
-        )
-    
+        self.language: Optional[str] = "en"  # None detects it
+        # Optional: in automatic mode, detect the language once and pin it
+        self.language_detector = language_detector
+        self.spoken_language: Optional[str] = None  # latest detected or fixed language
+        self.window_samples = int(window_seconds * self.SAMPLE_RATE)
+        self.overlap_samples = int(overlap_seconds * self.SAMPLE_RATE)
+        self.audio_buffer = AudioRingBuffer(int(buffer_seconds * self.SAMPLE_RATE))
+        self.beam_size = 5  # faster-whisper default
+        self.decode_calls = 0
+        self.decode_seconds = 0.0  # wall time spent in the model
+        self.audio_seconds = 0.0  # captured audio consumed
+        self.speech_seconds = 0.0  # the part of it sent to the model (without the VAD's silence)
+        self.lag_seconds = 0.0  # capture-to-decoded delay of the newest audio
+        self._last_capture_time: Optional[float] = None
+
+        # Optional endpointing stage: only speech reaches the buffer, and
+        # utterances are transcribed whole instead of in fixed windows
+        self.vad = vad
+        self._origin = 0  # absolute sample index of the buffer's first sample
+
+        # Streaming mode: re-decode the growing buffer every step and commit
+        # only the words that consecutive hypotheses agree on
+        self.streaming = streaming
+        self.step_samples = int(step_seconds * self.SAMPLE_RATE)
+        self.trim_samples = int(trim_seconds * self.SAMPLE_RATE)
+        self.max_sentence_seconds = max_sentence_seconds
+        self._hypothesis = HypothesisBuffer()
+        self._sentence: List[Word] = []
+        self._context: List[Word] = []
+        self._last_partial = ""
+        self._samples_since_decode = 0
+
+        # The model is loaded in the background; audio queues up until it is ready
+        self.model: Optional["WhisperModel"] = model
+        self.model_size = model_size
+        self.model_ready = threading.Event()
+        self.model_error: Optional[Exception] = None
+        self.model_loading: Optional[Future] = None  # the latest load_model call
+        if model is not None:
+            self.model_ready.set()
+        else:
+            self.load_model(model_size)
+
+        # Optional controller that trades accuracy for speed to stay real time
+        self.scheduler = scheduler
+        if scheduler is not None:
+            scheduler.apply(self)
+
+        # Speculative mode: finals go out as drafts and a larger model re-decodes
+        # their audio, kept here on the capture clock, in the background
+        self._next_segment_id = 0
+        self.refiner = refiner
+        self._history: Optional[AudioRingBuffer] = None
+        self._history_base = 0  # capture-clock sample index of the history's first write
+        if refiner is not None:
+            self._history = AudioRingBuffer(int(history_seconds * self.SAMPLE_RATE))
+            refiner.attach(text_queue)
+
+    @staticmethod
+    def create_model(model_size: str = "base") -> "WhisperModel":
+        """Return a Whisper model on the best available device, blocking until loaded."""
+        return get_model_cache().get(model_size)
+
+    def load_model(self, model_size: str) -> Future:
+        """Load (or reuse from the cache) a model without blocking the caller.
+
+        The current model, if any, keeps serving until the new one is ready.
+        """
+        self.model_size = model_size
+        self.model_error = None
+        future = get_model_cache().load_async(model_size)
+        future.add_done_callback(lambda f: self._on_model_loaded(model_size, f))
+        self.model_loading = future
+        return future
+
+    def _on_model_loaded(self, model_size: str, future: Future) -> None:
+        if model_size != self.model_size:
+            return  # superseded by a later load_model call
+        try:
+            self.model = future.result()
+        except Exception as e:
+            self.model_error = e
+            print(f"Model loading error: {e}")
+            return
+        self.model_ready.set()
+
     def set_language(self, language_name: str) -> None:
-        """Set the transcription language."""
-        if language_name in self.SUPPORTED_LANGUAGES:
+        """Set the transcription language, or detect it with ``AUTO_LANGUAGE``."""
+        if language_name == self.AUTO_LANGUAGE:
+            self.language = None
+            if self.language_detector is not None:
+                self.language_detector.reset()
+        elif language_name in self.SUPPORTED_LANGUAGES:
             self.language = self.SUPPORTED_LANGUAGES[language_name]
-    
+
+    def _decode_language(self) -> Optional[str]:
+        """Language for the next decode; None lets Whisper detect it."""
+        if self.language is not None or self.language_detector is None:
+            return self.language
+        return self.language_detector.language_for_decode()
+
+    def _observe_language(self, language: Optional[str], info, segments: List, end: float) -> None:
+        if language is None and segments:
+            self.spoken_language = info.language
+        elif language is not None:
+            self.spoken_language = language
+        if self.language is None and self.language_detector is not None:
+            self.language_detector.observe(language, info, segments, end)
+            self.spoken_language = self.language_detector.language or self.spoken_language
+
     def process_audio(self) -> None:
         """Process audio chunks and transcribe them."""
-        audio_buffer = []
-        
+        self.reset()
+
+        while self.running and not self.model_ready.wait(timeout=0.1):
+            if self.model_error is not None:
+                return
+
         while self.running:
             try:
                 audio_chunk = self.audio_queue.get(timeout=0.1)
-                audio_buffer.extend(audio_chunk)
-                
-                # Process when buffer reaches ~2 seconds of audio
-                if len(audio_buffer) >= 32000:  # 2 seconds at 16kHz
-                    audio_data = np.array(audio_buffer)
-                    segments, _ = self.model.transcribe(
-                        audio_data,
-                        language=self.language,
-                        vad_filter=True
-                    )
-                    
-                    text = " ".join(segment.text for segment in segments)
-                    if text.strip():
-                        self.text_queue.put(text)
-                    
-                    # Clear buffer but keep a small overlap
-                    audio_buffer = audio_buffer[-4000:]  # Keep last 0.25 seconds
-            
             except Empty:
                 continue
-    
+            self.process_chunk(audio_chunk)
+
+        self.flush()
+
+    def process_pending(self) -> int:
+        """Process every block already in the audio queue without waiting; returns how many.
+
+        For callers that wake on ``AudioQueue.on_put`` instead of running ``process_audio``.
+        """
+        processed = 0
+        while True:
+            try:
+                audio_chunk = self.audio_queue.get_nowait()
+            except Empty:
+                return processed
+            self.process_chunk(audio_chunk)
+            processed += 1
+
+    def process_chunk(self, audio_chunk: np.ndarray) -> None:
+        """Transcribe one block just taken from the audio queue."""
+        if isinstance(self.audio_queue, AudioQueue):
+            if self.audio_queue.last_gap:
+                self.skip(self.audio_queue.last_gap)
+            self._last_capture_time = self.audio_queue.last_capture_time
+
+        self.feed(audio_chunk)
+        self.audio_seconds += len(audio_chunk) / self.SAMPLE_RATE
+        if self.scheduler is not None:
+            self.scheduler.observe(self)
+
+    @property
+    def degraded(self) -> bool:
+        """Whether the capture queue asked for a cheaper decode to catch up."""
+        return isinstance(self.audio_queue, AudioQueue) and self.audio_queue.overloaded
+
+    @property
+    def backlog_seconds(self) -> float:
+        """Captured audio waiting to be fed to the model."""
+        return self.audio_queue.backlog_seconds if isinstance(self.audio_queue, AudioQueue) else 0.0
+
+    def _decode_options(self) -> Dict:
+        if self.degraded:
+            # Greedy decoding without temperature fallback
+            return {"beam_size": 1, "best_of": 1, "temperature": 0.0}
+        return {"beam_size": self.beam_size}
+
+    def _record_decode(self, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        self.decode_seconds += elapsed
+        _DECODE_SECONDS.observe(elapsed)
+        if self.audio_seconds:
+            _REALTIME_FACTOR.set(self.decode_seconds / self.audio_seconds)
+        if self._last_capture_time is not None:
+            self.lag_seconds = time.monotonic() - self._last_capture_time
+            _LAG_SECONDS.set(self.lag_seconds)
+
+    def skip(self, samples: int) -> None:
+        """Account for audio dropped upstream so timestamps stay on the capture clock."""
+        if self._history is not None:
+            self._history_base += self._history.total_written + samples
+            self._history.clear()
+
+        if self.vad is not None:
+            if len(self.audio_buffer):
+                self._finish_utterance()
+            self.vad.skip(samples)
+            return
+
+        # Close the current window so it is not stitched to audio after the gap
+        written = self.audio_buffer.total_written
+        if self.streaming or len(self.audio_buffer) > self.overlap_samples:
+            self._finish_utterance()
+        self.audio_buffer.clear()
+        self._origin += written + samples
+
+    def feed(self, audio_chunk: np.ndarray) -> None:
+        """Add captured samples and transcribe whatever is ready."""
+        if self._history is not None:
+            self._history.write(audio_chunk)
+
+        if self.vad is None:
+            self._feed_samples(audio_chunk)
+            return
+
+        for chunk in self.vad.process(audio_chunk):
+            if self.audio_buffer.total_written == 0:
+                self._origin = chunk.start
+            if len(chunk.samples):
+                self._feed_samples(chunk.samples)
+            if chunk.end_of_utterance:
+                self._finish_utterance()
+
+    def _feed_samples(self, audio_chunk: np.ndarray) -> None:
+        self.audio_buffer.write(audio_chunk)
+        self.speech_seconds += len(audio_chunk) / self.SAMPLE_RATE
+
+        if self.streaming:
+            self._samples_since_decode += len(audio_chunk)
+            step = self.step_samples * 2 if self.degraded else self.step_samples
+            if self._samples_since_decode >= step:
+                self._samples_since_decode = 0
+                self._decode_streaming()
+
+        # Process when buffer reaches the window length (~2 seconds of audio)
+        elif self.vad is None and len(self.audio_buffer) >= self.window_samples:
+            self._transcribe_window(self.audio_buffer.view())
+
+            # Clear buffer but keep a small overlap
+            self.audio_buffer.keep_last(self.overlap_samples)
+
+    def flush(self) -> None:
+        """Publish whatever is still pending as final text and reset the state."""
+        if self.vad is not None:
+            if len(self.audio_buffer):
+                self._finish_utterance()
+        elif self.streaming:
+            self._publish_final(self._sentence + self._hypothesis.uncommitted())
+        elif len(self.audio_buffer) > self.overlap_samples:
+            self._transcribe_window(self.audio_buffer.view())
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop buffered audio and any uncommitted hypothesis."""
+        self.audio_buffer.clear()
+        self._origin = 0
+        if self._history is not None:
+            self._history.clear()
+            self._history_base = 0
+        if self.vad is not None:
+            self.vad.reset()
+        if self.language_detector is not None:
+            # A new recording is a new stream: detect again, on a capture clock back at 0
+            self.language_detector.reset()
+        self._hypothesis.reset()
+        self._sentence = []
+        self._context = []
+        self._last_partial = ""
+        self._samples_since_decode = 0
+
+    def _finish_utterance(self) -> None:
+        """Transcribe and commit the rest of the current utterance or window."""
+        if self.streaming:
+            if self._samples_since_decode:
+                self._decode_streaming()
+            end = self._buffer_offset() + len(self.audio_buffer) / self.SAMPLE_RATE
+            self._publish_final(self._sentence + self._hypothesis.uncommitted())
+            self._sentence = []
+            self._hypothesis.reset(last_committed_time=end)
+        elif len(self.audio_buffer):
+            self._transcribe_window(self.audio_buffer.view())
+
+        self.audio_buffer.clear()
+        self._samples_since_decode = 0
+
+    def _buffer_offset(self) -> float:
+        """Capture time, in seconds, of the oldest buffered sample."""
+        return (self._origin + self.audio_buffer.start_sample) / self.SAMPLE_RATE
+
+    def _transcribe_window(self, audio_data: np.ndarray) -> None:
+        """Transcribe one contiguous float32 window and publish one final event per segment."""
+        offset = self._buffer_offset()
+        window_end = offset + len(audio_data) / self.SAMPLE_RATE
+        self.decode_calls += 1
+        language = self._decode_language()
+        started = time.perf_counter()
+        segments, info = self.model.transcribe(
+            audio_data,
+            language=language,
+            vad_filter=self.vad is None,
+            **self._decode_options()
+        )
+        segments = list(segments)
+        self._record_decode(started)
+        self._observe_language(language, info, segments, window_end)
+
+        # Whisper's segment times are relative to the window; keep them on the capture clock
+        finals = [
+            (segment.text, offset + segment.start, min(offset + segment.end, window_end))
+            for segment in segments
+            if segment.text.strip()
+        ]
+        for text, start, end in finals:
+            self._emit_final(text, start, end)
+
+    def _decode_streaming(self) -> None:
+        """Decode the whole buffered window and commit its stable prefix."""
+        offset = self._buffer_offset()
+        self.decode_calls += 1
+        language = self._decode_language()
+        started = time.perf_counter()
+        segments, info = self.model.transcribe(
+            self.audio_buffer.view(),
+            language=language,
+            vad_filter=self.vad is None,
+            word_timestamps=True,
+            condition_on_previous_text=False,
+            initial_prompt=self._prompt(offset),
+            **self._decode_options()
+        )
+        segments = list(segments)
+        self._record_decode(started)
+        self._observe_language(language, info, segments, offset + len(self.audio_buffer) / self.SAMPLE_RATE)
+
+        words = [
+            (offset + word.start, offset + word.end, word.word)
+            for segment in segments
+            for word in (segment.words or [])
+        ]
+        self._hypothesis.insert(words)
+        committed = self._hypothesis.flush()
+        self._context = (self._context + committed)[-50:]
+        self._sentence.extend(committed)
+
+        self._commit_sentences()
+        self._publish_partial()
+        self._trim_buffer(offset, [offset + segment.end for segment in segments])
+
+    def _prompt(self, offset: float) -> Optional[str]:
+        """Committed text that already left the buffer, used as decoding context."""
+        text = join_words([word for word in self._context if word[1] <= offset])
+        return text[-200:] or None
+
+    def _commit_sentences(self) -> None:
+        """Publish committed words up to the last sentence boundary as final."""
+        cut = 0
+        for i, (_, _, word) in enumerate(self._sentence):
+            if word.strip().endswith(self.SENTENCE_END):
+                cut = i + 1
+
+        if not cut and self._sentence:
+            duration = self._sentence[-1][1] - self._sentence[0][0]
+            if duration >= self.max_sentence_seconds:
+                cut = len(self._sentence)
+
+        if cut:
+            self._publish_final(self._sentence[:cut])
+            self._sentence = self._sentence[cut:]
+
+    def _publish_final(self, words: List[Word]) -> None:
+        text = join_words(words)
+        if text:
+            self._emit_final(text, words[0][0], words[-1][1])
+        elif self._last_partial:
+            self.text_queue.put(TranscriptEvent(PARTIAL, ""))
+        # The final line replaces whatever partial text was on screen
+        self._last_partial = ""
+
+    def _emit_final(self, text: str, start: float, end: float) -> None:
+        """Publish a final segment, as a draft to be refined when a refiner is attached."""
+        segment_id = self._next_segment_id
+        self._next_segment_id += 1
+        draft = self.refiner is not None
+        language = self.spoken_language
+        self.text_queue.put(TranscriptEvent(FINAL, text, start, end, segment_id, draft, language))
+        if draft:
+            self.refiner.submit(RefinementJob(segment_id, text, start, end, self._span(start, end), language))
+
+    def _span(self, start: float, end: float) -> np.ndarray:
+        """Copy of the captured audio between two capture-clock times, padded."""
+        pad = self.refiner.pad_seconds
+        first = self._history_base + self._history.start_sample
+        last = self._history_base + self._history.total_written
+        lo = min(max(int((start - pad) * self.SAMPLE_RATE), first), last)
+        hi = min(max(int((end + pad) * self.SAMPLE_RATE), lo), last)
+        return self._history.view()[lo - first:hi - first].copy()
+
+    def _publish_partial(self) -> None:
+        words = self._sentence + self._hypothesis.uncommitted()
+        text = join_words(words)
+        if text != self._last_partial:
+            start, end = (words[0][0], words[-1][1]) if words else (0.0, 0.0)
+            self.text_queue.put(TranscriptEvent(PARTIAL, text, start, end))
+            self._last_partial = text
+
+    def _trim_buffer(self, offset: float, segment_ends: List[float]) -> None:
+        """Drop audio that ends before the last committed segment boundary."""
+        if len(self.audio_buffer) < self.trim_samples:
+            return
+
+        last_committed = self._hypothesis.last_committed_time
+        cut = None
+        # Never cut inside the last segment, it is still being decoded
+        for end in segment_ends[:-1]:
+            if end <= last_committed:
+                cut = end
+
+        if cut is None:
+            if len(self.audio_buffer) < self.audio_buffer.capacity - 2 * self.step_samples:
+                return
+            # Nothing committable for a long time; drop audio before the ring overwrites it
+            cut = max(last_committed, offset + (len(self.audio_buffer) - self.trim_samples) / self.SAMPLE_RATE)
+
+        self.audio_buffer.advance(int((cut - offset) * self.SAMPLE_RATE))
+
     def start(self) -> None:
         """Start the transcription service."""
         self.running = True
+        if self.refiner is not None:
+            self.refiner.attach(self.text_queue)
         self.processing_thread = threading.Thread(target=self.process_audio)
         self.processing_thread.start()
-    
+
     def stop(self) -> None:
         """Stop the transcription service."""
         self.running = False
         if self.processing_thread:
             self.processing_thread.join()
-            self.processing_thread = None 
\ No newline at end of file
+            self.processing_thread = None
+        if self.refiner is not None:
+            # Drafts still waiting are confirmed as they are, so none is left unresolved
+            self.refiner.close(wait=False)
@@ -0,0 +1,430 @@
+from dataclasses import replace
+from importlib import import_module
+import multiprocessing
+from queue import Queue, Empty
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from ..core.audio_queue import AudioQueue
+from ..core.events import TranscriptEvent, PARTIAL
+from ..core.metrics import get_registry
+from ..core.quality_scheduler import QualityScheduler
+from ..core.vad import VADSegmenter
+from ..utils.audio_buffer import SharedAudioRing
+from .transcription_service import TranscriptionService
+
+# Same series as the in-process service; the worker reports them in its status messages
+_DECODE_SECONDS = get_registry().histogram("voxa_decode_seconds", "Wall time of one Whisper decode")
+_REALTIME_FACTOR = get_registry().gauge(
+    "voxa_realtime_factor", "Decode seconds per second of audio since the session started")
+_LAG_SECONDS = get_registry().gauge(
+    "voxa_transcription_lag_seconds", "Capture-to-transcript delay after the latest decode")
+
+POLL_INTERVAL = 0.01  # seconds the worker waits for commands when the ring is empty
+STATUS_INTERVAL = 0.5
+MAX_FEED_SAMPLES = 8192  # largest view handed to the service at once
+STABLE_SECONDS = 30.0  # a worker that ran this long resets the restart backoff
+
+
+class _PipeQueue:
+    """Stands in for ``text_queue`` in the worker: events go straight to the parent.
+
+    Also carries the worker's other messages; the refiner publishes from its own thread.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._lock = threading.Lock()
+
+    def send(self, message: Tuple) -> None:
+        with self._lock:
+            self.conn.send(message)
+
+    def put(self, event: TranscriptEvent) -> None:
+        self.send(("event", event))
+
+
+class _RingFedService(TranscriptionService):
+    """TranscriptionService fed from a SharedAudioRing by the worker loop.
+
+    Overload state and backlog come from the ring header, written by the
+    parent's feeder, and decode times are kept for the next status message.
+    """
+
+    def __init__(self, ring: SharedAudioRing, text_queue, **kwargs):
+        self.ring = ring
+        self.gaps: List[Tuple[int, int]] = []  # (ring position, samples dropped before it)
+        self.decode_times: List[float] = []
+        super().__init__(None, text_queue, **kwargs)
+
+    @property
+    def degraded(self) -> bool:
+        return self.ring.overloaded
+
+    @property
+    def backlog_seconds(self) -> float:
+        return self.ring.backlog_seconds + len(self.ring) / self.SAMPLE_RATE
+
+    def _record_decode(self, started: float) -> None:
+        before = self.decode_seconds
+        super()._record_decode(started)
+        self.decode_times.append(self.decode_seconds - before)
+
+    def resume(self, start: int, gaps: List[Tuple[int, int]], next_segment_id: int) -> None:
+        """Begin a session that started at ring position ``start``.
+
+        After a restart the ring has moved on; the clock skips what the
+        previous worker consumed so timestamps continue where it left off,
+        and segment ids continue from ``next_segment_id``, kept by the parent.
+        """
+        self.reset()
+        self._next_segment_id = next_segment_id
+        if self.refiner is not None:
+            self.refiner.attach(self.text_queue)
+        ring = self.ring
+        if ring.read < start:
+            ring.advance(start - ring.read)  # left over from an earlier session
+        behind = ring.read - start + sum(samples for at, samples in gaps if at <= ring.read)
+        if behind:
+            self.skip(behind)
+        self.gaps = [gap for gap in gaps if gap[0] > ring.read]
+
+    def consume(self, until: int) -> bool:
+        """Feed the ring up to position ``until``; returns whether anything was fed."""
+        ring = self.ring
+        fed = False
+        while ring.read < until:
+            position = ring.read
+            if self.gaps and self.gaps[0][0] <= position:
+                self.skip(self.gaps.pop(0)[1])
+                continue
+            end = min(until, self.gaps[0][0] if self.gaps else until, position + MAX_FEED_SAMPLES)
+            newest = ring.capture_time
+            if newest is not None:
+                self._last_capture_time = newest - (ring.written - end) / self.SAMPLE_RATE
+            # Zero-copy: the service copies whatever it keeps before the space is handed back
+            self.feed(ring.view(end - position))
+            ring.advance(end - position)
+            self.audio_seconds += (end - position) / self.SAMPLE_RATE
+            if self.scheduler is not None:
+                self.scheduler.observe(self)
+            fed = True
+        return fed
+
+
+def _load_factory(path: str):
+    module, _, attr = path.partition(":")
+    return getattr(import_module(module), attr)
+
+
+def _worker_main(ring_name: str, commands, conn, options: Dict) -> None:
+    """Entry point of the worker process (must stay importable for ``spawn``)."""
+    results = _PipeQueue(conn)
+    ring = SharedAudioRing.attach(ring_name)
+    options = dict(options)
+    language_name = options.pop("language_name")
+    factory = options.pop("model_factory", None)
+    if factory is not None:
+        try:
+            options["model"] = _load_factory(factory)(options.get("model_size", "base"))
+        except Exception as e:
+            results.send(("error", str(e)))
+            ring.close()
+            return
+    service = _RingFedService(ring, results, **options)
+    if language_name is not None:
+        service.set_language(language_name)
+
+    ready = False
+    running = False
+    last_status = 0.0
+
+    try:
+        while True:
+            if not ready:
+                if service.model_error is not None:
+                    results.send(("error", str(service.model_error)))
+                    return
+                if service.model_ready.is_set():
+                    ready = True
+                    results.send(("ready",))
+
+            # Read the write count before the commands: every gap up to it has been sent already
+            written = ring.written
+            while commands.poll():
+                command, *args = commands.recv()
+                if command == "start":
+                    service.resume(*args)
+                    running = True
+                elif command == "gap":
+                    service.gaps.append(tuple(args))
+                elif command == "language":
+                    service.set_language(args[0])
+                elif command == "stop":
+                    if ready:
+                        service.consume(ring.written)
+                        service.flush()
+                    if service.refiner is not None:
+                        # Confirmations go out before "stopped", so no draft outlives the session
+                        service.refiner.close(wait=False)
+                    running = False
+                    results.send(("stopped",))
+                elif command == "close":
+                    return
+
+            fed = running and ready and service.consume(written)
+
+            now = time.monotonic()
+            if now - last_status >= STATUS_INTERVAL:
+                last_status = now
+                results.send(("status", {
+                    "level_index": service.scheduler.level_index if service.scheduler else None,
+                    "lag_seconds": service.lag_seconds,
+                    "decode_calls": service.decode_calls,
+                    "decode_seconds": service.decode_seconds,
+                    "audio_seconds": service.audio_seconds,
+                    "decode_times": service.decode_times,
+                }))
+                service.decode_times = []
+            if not fed:
+                commands.poll(POLL_INTERVAL)
+    except (EOFError, BrokenPipeError):
+        pass  # the parent went away
+    finally:
+        ring.close()
+
+
+class TranscriptionWorker:
+    """Runs the TranscriptionService in a supervised child process.
+
+    Decoding holds the GIL for long stretches; in a separate process it
+    cannot delay the Tk thread or the capture pump. The parent keeps the
+    AudioQueue (and its overload policy): a feeder thread moves blocks into
+    a SharedAudioRing, which the worker reads in place, and transcript
+    events and periodic status come back over a pipe. Drops are forwarded
+    as gap positions so timestamps stay on the capture clock.
+
+    If the worker dies it is started again, with exponential backoff, and
+    resumes from the ring where the old one stopped reading; audio keeps
+    queueing meanwhile. Exposes the parts of the TranscriptionService
+    interface the app uses.
+    """
+
+    SUPPORTED_LANGUAGES = TranscriptionService.SUPPORTED_LANGUAGES
+    AUTO_LANGUAGE = TranscriptionService.AUTO_LANGUAGE
+    SAMPLE_RATE = TranscriptionService.SAMPLE_RATE
+
+    def __init__(self, audio_queue: Queue, text_queue: Queue, model_size: str = "base",
+                 vad: Optional[VADSegmenter] = None, scheduler: Optional[QualityScheduler] = None,
+                 ring_seconds: float = 4.0, restart_delay: float = 0.5, max_restart_delay: float = 10.0,
+                 model_factory: Optional[str] = None, **options):
+        """``options`` go to TranscriptionService; ``model_factory`` ("module:function",
+        called with the model size in the worker) replaces the Whisper model."""
+        self.audio_queue = audio_queue
+        self.text_queue = text_queue
+        self.scheduler = scheduler  # parent-side copy; its level follows the worker's
+        self.language_name: Optional[str] = None  # service default until set
+        self.options = dict(options, model_size=model_size, vad=vad, model_factory=model_factory)
+        self.ring = SharedAudioRing(int(ring_seconds * self.SAMPLE_RATE))
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+
+        self.running = False
+        self.model_ready = threading.Event()
+        self.model_error: Optional[str] = None
+        self.lag_seconds = 0.0
+        self.decode_calls = 0
+        self.decode_seconds = 0.0
+        self.audio_seconds = 0.0
+        self.restarts = 0
+
+        self._context = multiprocessing.get_context("spawn")
+        self._send_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._closing = threading.Event()
+        self._session_start = 0
+        self._gaps: List[Tuple[int, int]] = []
+        # Segment ids are numbered here so a restarted worker never reuses one
+        self._next_segment_id = 0
+        self._drafts: Dict[int, TranscriptEvent] = {}  # drafts the worker has not resolved yet
+        self._delay = restart_delay
+        self._feeder: Optional[threading.Thread] = None
+
+        registry = get_registry()
+        registry.counter("voxa_transcription_worker_restarts_total", "Transcription worker processes restarted",
+                         fn=lambda: self.restarts)
+        registry.gauge("voxa_transcription_ring_seconds", "Audio in the shared ring waiting for the worker",
+                       fn=lambda: len(self.ring) / self.SAMPLE_RATE)
+
+        self._spawn()
+        self._monitor = threading.Thread(target=self._supervise, name="transcription-supervisor", daemon=True)
+        self._monitor.start()
+
+    def _spawn(self) -> None:
+        commands, self._commands = self._context.Pipe(duplex=False)
+        self._results, results = self._context.Pipe(duplex=False)
+        options = dict(self.options, scheduler=self.scheduler, language_name=self.language_name)
+        self.process = self._context.Process(
+            target=_worker_main, args=(self.ring.name, commands, results, options),
+            name="voxa-transcription", daemon=True
+        )
+        self.process.start()
+        self._spawned_at = time.monotonic()
+        # Only the child holds these ends now, so its exit shows up as EOF here
+        commands.close()
+        results.close()
+
+    def _send(self, message: Tuple) -> None:
+        with self._send_lock:
+            try:
+                self._commands.send(message)
+            except OSError:
+                pass  # the worker is gone; the supervisor brings the state back on restart
+
+    def _supervise(self) -> None:
+        while not self._closing.is_set():
+            try:
+                if self._results.poll(0.1):
+                    self._handle(self._results.recv())
+                    continue
+                if self.process.is_alive():
+                    continue
+            except (EOFError, OSError):
+                self.process.join(timeout=1.0)
+            if self._closing.is_set():
+                break
+            self._restart()
+            if self.model_error is not None:
+                break  # restarting would fail the same way; the pipe is closed for good
+
+    def _handle(self, message: Tuple) -> None:
+        kind = message[0]
+        if kind == "event":
+            event = message[1]
+            if event.segment_id is not None:
+                self._next_segment_id = max(self._next_segment_id, event.segment_id + 1)
+                if event.draft:
+                    self._drafts[event.segment_id] = event
+                else:
+                    self._drafts.pop(event.segment_id, None)
+            self.text_queue.put(event)
+        elif kind == "status":
+            status = message[1]
+            if self.scheduler is not None and status["level_index"] is not None:
+                self.scheduler.level_index = status["level_index"]
+            self.lag_seconds = status["lag_seconds"]
+            self.decode_calls = status["decode_calls"]
+            self.decode_seconds = status["decode_seconds"]
+            self.audio_seconds = status["audio_seconds"]
+            for elapsed in status["decode_times"]:
+                _DECODE_SECONDS.observe(elapsed)
+            _LAG_SECONDS.set(self.lag_seconds)
+            if self.audio_seconds:
+                _REALTIME_FACTOR.set(self.decode_seconds / self.audio_seconds)
+        elif kind == "ready":
+            self.model_ready.set()
+        elif kind == "error":
+            self.model_error = message[1]
+            print(f"Model loading error: {self.model_error}")
+        elif kind == "stopped":
+            self._stopped.set()
+
+    def _restart(self) -> None:
+        if self.process.is_alive():
+            self.process.terminate()  # closed its pipe but did not exit
+            self.process.join()
+        # The lost worker's partial line will never be finalized
+        self.text_queue.put(TranscriptEvent(PARTIAL, ""))
+        # Nor will its drafts be refined: confirm them as they are
+        for event in self._drafts.values():
+            self.text_queue.put(replace(event, draft=False))
+        self._drafts.clear()
+        self._stopped.set()
+        if self.model_error is not None:
+            return  # the model could not be loaded; the supervisor gives up
+        if time.monotonic() - self._spawned_at >= STABLE_SECONDS:
+            self._delay = self.restart_delay
+        print(f"Transcription worker exited (code {self.process.exitcode}); restarting in {self._delay:.1f} s")
+        if self._closing.wait(self._delay):
+            return
+        self._delay = min(self._delay * 2, self.max_restart_delay)
+        self.restarts += 1
+        with self._send_lock:
+            self._spawn()
+        if self.running:
+            self._send(("start", self._session_start, list(self._gaps), self._next_segment_id))
+
+    def set_language(self, language_name: str) -> None:
+        """Set the transcription language, or detect it with ``AUTO_LANGUAGE``."""
+        if language_name in self.SUPPORTED_LANGUAGES or language_name == self.AUTO_LANGUAGE:
+            self.language_name = language_name
+            self._send(("language", language_name))
+
+    @property
+    def degraded(self) -> bool:
+        """Whether the capture queue asked for a cheaper decode to catch up."""
+        return isinstance(self.audio_queue, AudioQueue) and self.audio_queue.overloaded
+
+    def _feed(self) -> None:
+        """Move captured blocks from the audio queue into the shared ring."""
+        ring = self.ring
+        while self.running:
+            try:
+                block = self.audio_queue.get(timeout=0.1)
+            except Empty:
+                continue
+            capture_time = None
+            if isinstance(self.audio_queue, AudioQueue):
+                capture_time = self.audio_queue.last_capture_time
+                if self.audio_queue.last_gap:
+                    gap = (ring.written, self.audio_queue.last_gap)
+                    self._gaps.append(gap)
+                    self._send(("gap",) + gap)
+
+            block = np.asarray(block, dtype=np.float32).reshape(-1)
+            piece = ring.capacity // 4
+            for start in range(0, len(block), piece):
+                # A full ring holds the block back, so the audio queue's overload policy applies
+                while not ring.write(block[start:start + piece], capture_time):
+                    if not self.running:
+                        return
+                    time.sleep(POLL_INTERVAL)
+            if isinstance(self.audio_queue, AudioQueue):
+                ring.backlog_seconds = self.audio_queue.backlog_seconds
+                ring.overloaded = self.audio_queue.overloaded
+
+    def start(self) -> None:
+        """Start feeding captured audio to the worker."""
+        self.running = True
+        self._session_start = self.ring.written
+        self._gaps = []
+        self._send(("start", self._session_start, [], self._next_segment_id))
+        self._feeder = threading.Thread(target=self._feed, name="transcription-feeder", daemon=True)
+        self._feeder.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop feeding and wait for the worker to transcribe what it already has."""
+        self.running = False
+        if self._feeder:
+            self._feeder.join()
+            self._feeder = None
+        if self.model_error is not None:
+            return  # the worker exited without a model; there is nothing to transcribe
+        self._stopped.clear()
+        self._send(("stop",))
+        self._stopped.wait(timeout)
+
+    def close(self) -> None:
+        """Stop the worker process and free the shared ring."""
+        if self.running:
+            self.stop()
+        self._closing.set()
+        self._send(("close",))
+        self._monitor.join()
+        self.process.join(timeout=5.0)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.ring.close()
+        self.ring.unlink()
@@ -0,0 +1,167 @@
+from abc import ABC, abstractmethod
+import time
+from typing import List, Optional
+from ..core.metrics import get_registry
+
+_BATCH_FALLBACKS = get_registry().counter(
+    "voxa_translation_batch_fallbacks_total",
+    "Joined batches whose reply did not split back into one line per segment (batching is then turned off)")
+
+
+class TranslationBackend(ABC):
+    """A translation provider used by ``TranslationService``.
+
+    Backends are shared by all translation threads; ``concurrency`` is how
+    many requests they are meant to have in flight at once.
+    """
+
+    concurrency: int = 4
+    batching: bool = True  # whether translate_batch sends several segments in one request
+
+    @abstractmethod
+    def translate(self, text: str, source: str, target: str) -> str:
+        """Translate one segment."""
+
+    def translate_batch(self, texts: List[str], source: str, target: str) -> List[str]:
+        """Translate several segments, in one request where the provider allows it.
+
+        The default joins the segments one per line. If the reply does not
+        split back into the same number of lines, each segment is sent on
+        its own and ``batching`` is turned off, so later batches do not pay
+        for the joined request again (TranslationStage then sends segments
+        one at a time).
+        """
+        if len(texts) == 1 or not self.batching:
+            return [self.translate(text, source, target).strip() for text in texts]
+        parts = self.translate("\n".join(texts), source, target).split("\n")
+        if len(parts) != len(texts):
+            _BATCH_FALLBACKS.inc()
+            self.batching = False
+            print(f"Translation batch came back with {len(parts)} lines for {len(texts)} segments; "
+                  "sending segments one at a time")
+            parts = [self.translate(text, source, target) for text in texts]
+        return [part.strip() for part in parts]
+
+    def close(self) -> None:
+        """Release pooled connections."""
+
+
+class _PooledHTTPBackend(TranslationBackend):
+    """Keeps one ``requests`` session whose connection pool holds ``concurrency`` keep-alive connections."""
+
+    def __init__(self, concurrency: int = 4, timeout: float = 5.0):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.session = requests.Session()
+        # pool_block makes extra requests wait for a free connection instead of opening new ones
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class GoogleBackend(_PooledHTTPBackend):
+    """Google Translate's free web endpoint, as scraped by deep-translator.
+
+    The endpoint, page layout and errors come from deep-translator's
+    ``GoogleTranslator``; requests go through the pooled session so every
+    segment reuses an open connection.
+    """
+
+    def __init__(self, concurrency: int = 4, timeout: float = 5.0, base_url: Optional[str] = None):
+        from deep_translator import GoogleTranslator
+
+        super().__init__(concurrency, timeout)
+        self._reference = GoogleTranslator(source="auto", target="en")
+        self.base_url = base_url or self._reference._base_url
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        from bs4 import BeautifulSoup
+        from deep_translator.exceptions import RequestError, TooManyRequests, TranslationNotFound
+
+        text = text.strip()
+        if not text or source == target:
+            return text
+
+        response = self.session.get(self.base_url, params={"tl": target, "sl": source, "q": text},
+                                    timeout=self.timeout)
+        if response.status_code == 429:
+            raise TooManyRequests()
+        if response.status_code != 200:
+            raise RequestError()
+
+        soup = BeautifulSoup(response.text, "html.parser")
+        element = soup.find(self._reference._element_tag, self._reference._element_query)
+        if not element:
+            element = soup.find(self._reference._element_tag, self._reference._alt_element_query)
+            if not element:
+                raise TranslationNotFound(text)
+        return element.get_text(strip=True)
+
+
+class LibreTranslateBackend(_PooledHTTPBackend):
+    """Any LibreTranslate-compatible HTTP endpoint, e.g. a self-hosted server.
+
+    Batches are sent natively as a list in one ``POST /translate``.
+    """
+
+    def __init__(self, url: str, api_key: Optional[str] = None, concurrency: int = 4,
+                 timeout: float = 5.0):
+        super().__init__(concurrency, timeout)
+        self.url = url.rstrip("/") + "/translate"
+        self.api_key = api_key
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        return self.translate_batch([text], source, target)[0]
+
+    def translate_batch(self, texts: List[str], source: str, target: str) -> List[str]:
+        payload = {"q": texts, "source": source, "target": target, "format": "text"}
+        if self.api_key:
+            payload["api_key"] = self.api_key
+        response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        translated = response.json()["translatedText"]
+        if isinstance(translated, str):
+            translated = [translated]
+        if len(translated) != len(texts):
+            raise ValueError(f"expected {len(texts)} translations, got {len(translated)}")
+        return translated
+
+
+class StubBackend(TranslationBackend):
+    """In-process backend for tests and benchmarks: tags each line with the target language."""
+
+    def __init__(self, latency: float = 0.0, concurrency: int = 4):
+        self.latency = latency
+        self.concurrency = concurrency
+        self.requests = 0
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return "\n".join(f"[{target}] {line}" if line.strip() else line for line in text.split("\n"))
+
+
+def create_translation_backend(spec: str = "google", concurrency: int = 4,
+                               timeout: float = 5.0) -> TranslationBackend:
+    """Build a backend from a spec string.
+
+    ``google`` (Google Translate web), ``libre:<url>`` (LibreTranslate API at
+    ``<url>``, with an optional API key as ``libre:<url>#<key>``) or
+    ``stub[:<latency>]`` (no network).
+    """
+    kind, _, arg = spec.partition(":")
+    if kind == "google":
+        return GoogleBackend(concurrency, timeout)
+    if kind == "libre" and arg:
+        url, _, api_key = arg.partition("#")
+        return LibreTranslateBackend(url, api_key or None, concurrency, timeout)
+    if kind == "stub":
+        return StubBackend(float(arg) if arg else 0.0, concurrency)
+    raise ValueError(f"Backend de tradução inválido: {spec}")
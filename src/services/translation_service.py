@@ -1,5 +1,14 @@
-from deep_translator import GoogleTranslator
-from typing import Optional
+import time
+from typing import List, Optional
+from ..core.metrics import get_registry
+from ..core.translation_cache import TranslationCache
+from .translation_backends import GoogleBackend, TranslationBackend
+
+_SEGMENTS = get_registry().counter("voxa_translation_segments_total", "Segments submitted for translation")
+_CACHED = get_registry().counter("voxa_translation_cached_total", "Segments answered from the translation cache")
+_REQUEST_SECONDS = get_registry().histogram(
+    "voxa_translation_request_seconds", "Wall time of one backend translation request")
+_ERRORS = get_registry().counter("voxa_translation_errors_total", "Backend translation requests that failed")
 
 class TranslationService:
     SUPPORTED_LANGUAGES = {
@@ -8,49 +17,74 @@ class TranslationService:
         "Español": "es"
     }
     
-    def __init__(self):
+    def __init__(self, cache: Optional[TranslationCache] = None,
+                 backend: Optional[TranslationBackend] = None):
         self.source_lang = "en"
         self.target_lang = "pt"
-        self._update_translator()
-        self._last_text: Optional[str] = None
-        self._last_translation: Optional[str] = None
+        # Shared by all threads; languages are passed per request
+        self.backend = backend if backend is not None else GoogleBackend()
+        # Keyed by language pair, so switching languages never returns a stale result
+        self.cache = cache if cache is not None else TranslationCache()
     
     def set_languages(self, source_lang_name: str, target_lang_name: str) -> None:
         """Set the source and target languages for translation."""
         if source_lang_name in self.SUPPORTED_LANGUAGES and target_lang_name in self.SUPPORTED_LANGUAGES:
             self.source_lang = self.SUPPORTED_LANGUAGES[source_lang_name]
             self.target_lang = self.SUPPORTED_LANGUAGES[target_lang_name]
-            self._update_translator()
     
-    def _update_translator(self) -> None:
-        """Update the translator with current language settings."""
-        self.translator = GoogleTranslator(
-            source=self.source_lang,
-            target=self.target_lang
-        )
+    def set_language_codes(self, source_lang: str, target_lang: str) -> None:
+        """Set the source and target languages by ISO code (e.g. "en", "pt")."""
+        self.source_lang = source_lang
+        self.target_lang = target_lang
     
-    def translate(self, text: str) -> str:
+    def translate(self, text: str, raise_errors: bool = False) -> str:
         """Translate the given text.
         
         Args:
             text: Text to translate
+            raise_errors: Raise instead of returning an error marker
         
         Returns:
             Translated text
         """
-        # Skip if text is empty or only whitespace
-        if not text.strip():
-            return ""
+        return self.translate_batch([text], raise_errors)[0]
+    
+    def translate_batch(self, texts: List[str], raise_errors: bool = False,
+                        source: Optional[str] = None) -> List[str]:
+        """Translate several segments, sending the uncached ones to the backend together.
+        
+        ``source`` overrides the source language, e.g. with the one detected for these segments.
+        """
+        source, target = source or self.source_lang, self.target_lang
+        if source == target:
+            return list(texts)
+        translations: List[Optional[str]] = []
+        missing: List[int] = []
+        for i, text in enumerate(texts):
+            # Skip if text is empty or only whitespace
+            cached = self.cache.get(source, target, text) if text.strip() else ""
+            translations.append(cached)
+            if cached is None:
+                missing.append(i)
         
-        # Skip if text is the same as last time
-        if text == self._last_text:
-            return self._last_translation or ""
+        _SEGMENTS.inc(len(texts))
+        _CACHED.inc(len(texts) - len(missing))
+        if not missing:
+            return translations
         
+        started = time.perf_counter()
         try:
-            translation = self.translator.translate(text)
-            self._last_text = text
-            self._last_translation = translation
-            return translation
+            lines = [" ".join(texts[i].split()) for i in missing]
+            parts = self.backend.translate_batch(lines, source, target)
+            _REQUEST_SECONDS.observe(time.perf_counter() - started)
+            for i, translation in zip(missing, parts):
+                translation = translation.strip()
+                self.cache.put(source, target, texts[i], translation)
+                translations[i] = translation
+            return translations
         except Exception as e:
+            _ERRORS.inc()
+            if raise_errors:
+                raise
             print(f"Translation error: {e}")
-            return f"[Translation Error: {str(e)}]" 
\ No newline at end of file
+            return [t if t is not None else f"[Translation Error: {str(e)}]" for t in translations] 
\ No newline at end of file
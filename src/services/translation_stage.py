@@ -0,0 +1,200 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from ..core.metrics import get_registry
+from .translation_service import TranslationService
+
+# Called in submission order with (segment id, text, translation or None, error or None)
+ResultCallback = Callable[[Any, str, Optional[str], Optional[Exception]], None]
+
+Pending = Tuple[int, Any, str, float, Optional[str]]  # (sequence number, segment id, text, submit time, source)
+
+_LATENCY_SECONDS = get_registry().histogram(
+    "voxa_translation_latency_seconds", "Segment submit to translation result, including batching and retries")
+_TIMEOUTS = get_registry().counter("voxa_translation_timeouts_total", "Translation attempts that timed out")
+_RETRIES = get_registry().counter("voxa_translation_retries_total", "Translation attempts that were retries")
+_FAILED = get_registry().counter("voxa_translation_failed_total", "Segments delivered without a translation")
+
+
+class TranslationStage:
+    """Translates transcript segments concurrently and delivers them in order.
+
+    Submitted segments are coalesced into batches: a batch is sent once
+    ``batch_window`` seconds have passed since its oldest segment arrived,
+    or once it holds ``max_batch`` segments or ``max_batch_chars``
+    characters, and only when fewer than ``max_in_flight`` requests (by
+    default the backend's concurrency) are running, so a backlog turns
+    into fewer, larger requests. Segments submitted with different source
+    languages never share a batch. Each attempt is bounded by ``timeout``
+    seconds and failed attempts are retried with exponential backoff.
+    Results are handed to ``on_result`` strictly in submission order, so a
+    slow segment holds back the ones after it but never the transcript
+    itself.
+    """
+
+    def __init__(self, translation_service: TranslationService, on_result: ResultCallback,
+                 max_in_flight: Optional[int] = None, timeout: float = 5.0, retries: int = 2,
+                 backoff: float = 0.5, batch_window: float = 0.3, max_batch: int = 8,
+                 max_batch_chars: int = 4000):
+        self.translation_service = translation_service
+        self.on_result = on_result
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_batch_chars = max_batch_chars
+        if max_in_flight is None:
+            max_in_flight = translation_service.backend.concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="translate")
+        # One slot per backend call actually running: a call whose attempt timed out keeps its
+        # slot until it returns, so retries never push the backend past ``max_in_flight``
+        self._calls = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="translate-call")
+        self._slots = threading.Semaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._deliver_lock = threading.Lock()
+        self._pending: Deque[Pending] = deque()
+        self._closing = False
+        self._next_seq = 0
+        self._deliver_seq = 0
+        self._done: Dict[int, Tuple[Any, str, Optional[str], Optional[Exception]]] = {}
+        self._dispatcher = threading.Thread(target=self._dispatch, name="translate-dispatch", daemon=True)
+        self._dispatcher.start()
+
+        # Statistics
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.timeouts = 0
+        self.batches = 0
+
+    @property
+    def pending(self) -> int:
+        """Segments submitted but not yet delivered."""
+        return self._next_seq - self._deliver_seq
+
+    def submit(self, segment_id: Any, text: str, source: Optional[str] = None) -> None:
+        """Queue a segment for translation without blocking; ``source`` overrides the service's."""
+        with self._lock:
+            self._pending.append((self._next_seq, segment_id, text, time.monotonic(), source))
+            self._next_seq += 1
+            self._wakeup.notify()
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._lock:
+                while not self._pending and not self._closing:
+                    self._wakeup.wait()
+                if not self._pending:
+                    return
+                # Give later segments a moment to join the batch
+                while not self._closing and not self._batch_full():
+                    remaining = self._pending[0][3] + self.batch_window - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.wait(remaining)
+
+            self._slots.acquire()
+            with self._lock:
+                batch = self._take_batch()
+            self.batches += 1
+            try:
+                self._executor.submit(self._run, batch)
+            except RuntimeError:
+                self._slots.release()
+                return  # closed without waiting; what is left is dropped
+
+    @property
+    def _batch_limit(self) -> int:
+        # A backend that could not split a joined reply back gets one segment per request
+        return self.max_batch if self.translation_service.backend.batching else 1
+
+    def _batch_full(self) -> bool:
+        if len(self._pending) >= self._batch_limit:
+            return True
+        return sum(len(pending[2]) for pending in self._pending) >= self.max_batch_chars
+
+    def _take_batch(self) -> List[Pending]:
+        batch: List[Pending] = []
+        chars = 0
+        while self._pending and len(batch) < self._batch_limit:
+            if batch and self._pending[0][4] != batch[0][4]:
+                break  # one source language per request
+            chars += len(self._pending[0][2])
+            if batch and chars > self.max_batch_chars:
+                break
+            batch.append(self._pending.popleft())
+        return batch
+
+    def _run(self, batch: List[Pending]) -> None:
+        texts = [pending[2] for pending in batch]
+        source = batch[0][4]
+        translations: List[Optional[str]] = [None] * len(batch)
+        error: Optional[Exception] = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.retried += 1
+                _RETRIES.inc()
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+                self._slots.acquire()  # the dispatcher took the first attempt's
+            try:
+                translations = self._attempt(texts, source)
+                error = None
+                break
+            except TimeoutError:
+                self.timeouts += 1
+                _TIMEOUTS.inc()
+                error = TimeoutError(f"no response after {self.timeout:.0f} s")
+            except Exception as e:
+                error = e
+
+        if error is not None:
+            self.failed += len(batch)
+            _FAILED.inc(len(batch))
+            print(f"Translation error: {error}")
+        else:
+            self.completed += len(batch)
+        now = time.monotonic()
+        for pending in batch:
+            _LATENCY_SECONDS.observe(now - pending[3])
+        for (seq, segment_id, text, _, _), translation in zip(batch, translations):
+            self._complete(seq, (segment_id, text, translation if error is None else None, error))
+
+    def _attempt(self, texts: List[str], source: Optional[str]) -> List[str]:
+        """Run one backend call on a slot already taken, waiting at most ``timeout`` seconds.
+
+        The slot is given back when the call returns, not when the wait ends.
+        """
+        try:
+            call = self._calls.submit(self.translation_service.translate_batch, texts, raise_errors=True,
+                                      source=source)
+        except RuntimeError:
+            self._slots.release()
+            raise
+        call.add_done_callback(lambda _: self._slots.release())
+        return call.result(timeout=self.timeout)
+
+    def _complete(self, seq: int, result: Tuple[Any, str, Optional[str], Optional[Exception]]) -> None:
+        # Delivery happens under a lock so callbacks never overtake each other
+        with self._deliver_lock:
+            self._done[seq] = result
+            while self._deliver_seq in self._done:
+                ready = self._done.pop(self._deliver_seq)
+                self._deliver_seq += 1
+                try:
+                    self.on_result(*ready)
+                except Exception as e:
+                    print(f"Translation callback error: {e}")
+
+    def close(self, wait: bool = True) -> None:
+        """Stop accepting segments; with ``wait``, deliver the pending ones first."""
+        with self._lock:
+            self._closing = True
+            self._wakeup.notify()
+        if wait:
+            self._dispatcher.join()
+        self._executor.shutdown(wait=wait)
+        self._calls.shutdown(wait=False)
@@ -1,10 +1,25 @@
 import customtkinter as ctk
 from typing import Optional, List
 from ..services.audio_service import AudioService
+from ..services.audio_sources import create_audio_source
+from ..services.pipeline import Display, DisplayStage, PersistStage, Pipeline, TranslateStage, TranslationResult
+from ..services.refinement_service import RefinementService
 from ..services.transcription_service import TranscriptionService
+from ..services.transcription_worker import TranscriptionWorker
+from ..services.translation_backends import create_translation_backend
 from ..services.translation_service import TranslationService
+from ..core.audio_queue import AudioQueue, DROP_SILENCE
 from ..core.conversation_manager import ConversationManager
-import queue
+from ..core.events import TranscriptEvent
+from ..core.history_store import HistoryStore
+from ..core.language_detector import LanguageDetector
+from ..core.metrics import get_registry
+from ..core.quality_scheduler import CPU_LEVELS, QualityScheduler
+from ..core.translation_cache import TranslationCache
+from ..core.vad import VADSegmenter
+from ..utils.export import FORMATS, write_export
+from ..utils.profiler import SamplingProfiler
+from .ui_scheduler import UIUpdateScheduler
 import threading
 from tkinter import filedialog
 import os
@@ -23,22 +38,121 @@ class VoxaApp(ctk.CTk):
         ctk.set_default_color_theme("dark-blue")
         
         # Initialize services
-        self.audio_queue = queue.Queue()
-        self.text_queue = queue.Queue()
-        self.audio_service = AudioService(self.audio_queue)
-        self.transcription_service = TranscriptionService(self.audio_queue, self.text_queue)
-        self.translation_service = TranslationService()
-        self.conversation_manager = ConversationManager()
+        self.audio_queue = AudioQueue(
+            max_seconds=10.0,
+            policy=os.environ.get("VOXA_OVERLOAD_POLICY", DROP_SILENCE)
+        )
+        self.audio_service = AudioService(self.audio_queue, source=self._create_audio_source())
+        # Capture → transcribe → translate → persist → display; the stages are set up with the UI
+        self.pipeline = Pipeline(self.audio_service)
+        self.transcription_service = self._create_transcription_service()
+        self.pipeline.transcription_service = self.transcription_service
+        self.translation_service = TranslationService(
+            cache=TranslationCache(
+                db_path=os.path.join(os.path.expanduser("~"), "voxa_history", "translations.db")
+            ),
+            backend=self._create_translation_backend()
+        )
+        self.history_store = HistoryStore()
+        self.conversation_manager = ConversationManager(store=self.history_store)
+        # Index daily files written before the store existed (unchanged files are skipped)
+        threading.Thread(target=self.history_store.import_dir, daemon=True).start()
         
         # Initialize UI state
         self.is_recording = False
-        self.recording_thread: Optional[threading.Thread] = None
         self.should_translate = False
+        # Entries from here on are the ones on screen (and what "Salvar" writes)
+        self.shown_since = datetime.now()
         self.languages = list(TranscriptionService.SUPPORTED_LANGUAGES.keys())
+        # "Automático" detects the spoken language; translation then uses the detected one
+        self.auto_language = False
+        self._shown_language: Optional[str] = None
         
         self._create_widgets()
         self._create_layout()
-        self._start_processing_thread()
+        # Text from worker threads reaches the text boxes through this, on the Tk thread
+        self.ui_scheduler = UIUpdateScheduler(self, fps=30, max_lines=1000)
+        self.ui_scheduler.start()
+        self._register_metrics()
+        self.metrics_server = self._start_metrics_server()
+        # Opt-in sampling profiler for the whole session, written on close
+        self.profile_path = os.environ.get("VOXA_PROFILE")
+        self.profiler = SamplingProfiler().start() if self.profile_path else None
+        self.translate_stage = TranslateStage(self.translation_service)
+        self.persist_stage = PersistStage(self.conversation_manager)
+        self.pipeline.stages = [self.translate_stage, self.persist_stage, DisplayStage(_TextDisplay(self))]
+        self.pipeline.start()
+        self._poll_model_loading()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+    
+    @staticmethod
+    def _create_audio_source():
+        """Capture backend from VOXA_AUDIO_SOURCE (cable, default, device:<name>, file:<path>[@speed])."""
+        spec = os.environ.get("VOXA_AUDIO_SOURCE", "cable")
+        try:
+            return create_audio_source(spec)
+        except ValueError as e:
+            print(f"{e}; usando VB-Cable")
+            return create_audio_source("cable")
+    
+    def _create_transcription_service(self):
+        """Transcribe in-process, or in a supervised worker process when VOXA_TRANSCRIPTION_WORKER=1.
+        
+        With VOXA_REFINE_MODEL=<size> drafts come from a fast model and are replaced by <size>'s.
+        """
+        options = dict(streaming=True, vad=VADSegmenter(), scheduler=QualityScheduler(),
+                       language_detector=LanguageDetector())
+        refine_model = os.environ.get("VOXA_REFINE_MODEL")
+        if refine_model:
+            # The draft model stays on the cheap greedy levels; accuracy comes from the refiner
+            options.update(scheduler=QualityScheduler(levels=CPU_LEVELS[:2], start_level=0),
+                           refiner=RefinementService(refine_model))
+        if os.environ.get("VOXA_TRANSCRIPTION_WORKER") == "1":
+            return TranscriptionWorker(self.audio_queue, self.pipeline, **options)
+        return TranscriptionService(self.audio_queue, self.pipeline, **options)
+    
+    @staticmethod
+    def _create_translation_backend():
+        """Translation backend from VOXA_TRANSLATION_BACKEND (google, libre:<url>[#<key>], stub)."""
+        spec = os.environ.get("VOXA_TRANSLATION_BACKEND", "google")
+        try:
+            return create_translation_backend(spec)
+        except ValueError as e:
+            print(f"{e}; usando Google")
+            return create_translation_backend("google")
+    
+    def _register_metrics(self):
+        """Expose the depth of every queue between the pipeline stages."""
+        registry = get_registry()
+        registry.gauge("voxa_audio_queue_blocks", "Captured blocks waiting for transcription",
+                       fn=self.audio_queue.qsize)
+        registry.gauge("voxa_audio_backlog_seconds", "Seconds of audio waiting for transcription",
+                       fn=lambda: self.audio_queue.backlog_seconds)
+        registry.counter("voxa_audio_dropped_seconds_total", "Audio dropped by the overload policy",
+                         fn=lambda: self.audio_queue.dropped_seconds)
+        registry.gauge("voxa_text_queue_depth", "Transcript events waiting in the pipeline's text stages",
+                       fn=self.pipeline.qsize)
+        registry.gauge("voxa_translation_pending", "Segments waiting for a translation request",
+                       fn=lambda: self.translate_stage.pending)
+        registry.gauge("voxa_ui_pending_updates", "Text updates waiting for the next frame",
+                       fn=lambda: self.ui_scheduler.pending)
+        registry.gauge("voxa_history_entries", "Entries in today's conversation history",
+                       fn=lambda: len(self.conversation_manager.get_entries()))
+    
+    @staticmethod
+    def _start_metrics_server():
+        """Serve /metrics on localhost when VOXA_METRICS_PORT is set."""
+        port = os.environ.get("VOXA_METRICS_PORT")
+        if not port:
+            return None
+        from ..services.metrics_server import MetricsServer
+        try:
+            server = MetricsServer(port=int(port)).start()
+        except (OSError, ValueError) as e:
+            print(f"Metrics server error: {e}")
+            return None
+        print(f"Métricas em {server.url}/metrics")
+        return server
     
     def _create_widgets(self):
         # Create main containers
@@ -48,11 +162,19 @@ class VoxaApp(ctk.CTk):
         # Create status label
         self.status_label = ctk.CTkLabel(
             self.sidebar,
-            text=self.audio_service.get_status(),
+            text="Carregando modelo de transcrição...",
             font=("Segoe UI", 12),
             wraplength=180
         )
         
+        # Lag and dropped-audio indicator, refreshed while recording
+        self.pipeline_label = ctk.CTkLabel(
+            self.sidebar,
+            text="",
+            font=("Segoe UI", 11),
+            wraplength=180
+        )
+        
         # Create language selection frame
         self.lang_frame = ctk.CTkFrame(self.sidebar)
         
@@ -66,7 +188,7 @@ class VoxaApp(ctk.CTk):
         self.source_lang_var = ctk.StringVar(value="English")
         self.source_lang_menu = ctk.CTkOptionMenu(
             self.lang_frame,
-            values=self.languages,
+            values=[TranscriptionService.AUTO_LANGUAGE] + self.languages,
             variable=self.source_lang_var,
             command=self._on_language_change,
             width=140
@@ -93,7 +215,7 @@ class VoxaApp(ctk.CTk):
             self.sidebar,
             text="Start Recording",
             command=self._toggle_recording,
-            state="normal" if self.audio_service.cable_device is not None else "disabled"
+            state="disabled"  # enabled once the model is loaded
         )
         
         # Create translation checkbox
@@ -111,12 +233,35 @@ class VoxaApp(ctk.CTk):
             corner_radius=4
         )
         
+        # Optional pipeline statistics panel
+        self.stats_var = ctk.BooleanVar(value=False)
+        self.stats_checkbox = ctk.CTkCheckBox(
+            self.sidebar,
+            text="Estatísticas",
+            variable=self.stats_var,
+            command=self._on_stats_toggle,
+            font=("Segoe UI", 12),
+            width=20,
+            height=20,
+            checkbox_width=16,
+            checkbox_height=16,
+            corner_radius=4
+        )
+        self.stats_label = ctk.CTkLabel(
+            self.sidebar,
+            text="",
+            font=("Consolas", 10),
+            justify="left",
+            wraplength=180
+        )
+        
         # Create text areas
         self.transcription_text = ctk.CTkTextbox(
             self.main_content,
             height=250,
             font=("Segoe UI", 12)
         )
+        self.transcription_text.tag_config("partial", foreground="gray60")
         self.translation_text = ctk.CTkTextbox(
             self.main_content,
             height=250,
@@ -164,7 +309,7 @@ class VoxaApp(ctk.CTk):
         self.main_content.grid(row=0, column=1, sticky="nsew", padx=10, pady=10)
         
         # Configure sidebar
-        self.sidebar.grid_rowconfigure(6, weight=1)
+        self.sidebar.grid_rowconfigure(8, weight=1)
         self.status_label.grid(row=0, column=0, padx=10, pady=(10, 5))
         
         # Language selection frame
@@ -182,6 +327,9 @@ class VoxaApp(ctk.CTk):
         self.clear_button.grid(row=0, column=0, padx=5, pady=5)
         self.save_button.grid(row=1, column=0, padx=5, pady=5)
         
+        self.pipeline_label.grid(row=5, column=0, padx=10, pady=5)
+        self.stats_checkbox.grid(row=6, column=0, padx=10, pady=5)
+        
         # Configure main content
         self.main_content.grid_columnconfigure(0, weight=1)
         self.main_content.grid_rowconfigure(1, weight=1)
@@ -195,6 +343,20 @@ class VoxaApp(ctk.CTk):
         self._update_translation_visibility()
         self._update_language_labels()
     
+    def _poll_model_loading(self) -> None:
+        """Enable recording once the transcription model has loaded in the background."""
+        service = self.transcription_service
+        if service.model_error is not None:
+            self.status_label.configure(text=f"Erro ao carregar o modelo: {service.model_error}")
+            return
+        if not service.model_ready.is_set():
+            self.after(200, self._poll_model_loading)
+            return
+        
+        self.status_label.configure(text=self.audio_service.get_status())
+        if self.audio_service.is_available():
+            self.record_button.configure(state="normal")
+    
     def _on_language_change(self, _: str = None) -> None:
         """Handle language selection change."""
         source_lang = self.source_lang_var.get()
@@ -202,7 +364,13 @@ class VoxaApp(ctk.CTk):
         
         # Update services
         self.transcription_service.set_language(source_lang)
-        if self.should_translate:
+        self.auto_language = source_lang == TranscriptionService.AUTO_LANGUAGE
+        self.translate_stage.auto_language = self.auto_language
+        self._shown_language = None
+        if self.auto_language:
+            # The source comes with each segment
+            self.translation_service.target_lang = TranslationService.SUPPORTED_LANGUAGES[target_lang]
+        elif self.should_translate:
             self.translation_service.set_languages(source_lang, target_lang)
         
         # Update labels
@@ -211,6 +379,8 @@ class VoxaApp(ctk.CTk):
     def _update_language_labels(self) -> None:
         """Update the labels to show the selected languages."""
         source_lang = self.source_lang_var.get()
+        if self.auto_language and self._shown_language:
+            source_lang = f"{source_lang}: {self._shown_language}"
         self.transcription_label.configure(text=f"Transcrição ({source_lang})")
         
         if self.should_translate:
@@ -220,14 +390,18 @@ class VoxaApp(ctk.CTk):
     def _on_translate_toggle(self):
         """Handle translation checkbox toggle."""
         self.should_translate = self.translate_var.get()
+        self.translate_stage.enabled = self.should_translate
         self._update_translation_visibility()
         
         if self.should_translate:
             # Update translation service with current languages
-            self.translation_service.set_languages(
-                self.source_lang_var.get(),
-                self.target_lang_var.get()
-            )
+            if self.auto_language:
+                self.translation_service.target_lang = TranslationService.SUPPORTED_LANGUAGES[self.target_lang_var.get()]
+            else:
+                self.translation_service.set_languages(
+                    self.source_lang_var.get(),
+                    self.target_lang_var.get()
+                )
     
     def _update_translation_visibility(self):
         """Update visibility of translation widgets based on checkbox state."""
@@ -249,6 +423,44 @@ class VoxaApp(ctk.CTk):
         
         self._update_language_labels()
     
+    def _on_stats_toggle(self):
+        if self.stats_var.get():
+            self.stats_label.grid(row=7, column=0, padx=10, pady=5, sticky="w")
+            self._update_stats_panel()
+        else:
+            self.stats_label.grid_remove()
+    
+    def _update_stats_panel(self):
+        """Refresh the statistics panel once a second while it is shown."""
+        if not self.stats_var.get():
+            return
+        
+        registry = get_registry()
+        
+        def ms(name: str, q: float) -> str:
+            metric = registry.get(name)
+            return f"{metric.quantile(q) * 1000:.1f}" if metric is not None and metric.count else "-"
+        
+        def value(name: str) -> float:
+            metric = registry.get(name)
+            return metric.value if metric is not None else 0.0
+        
+        lines = [
+            f"Callback p99: {ms('voxa_audio_callback_seconds', 0.99)} ms",
+            f"Transbordos: {value('voxa_audio_overflows_total'):.0f}",
+            f"Fila de áudio: {value('voxa_audio_backlog_seconds'):.1f} s",
+            f"Decodificação p50/p90: {ms('voxa_decode_seconds', 0.5)}/{ms('voxa_decode_seconds', 0.9)} ms",
+            f"RTF: {value('voxa_realtime_factor'):.2f}",
+            f"Detecções de idioma: {value('voxa_language_detections_total'):.0f} "
+            f"(evitadas {value('voxa_language_detections_skipped_total'):.0f})",
+            f"Tradução p90: {ms('voxa_translation_latency_seconds', 0.9)} ms",
+            f"Erros de tradução: {value('voxa_translation_errors_total'):.0f}",
+            f"Pendentes: tradução {value('voxa_translation_pending'):.0f}, tela {value('voxa_ui_pending_updates'):.0f}",
+            f"Gravação p90: {ms('voxa_persist_seconds', 0.9)} ms",
+        ]
+        self.stats_label.configure(text="\n".join(lines))
+        self.after(1000, self._update_stats_panel)
+    
     def _toggle_recording(self):
         if not self.is_recording:
             self.start_recording()
@@ -258,10 +470,11 @@ class VoxaApp(ctk.CTk):
     def start_recording(self):
         try:
             self.is_recording = True
+            # Wall-clock time of this recording's audio clock zero
+            self.persist_stage.session_start = datetime.now()
             self.record_button.configure(text="Stop Recording", fg_color="red")
-            self.recording_thread = threading.Thread(target=self.audio_service.start_recording)
-            self.recording_thread.start()
-            self.transcription_service.start()
+            self.pipeline.start_capture()
+            self._update_pipeline_status()
         except ValueError as e:
             self.is_recording = False
             print(f"Error starting recording: {e}")
@@ -270,51 +483,46 @@ class VoxaApp(ctk.CTk):
     
     def stop_recording(self):
         self.is_recording = False
-        self.record_button.configure(text="Start Recording", fg_color=["#3B8ED0", "#1F6AA5"])
-        self.audio_service.stop_recording()
-        self.transcription_service.stop()
-        if self.recording_thread:
-            self.recording_thread.join()
+        # The captured backlog is still being transcribed; no new recording until it is
+        self.record_button.configure(text="Stopping...", state="disabled")
+        stopping = self.pipeline.stop_capture(wait=False)
+        stopping.add_done_callback(lambda _: self.ui_scheduler.call(self._on_capture_stopped))
     
-    def _start_processing_thread(self):
-        def process_text():
-            while True:
-                try:
-                    text = self.text_queue.get(timeout=0.1)
-                    if text:
-                        if self.should_translate:
-                            translation = self.translation_service.translate(text)
-                            self.update_ui(text, translation)
-                        else:
-                            self.update_ui(text, None)
-                except queue.Empty:
-                    continue
-        
-        self.processing_thread = threading.Thread(target=process_text, daemon=True)
-        self.processing_thread.start()
+    def _on_capture_stopped(self):
+        self.record_button.configure(text="Start Recording", fg_color=["#3B8ED0", "#1F6AA5"], state="normal")
     
-    def update_ui(self, transcription: str, translation: Optional[str] = None):
-        self.transcription_text.insert("end", transcription + "\n")
-        self.transcription_text.see("end")
-        
-        if translation and self.should_translate:
-            self.translation_text.insert("end", translation + "\n")
-            self.translation_text.see("end")
-            self.conversation_manager.add_entry(transcription, translation)
-        else:
-            self.conversation_manager.add_entry(transcription, None)
+    def _update_pipeline_status(self):
+        """Show transcription lag and dropped audio while recording."""
+        if not self.is_recording:
+            return
+        
+        level = self.transcription_service.scheduler.level
+        text = f"Modelo: {level.model_size} (beam {level.beam_size})"
+        text += f"\nAtraso: {self.transcription_service.lag_seconds:.1f} s"
+        if self.audio_queue.dropped_samples:
+            text += f"\nDescartado: {self.audio_queue.dropped_seconds:.1f} s ({self.audio_queue.dropped_blocks} blocos)"
+        if self.transcription_service.degraded:
+            text += "\nModo econômico (sobrecarga)"
+        self.pipeline_label.configure(text=text)
+        self.after(500, self._update_pipeline_status)
     
     def _clear_text(self):
         """Clear all text areas."""
         self.transcription_text.delete("1.0", "end")
         self.translation_text.delete("1.0", "end")
+        self.shown_since = datetime.now()
+    
+    def _shown_entries(self):
+        """Entries added since the text areas were last cleared, oldest first."""
+        return [entry for entry in self.conversation_manager.get_entries()
+                if entry['timestamp'] >= self.shown_since]
     
     def _show_save_dialog(self):
         """Show dialog to save text content."""
         # Create dialog window
         dialog = ctk.CTkToplevel(self)
         dialog.title("Salvar Texto")
-        dialog.geometry("300x200")
+        dialog.geometry("300x240")
         dialog.transient(self)
         dialog.grab_set()
         
@@ -339,20 +547,37 @@ class VoxaApp(ctk.CTk):
             )
             save_translation_cb.grid(row=1, column=0, padx=20, pady=10)
         
+        format_var = ctk.StringVar(value="txt")
+        format_menu = ctk.CTkOptionMenu(
+            dialog,
+            values=list(FORMATS),
+            variable=format_var
+        )
+        format_menu.grid(row=2, column=0, padx=20, pady=10)
+        
         def save_files():
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            fmt = format_var.get()
             directory = filedialog.askdirectory()
             
             if directory:
-                if save_transcript_var.get():
-                    transcript_path = os.path.join(directory, f"transcript_{timestamp}.txt")
-                    with open(transcript_path, "w", encoding="utf-8") as f:
-                        f.write(self.transcription_text.get("1.0", "end"))
-                
-                if save_translation_var.get() and self.should_translate:
-                    translation_path = os.path.join(directory, f"translation_{timestamp}.txt")
-                    with open(translation_path, "w", encoding="utf-8") as f:
-                        f.write(self.translation_text.get("1.0", "end"))
+                # Written entry by entry from the history, not copied out of the text boxes
+                entries = self._shown_entries()
+                try:
+                    if fmt == "jsonl":
+                        if save_transcript_var.get() or save_translation_var.get():
+                            path = os.path.join(directory, f"conversation_{timestamp}.jsonl")
+                            write_export(path, entries, fmt)
+                    else:
+                        if save_transcript_var.get():
+                            path = os.path.join(directory, f"transcript_{timestamp}.{fmt}")
+                            write_export(path, entries, fmt)
+                        
+                        if save_translation_var.get() and self.should_translate:
+                            path = os.path.join(directory, f"translation_{timestamp}.{fmt}")
+                            write_export(path, entries, fmt, field="translation")
+                except OSError as e:
+                    print(f"Error saving file: {e}")
             
             dialog.destroy()
         
@@ -362,7 +587,53 @@ class VoxaApp(ctk.CTk):
             text="Salvar",
             command=save_files
         )
-        save_button.grid(row=2, column=0, padx=20, pady=20)
+        save_button.grid(row=3, column=0, padx=20, pady=20)
+    
+    def _on_close(self):
+        """Stop capture and flush the history before the window goes away."""
+        # Stops a running capture too; every final still in the pipeline reaches the history before it closes
+        self.pipeline.close()
+        self.ui_scheduler.stop()
+        if isinstance(self.transcription_service, TranscriptionWorker):
+            self.transcription_service.close()
+        self.conversation_manager.close()
+        self.history_store.close()
+        if self.profiler is not None:
+            self.profiler.stop()
+            self.profiler.write(self.profile_path)
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        self.destroy()
     
     def run(self):
-        self.mainloop() 
\ No newline at end of file
+        self.mainloop() 
+
+
+class _TextDisplay(Display):
+    """Shows the pipeline's text in the app's text boxes, through the UI scheduler."""
+    
+    def __init__(self, app: VoxaApp):
+        self.app = app
+    
+    def partial(self, text: str) -> None:
+        self.app.ui_scheduler.set_partial(self.app.transcription_text, text)
+    
+    def final(self, event: TranscriptEvent) -> None:
+        app = self.app
+        if app.auto_language and event.language != app._shown_language:
+            app._shown_language = event.language
+            app.ui_scheduler.call(app._update_language_labels)
+        # A draft is tagged so its refined text can replace it
+        tag = f"segment-{event.segment_id}" if event.draft else None
+        app.ui_scheduler.append(app.transcription_text, event.text + "\n", tag)
+    
+    def replace(self, event: TranscriptEvent) -> None:
+        self.app.ui_scheduler.replace(self.app.transcription_text, f"segment-{event.segment_id}", event.text + "\n")
+    
+    def translation(self, result: TranslationResult) -> None:
+        if result.error is not None:
+            line = f"[Translation Error: {result.error}]"
+        else:
+            line = result.translation
+        if line and self.app.should_translate:
+            self.app.ui_scheduler.append(self.app.translation_text, line + "\n")
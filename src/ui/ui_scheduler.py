@@ -0,0 +1,158 @@
+from queue import Queue, Empty
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ..core.metrics import get_registry
+
+_UNCHANGED = object()
+
+_FRAME_SECONDS = get_registry().histogram("voxa_ui_frame_seconds", "Tk thread time spent applying one frame of updates")
+
+
+class _TextView:
+    """Pending changes to one textbox, collected during a frame."""
+
+    def __init__(self):
+        self.chunks: List[Tuple[str, Optional[str]]] = []  # (text, tag)
+        self.partial: Any = _UNCHANGED
+        self.replacements: List[Tuple[str, str]] = []  # (tag, text)
+
+
+class UIUpdateScheduler:
+    """Applies UI updates posted from any thread on the Tk thread, a frame at a time.
+
+    Worker threads only enqueue. Every ``1 / fps`` seconds an ``after()``
+    callback drains up to ``max_items`` updates and applies them with one
+    insert per textbox, so a burst of segments costs one redraw instead of
+    one per segment. Textboxes keep only the last ``max_lines`` lines; the
+    full history lives in ``ConversationManager``.
+    """
+
+    def __init__(self, root, fps: int = 30, max_items: int = 500, max_lines: int = 1000,
+                 partial_tag: str = "partial"):
+        self.root = root
+        self.interval_ms = max(1, int(1000 / fps))
+        self.max_items = max_items
+        self.max_lines = max_lines
+        self.partial_tag = partial_tag
+        self.frames = 0  # frames that changed something
+        self.applied = 0  # updates applied
+        self.last_frame_ms = 0.0
+        self._queue: Queue = Queue()
+        self._job: Optional[str] = None
+
+    def start(self) -> None:
+        if self._job is None:
+            self._job = self.root.after(self.interval_ms, self._frame)
+
+    def stop(self) -> None:
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def append(self, textbox, text: str, tag: Optional[str] = None) -> None:
+        """Add committed text at the end of ``textbox``; replaces its partial line.
+
+        Text appended with a ``tag`` can later be swapped out with ``replace``.
+        """
+        self._queue.put(("append", textbox, (text, tag)))
+
+    def replace(self, textbox, tag: str, text: str) -> None:
+        """Swap the text appended with ``tag`` for ``text`` and forget the tag.
+
+        Nothing happens if that text was already trimmed away.
+        """
+        self._queue.put(("replace", textbox, (tag, text)))
+
+    def set_partial(self, textbox, text: str) -> None:
+        """Show ``text`` as the in-progress line of ``textbox`` ("" removes it)."""
+        self._queue.put(("partial", textbox, text))
+
+    def call(self, callback: Callable, *args) -> None:
+        """Run ``callback(*args)`` on the Tk thread at the next frame."""
+        self._queue.put(("call", callback, args))
+
+    def _frame(self) -> None:
+        started = time.perf_counter()
+        views: Dict[Any, _TextView] = {}
+        calls = []
+        items = 0
+        while items < self.max_items:
+            try:
+                op, target, payload = self._queue.get_nowait()
+            except Empty:
+                break
+            items += 1
+            if op == "call":
+                calls.append((target, payload))
+                continue
+            view = views.setdefault(target, _TextView())
+            if op == "append":
+                view.chunks.append(payload)
+                view.partial = ""  # committed text ends the partial line, like a final event
+            elif op == "replace":
+                view.replacements.append(payload)
+            else:
+                view.partial = payload
+
+        try:
+            for textbox, view in views.items():
+                self._apply(textbox, view)
+            for callback, args in calls:
+                callback(*args)
+        except Exception as e:
+            print(f"UI update error: {e}")
+        finally:
+            if items:
+                self.frames += 1
+                self.applied += items
+                elapsed = time.perf_counter() - started
+                self.last_frame_ms = elapsed * 1000
+                _FRAME_SECONDS.observe(elapsed)
+            self._job = self.root.after(self.interval_ms, self._frame)
+
+    def _apply(self, textbox, view: _TextView) -> None:
+        if view.partial is not _UNCHANGED:
+            ranges = textbox.tag_ranges(self.partial_tag)
+            if ranges:
+                textbox.delete(ranges[0], ranges[-1])
+        # One insert per run of chunks with the same tag
+        run: List[str] = []
+        run_tag: Optional[str] = None
+        for text, tag in view.chunks:
+            if run and tag != run_tag:
+                self._insert(textbox, "".join(run), run_tag)
+                run = []
+            run.append(text)
+            run_tag = tag
+        if run:
+            self._insert(textbox, "".join(run), run_tag)
+        if view.partial and view.partial is not _UNCHANGED:
+            textbox.insert("end", view.partial + "\n", self.partial_tag)
+        for tag, text in view.replacements:
+            ranges = textbox.tag_ranges(tag)
+            # Only a tag on one contiguous range; anything else would delete the lines in between
+            if len(ranges) == 2 and textbox.get(ranges[0], ranges[1]) != text:
+                textbox.delete(ranges[0], ranges[1])
+                textbox.insert(ranges[0], text)
+            textbox.tag_delete(tag)
+        self._trim(textbox)
+        textbox.see("end")
+
+    @staticmethod
+    def _insert(textbox, text: str, tag: Optional[str]) -> None:
+        if tag is None:
+            textbox.insert("end", text)
+        else:
+            textbox.insert("end", text, tag)
+
+    def _trim(self, textbox) -> None:
+        """Drop the oldest lines beyond ``max_lines``."""
+        # Text always ends with a newline, so the index past it sits on an extra empty line
+        lines = int(textbox.index("end-1c").split(".")[0]) - 1
+        excess = lines - self.max_lines
+        if excess > 0:
+            textbox.delete("1.0", f"{excess + 1}.0")
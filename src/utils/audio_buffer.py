@@ -0,0 +1,262 @@
+from multiprocessing import shared_memory
+from typing import Optional
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Fixed-capacity float32 ring buffer for mono audio samples.
+
+    Every sample is written twice, at ``i`` and ``i + capacity``, so any
+    span of up to ``capacity`` samples is contiguous in memory and can be
+    returned as a zero-copy view. Views stay valid until the next write.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=np.float32)
+        self._write_pos = 0  # total samples ever written
+        self._size = 0
+        self.dropped = 0  # samples overwritten before being consumed
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def total_written(self) -> int:
+        """Total number of samples written since creation or last clear."""
+        return self._write_pos
+
+    @property
+    def start_sample(self) -> int:
+        """Absolute index (in samples written) of the oldest buffered sample."""
+        return self._write_pos - self._size
+
+    def write(self, samples: np.ndarray) -> None:
+        """Append samples, overwriting the oldest ones if the buffer is full."""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        n = len(samples)
+        if n == 0:
+            return
+        cap = self.capacity
+        if n > cap:
+            self.dropped += n - cap
+            self._write_pos += n - cap
+            samples = samples[-cap:]
+            n = cap
+
+        pos = self._write_pos % cap
+        first = min(n, cap - pos)
+        self._data[pos:pos + first] = samples[:first]
+        self._data[pos + cap:pos + cap + first] = samples[:first]
+        rest = n - first
+        if rest:
+            self._data[:rest] = samples[first:]
+            self._data[cap:cap + rest] = samples[first:]
+
+        self._write_pos += n
+        overflow = self._size + n - cap
+        if overflow > 0:
+            self.dropped += overflow
+        self._size = min(self._size + n, cap)
+
+    def view(self, length: int = None) -> np.ndarray:
+        """Return a contiguous, read-only view of the oldest ``length`` samples."""
+        if length is None or length > self._size:
+            length = self._size
+        start = (self._write_pos - self._size) % self.capacity
+        window = self._data[start:start + length]
+        window.flags.writeable = False
+        return window
+
+    def advance(self, count: int) -> None:
+        """Consume ``count`` samples from the front of the buffer."""
+        self._size -= max(0, min(count, self._size))
+
+    def keep_last(self, overlap: int) -> None:
+        """Consume everything except the most recent ``overlap`` samples."""
+        self.advance(self._size - max(0, overlap))
+
+    def clear(self) -> None:
+        """Drop all buffered samples."""
+        self._size = 0
+        self._write_pos = 0
+
+
+class FrameRing:
+    """Lock-free ring of float32 frames for exactly one producer and one consumer thread.
+
+    Meant for real-time audio callbacks: ``write`` only copies into
+    preallocated memory and never blocks. The producer alone advances the
+    write count and the consumer alone advances the read count, and each
+    count is published after its copy, so neither side needs a lock. A
+    block that does not fit is dropped whole and counted in ``overruns``.
+    """
+
+    def __init__(self, capacity: int, channels: int = 1):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.channels = channels
+        self._data = np.zeros((capacity, channels), dtype=np.float32)
+        self._written = 0  # frames ever written; only the producer assigns it
+        self._read = 0  # frames ever read; only the consumer assigns it
+        self.overruns = 0  # blocks dropped because the consumer fell behind
+        self.overrun_frames = 0
+
+    def __len__(self) -> int:
+        return self._written - self._read
+
+    def write(self, frames: np.ndarray) -> bool:
+        """Copy a (frames, channels) block in; returns False if it was dropped."""
+        n = len(frames)
+        cap = self.capacity
+        if n > cap - (self._written - self._read):
+            self.overruns += 1
+            self.overrun_frames += n
+            return False
+        pos = self._written % cap
+        first = min(n, cap - pos)
+        self._data[pos:pos + first] = frames[:first]
+        if first < n:
+            self._data[:n - first] = frames[first:]
+        self._written += n
+        return True
+
+    def read_into(self, out: np.ndarray) -> int:
+        """Move up to ``len(out)`` of the oldest frames into ``out``; returns how many."""
+        n = min(len(out), self._written - self._read)
+        if n == 0:
+            return 0
+        cap = self.capacity
+        pos = self._read % cap
+        first = min(n, cap - pos)
+        out[:first] = self._data[pos:pos + first]
+        if first < n:
+            out[first:n] = self._data[:n - first]
+        self._read += n
+        return n
+
+
+class SharedAudioRing:
+    """Ring of mono float32 samples in shared memory, for one producer and one consumer process.
+
+    Audio crosses the process boundary without pickling: the producer
+    copies each block in once and the consumer reads it in place. As in
+    ``AudioRingBuffer`` every sample is written twice, so ``view`` returns
+    a contiguous zero-copy window of the segment. As in ``FrameRing`` the
+    write count is only advanced by the producer and the read count only
+    by the consumer, each after its copy, so no lock is shared. The header
+    also carries the producer's capture time, backlog and overload flag.
+    """
+
+    _HEADER = 64  # int64 written, read, capacity, overloaded; float64 capture time, backlog
+
+    def __init__(self, capacity: int, name: Optional[str] = None):
+        if name is None:
+            if capacity <= 0:
+                raise ValueError("capacity must be positive")
+            self.shm = shared_memory.SharedMemory(create=True, size=self._HEADER + 8 * capacity)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self._ints = np.ndarray((4,), dtype=np.int64, buffer=self.shm.buf)
+        self._floats = np.ndarray((2,), dtype=np.float64, buffer=self.shm.buf, offset=32)
+        if name is None:
+            self._ints[:] = (0, 0, capacity, 0)
+            self._floats[:] = (np.nan, 0.0)
+        self.capacity = int(self._ints[2])
+        self._data = np.ndarray((2 * self.capacity,), dtype=np.float32, buffer=self.shm.buf,
+                                offset=self._HEADER)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedAudioRing":
+        """Open a ring created by another process."""
+        return cls(0, name=name)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def written(self) -> int:
+        """Samples ever written."""
+        return int(self._ints[0])
+
+    @property
+    def read(self) -> int:
+        """Samples ever consumed."""
+        return int(self._ints[1])
+
+    def __len__(self) -> int:
+        return int(self._ints[0] - self._ints[1])
+
+    @property
+    def free(self) -> int:
+        return self.capacity - len(self)
+
+    @property
+    def capture_time(self) -> Optional[float]:
+        """``time.monotonic()`` at which the newest sample was captured."""
+        value = float(self._floats[0])
+        return None if value != value else value
+
+    @property
+    def backlog_seconds(self) -> float:
+        """Audio still queued on the producer's side."""
+        return float(self._floats[1])
+
+    @backlog_seconds.setter
+    def backlog_seconds(self, value: float) -> None:
+        self._floats[1] = value
+
+    @property
+    def overloaded(self) -> bool:
+        return bool(self._ints[3])
+
+    @overloaded.setter
+    def overloaded(self, value: bool) -> None:
+        self._ints[3] = int(value)
+
+    def write(self, samples: np.ndarray, capture_time: Optional[float] = None) -> bool:
+        """Append a block; returns False, writing nothing, if it does not fit."""
+        n = len(samples)
+        if n > self.free:
+            return False
+        cap = self.capacity
+        pos = int(self._ints[0]) % cap
+        first = min(n, cap - pos)
+        self._data[pos:pos + first] = samples[:first]
+        self._data[pos + cap:pos + cap + first] = samples[:first]
+        rest = n - first
+        if rest:
+            self._data[:rest] = samples[first:]
+            self._data[cap:cap + rest] = samples[first:]
+        if capture_time is not None:
+            self._floats[0] = capture_time
+        self._ints[0] += n
+        return True
+
+    def view(self, length: int) -> np.ndarray:
+        """Contiguous, read-only view of the oldest ``length`` unread samples.
+
+        Valid until ``advance`` hands the space back to the producer.
+        """
+        length = min(length, len(self))
+        start = int(self._ints[1]) % self.capacity
+        window = self._data[start:start + length]
+        window.flags.writeable = False
+        return window
+
+    def advance(self, count: int) -> None:
+        """Mark ``count`` samples as consumed."""
+        self._ints[1] += max(0, min(count, len(self)))
+
+    def close(self) -> None:
+        # The segment cannot be unmapped while arrays still point into it
+        self._ints = self._floats = self._data = None
+        self.shm.close()
+
+    def unlink(self) -> None:
+        """Free the segment; only the creating process should call this."""
+        self.shm.unlink()
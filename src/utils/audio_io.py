@@ -0,0 +1,105 @@
+import os
+import struct
+from typing import Iterator, Optional
+import numpy as np
+from .resampler import StreamingResampler, to_mono
+
+# WAV format tags that can be memory-mapped directly
+_PCM = 1
+_IEEE_FLOAT = 3
+_EXTENSIBLE = 0xFFFE
+
+
+class AudioFileReader:
+    """Streams an audio file as 16 kHz mono float32 blocks.
+
+    PCM16/PCM32/float32 WAV files are memory-mapped, so only the block being
+    converted is ever resident; other formats (FLAC, 24-bit WAV, ...) are read
+    in blocks through the optional ``soundfile`` package.
+    """
+
+    def __init__(self, path: str, target_rate: int = 16000):
+        self.path = path
+        self.target_rate = target_rate
+        self._memmap: Optional[np.ndarray] = None
+        self._scale = 1.0
+
+        if not self._open_wav():
+            try:
+                import soundfile
+            except ImportError:
+                raise ValueError(f"{path}: formato não suportado sem o pacote 'soundfile'")
+            info = soundfile.info(path)
+            self.sample_rate = info.samplerate
+            self.channels = info.channels
+            self.frames = info.frames
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate
+
+    def _open_wav(self) -> bool:
+        """Locate the data chunk of a WAV file and memory-map it if possible."""
+        with open(self.path, "rb") as f:
+            header = f.read(12)
+            if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+                return False
+
+            fmt = None
+            while True:
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    return False
+                chunk_id, size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+                if chunk_id == b"fmt ":
+                    fmt = f.read(size)
+                    f.seek(size % 2, 1)
+                elif chunk_id == b"data":
+                    data_offset = f.tell()
+                    break
+                else:
+                    f.seek(size + size % 2, 1)
+
+        if fmt is None or len(fmt) < 16:
+            return False
+        tag, channels, rate, _, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+        if tag == _EXTENSIBLE and len(fmt) >= 26:
+            tag = struct.unpack("<H", fmt[24:26])[0]
+
+        if tag == _PCM and bits == 16:
+            dtype, self._scale = np.dtype("<i2"), 1 / 32768.0
+        elif tag == _PCM and bits == 32:
+            dtype, self._scale = np.dtype("<i4"), 1 / 2147483648.0
+        elif tag == _IEEE_FLOAT and bits == 32:
+            dtype, self._scale = np.dtype("<f4"), 1.0
+        else:
+            return False
+
+        frames = min(size, os.path.getsize(self.path) - data_offset) // (dtype.itemsize * channels)
+        self.sample_rate = rate
+        self.channels = channels
+        self.frames = frames
+        if frames == 0:
+            self._memmap = np.zeros((0, channels), dtype=dtype)
+        else:
+            self._memmap = np.memmap(self.path, dtype=dtype, mode="r", offset=data_offset,
+                                     shape=(frames, channels))
+        return True
+
+    def _raw_blocks(self, blocksize: int) -> Iterator[np.ndarray]:
+        if self._memmap is not None:
+            for start in range(0, self.frames, blocksize):
+                block = self._memmap[start:start + blocksize]
+                yield block.astype(np.float32) * np.float32(self._scale)
+        else:
+            import soundfile
+            for block in soundfile.blocks(self.path, blocksize=blocksize, dtype="float32", always_2d=True):
+                yield block
+
+    def blocks(self, seconds: float = 1.0) -> Iterator[np.ndarray]:
+        """Yield consecutive 16 kHz mono float32 blocks of about ``seconds`` each."""
+        resampler = StreamingResampler(self.sample_rate, self.target_rate)
+        for block in self._raw_blocks(max(1, int(seconds * self.sample_rate))):
+            out = resampler.process(to_mono(block))
+            if len(out):
+                yield out
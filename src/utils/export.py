@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+import json
+from typing import Dict, IO, Iterable, Iterator, Optional, Tuple
+
+FORMATS = ("txt", "srt", "vtt", "jsonl")
+
+# Cue length for entries saved before segments had audio-clock times
+_CHARS_PER_SECOND = 15
+_MIN_CUE = 1.0
+_MAX_CUE = 7.0
+
+Cue = Tuple[float, float, str]
+
+
+def recording_start(entry: Dict) -> datetime:
+    """Wall-clock time of the start of the recording ``entry`` belongs to."""
+    return entry['timestamp'] - timedelta(seconds=entry.get('start') or 0.0)
+
+
+def _duration(entry: Dict, text: str) -> float:
+    if entry.get('start') is not None and entry.get('end') is not None:
+        return max(entry['end'] - entry['start'], 0.0)
+    return min(max(len(text) / _CHARS_PER_SECOND, _MIN_CUE), _MAX_CUE)
+
+
+def iter_cues(entries: Iterable[Dict], field: str = "transcription",
+              origin: Optional[datetime] = None) -> Iterator[Cue]:
+    """Yield ``(start, end, text)`` in seconds since ``origin``, one entry at a time.
+
+    ``origin`` defaults to the start of the first entry's recording, so a
+    single session lines up with its audio. A cue never runs into the next
+    one; looking one entry ahead is all that takes.
+    """
+    pending: Optional[Cue] = None
+    for entry in entries:
+        text = " ".join((entry.get(field) or "").split())
+        if not text:
+            continue
+        if origin is None:
+            origin = recording_start(entry)
+        start = max((entry['timestamp'] - origin).total_seconds(), 0.0)
+        if pending is not None:
+            yield pending[0], min(pending[1], max(start, pending[0])), pending[2]
+        pending = (start, start + _duration(entry, text), text)
+    if pending is not None:
+        yield pending
+
+
+def _clock(seconds: float, separator: str) -> str:
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def iter_txt(entries: Iterable[Dict], field: str = "transcription") -> Iterator[str]:
+    """Plain text, one entry per line."""
+    for entry in entries:
+        if entry.get(field):
+            yield entry[field].strip() + "\n"
+
+
+def iter_srt(entries: Iterable[Dict], field: str = "transcription",
+             origin: Optional[datetime] = None) -> Iterator[str]:
+    """SubRip subtitles, one cue per entry."""
+    for index, (start, end, text) in enumerate(iter_cues(entries, field, origin), 1):
+        yield f"{index}\n{_clock(start, ',')} --> {_clock(end, ',')}\n{text}\n\n"
+
+
+def iter_vtt(entries: Iterable[Dict], field: str = "transcription",
+             origin: Optional[datetime] = None) -> Iterator[str]:
+    """WebVTT subtitles, one cue per entry."""
+    yield "WEBVTT\n\n"
+    for start, end, text in iter_cues(entries, field, origin):
+        text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        yield f"{_clock(start, '.')} --> {_clock(end, '.')}\n{text}\n\n"
+
+
+def iter_jsonl(entries: Iterable[Dict]) -> Iterator[str]:
+    """One JSON object per entry, with both texts and the audio-clock times."""
+    for entry in entries:
+        yield json.dumps({
+            "timestamp": entry['timestamp'].isoformat(),
+            "start": entry.get('start'),
+            "end": entry.get('end'),
+            "transcription": entry['transcription'],
+            "translation": entry.get('translation'),
+        }, ensure_ascii=False) + "\n"
+
+
+def iter_export(entries: Iterable[Dict], fmt: str, field: str = "transcription",
+                origin: Optional[datetime] = None) -> Iterator[str]:
+    """Chunks of ``entries`` rendered as ``fmt`` (one of ``FORMATS``)."""
+    if fmt == "txt":
+        return iter_txt(entries, field)
+    if fmt == "srt":
+        return iter_srt(entries, field, origin)
+    if fmt == "vtt":
+        return iter_vtt(entries, field, origin)
+    if fmt == "jsonl":
+        return iter_jsonl(entries)
+    raise ValueError(f"Formato de exportação inválido: {fmt}")
+
+
+def write_chunks(chunks: Iterable[str], out: IO[str]) -> int:
+    """Write chunks as they are produced; returns the number written."""
+    written = 0
+    for chunk in chunks:
+        out.write(chunk)
+        written += 1
+    return written
+
+
+def write_export(path: str, entries: Iterable[Dict], fmt: str, field: str = "transcription",
+                 origin: Optional[datetime] = None) -> int:
+    """Stream ``entries`` as ``fmt`` into ``path``; the document is never held in memory."""
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        return write_chunks(iter_export(entries, fmt, field, origin), f)
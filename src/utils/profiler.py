@@ -0,0 +1,69 @@
+from collections import Counter
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+
+class SamplingProfiler:
+    """Samples the stacks of every thread at a fixed interval.
+
+    Nothing is instrumented: a background thread reads
+    ``sys._current_frames()`` every ``interval`` seconds and counts each
+    stack, so the overhead is bounded by the sampling rate and can be left
+    on for a whole session. ``folded()`` returns the counts in the
+    collapsed-stack format read by flame graph tools (flamegraph.pl,
+    speedscope).
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names: Dict[int, str] = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self._stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        """One ``thread;outer;...;inner count`` line per distinct stack, most frequent first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.folded())
+
+
+def profile_for(seconds: float, interval: float = 0.005) -> str:
+    """Sample every thread for ``seconds`` and return the folded stacks."""
+    profiler = SamplingProfiler(interval).start()
+    time.sleep(seconds)
+    profiler.stop()
+    return profiler.folded()
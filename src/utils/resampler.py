@@ -0,0 +1,133 @@
+from math import gcd
+import numpy as np
+
+
+class StreamingResampler:
+    """Rational-ratio polyphase FIR resampler for mono float32 streams.
+
+    The input is conceptually upsampled by ``up``, low-pass filtered with a
+    Kaiser-windowed sinc and decimated by ``down``; only the filter phases
+    that produce output samples are evaluated. Filter history is carried
+    between calls, so a stream can be processed block by block.
+    """
+
+    def __init__(self, input_rate: int, output_rate: int = 16000,
+                 zero_crossings: int = 8, beta: float = 8.0, rolloff: float = 0.95):
+        divisor = gcd(input_rate, output_rate)
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        self.up = output_rate // divisor
+        self.down = input_rate // divisor
+
+        factor = max(self.up, self.down)
+        self.taps = int(np.ceil(2 * zero_crossings * factor / self.up))
+        length = self.taps * self.up
+        cutoff = rolloff / (2 * factor)  # cycles per upsampled sample
+        n = np.arange(length) - (length - 1) / 2
+        h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, beta) * self.up
+
+        # phases[p, k] weights input sample (i - taps + 1 + k) for an output at phase p,
+        # i.e. the k-th sample of the window ending at input sample i
+        self.phases = np.ascontiguousarray(h.reshape(self.taps, self.up).T[:, ::-1], dtype=np.float32)
+        self._offsets = np.arange(self.taps)
+        self._capacity = 0
+        self._buf = np.zeros(self.taps - 1, dtype=np.float32)
+        self.reset()
+
+    @property
+    def passthrough(self) -> bool:
+        return self.up == self.down
+
+    def reset(self) -> None:
+        self._buf[:self.taps - 1] = 0.0  # filter history
+        self._next = 0  # upsampled index of the next output, relative to the next block
+
+    def reserve(self, max_block: int) -> None:
+        """Preallocate work buffers for input blocks of up to ``max_block`` samples.
+
+        ``process_into`` grows them on demand; reserving up front keeps a
+        real-time stream from allocating after it starts.
+        """
+        if max_block <= self._capacity:
+            return
+        history = self.taps - 1
+        max_out = (max_block * self.up + self.down) // self.down + 1
+        buf = np.zeros(history + max_block, dtype=np.float32)
+        buf[:history] = self._buf[:history]
+        self._buf = buf
+        self._steps = np.arange(max_out, dtype=np.int64) * self.down
+        self._t = np.empty(max_out, dtype=np.int64)
+        self._index = np.empty(max_out, dtype=np.int64)
+        self._gather = np.empty((max_out, self.taps), dtype=np.int64)
+        self._gathered = np.empty((max_out, self.taps), dtype=np.float32)
+        self._weights = np.empty((max_out, self.taps), dtype=np.float32)
+        self._capacity = max_block
+
+    def output_length(self, input_length: int) -> int:
+        """Number of samples the next ``process`` call returns for this input."""
+        remaining = input_length * self.up - self._next
+        return max(0, -(-remaining // self.down))
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Resample one block; returns the output samples it completes."""
+        block = np.asarray(block, dtype=np.float32).reshape(-1)
+        if self.passthrough:
+            return block
+        out = np.empty(self.output_length(len(block)), dtype=np.float32)
+        self.process_into(block, out)
+        return out
+
+    def process_into(self, block: np.ndarray, out: np.ndarray) -> int:
+        """Resample one mono float32 block into ``out``; returns the samples written.
+
+        ``out`` must hold ``output_length(len(block))`` samples. No arrays
+        are allocated unless the block is larger than the reserved size.
+        """
+        n = len(block)
+        if self.passthrough:
+            out[:n] = block
+            return n
+
+        self.reserve(n)
+        history = self.taps - 1
+        buf = self._buf
+        buf[history:history + n] = block
+        count = self.output_length(n)
+        if count:
+            t = self._t[:count]
+            np.add(self._steps[:count], self._next, out=t)
+            # Output t is the dot product of the window of ``taps`` samples ending at input t // up
+            # with the filter phase t % up
+            if self.up == 1:
+                # Integer decimation: the windows are evenly spaced, so a strided view covers them
+                first = int(t[0])
+                windows = np.lib.stride_tricks.sliding_window_view(buf[:history + n], self.taps)
+                np.einsum("ij,j->i", windows[first:first + self.down * count:self.down],
+                          self.phases[0], out=out[:count])
+            else:
+                index = self._index[:count]
+                np.floor_divide(t, self.up, out=index)
+                gather = self._gather[:count]
+                np.add(index[:, None], self._offsets, out=gather)
+                # Indices are in range by construction; mode="clip" lets take() write to ``out`` unbuffered
+                gathered = self._gathered[:count]
+                np.take(buf, gather, out=gathered, mode="clip")
+                np.remainder(t, self.up, out=index)
+                weights = self._weights[:count]
+                np.take(self.phases, index, axis=0, out=weights, mode="clip")
+                np.einsum("ij,ij->i", gathered, weights, out=out[:count])
+            self._next = int(t[-1]) + self.down - n * self.up
+        else:
+            self._next -= n * self.up
+        # Keep the last ``taps - 1`` samples as history for the next block
+        buf[:history] = buf[n:n + history]
+        return count
+
+
+def to_mono(block: np.ndarray) -> np.ndarray:
+    """Average the channels of a (frames, channels) block."""
+    if block.ndim == 1:
+        return block
+    if block.shape[1] == 1:
+        return block[:, 0]
+    return block.mean(axis=1, dtype=np.float32)